@@ -0,0 +1,7 @@
+#!/usr/bin/env python3
+# Analyse hors ligne des trajectoires enregistrées :
+#   python analysis_main.py traceability_positions.traj traceability_square.log [--brief]
+from utils.trajectory_analysis import main
+
+if __name__ == "__main__":
+    main()
@@ -1,18 +1,32 @@
 #!/usr/bin/env python3
+import sys
 import time
 import math
 from robot.robot import MockRobot2IN013            # ← bibliothèque matérielle
 from controller.adapter import RealRobotAdapter
 from controller.StrategyAsync import PolygonStrategy
+from controller.control_loop import ControlLoop
+from robot.remote import RobotServer, RemoteRobot
+from utils.clock import VirtualClock
 
-def run_cli():
+def run_cli(clock=time, latency=0.0, encoder_noise=0.0, verbose=True, remote=False):
+    """
+    :param clock: horloge de la boucle et du robot simulé (time, ou VirtualClock
+                  pour exécuter plus vite que le temps réel)
+    :param remote: piloter le robot simulé à travers un serveur TCP local
+    """
     # 1) Création de l’objet matériel
-    gpg3 = MockRobot2IN013()                         # ou EasyGoPiGo() selon votre version
+    gpg3 = MockRobot2IN013(clock=clock, latency=latency,        # ou EasyGoPiGo() selon votre version
+                           encoder_noise=encoder_noise, verbose=verbose)
+    server = None
+    if remote:
+        server = RobotServer(gpg3, clock=clock).start()
+        gpg3 = RemoteRobot(*server.address)
 
     # 2) Wrapper hardware → adapter
-    robot_adapter = RealRobotAdapter(gpg3)
+    robot_adapter = RealRobotAdapter(gpg3, clock=clock.monotonic)
 
-    # 3) Instanciation de la stratégie « carré »
+    # 3) Instanciation de la stratégie « carré »
     square = PolygonStrategy(
         n=4,
         adapter=robot_adapter,
@@ -22,19 +36,37 @@ def run_cli():
     )
     square.start()
 
-    # 4) Boucle d’exécution CLI sur le vrai robot
-    dt = 0.02  # 20 ms entre chaque step()
+    # 4) Boucle d’exécution CLI sur le vrai robot : un pas toutes les 20 ms,
+    #    dt réellement écoulé passé à step()
+    loop = ControlLoop(period=0.02, clock=clock)
+
+    def tick(dt):
+        robot_adapter.begin_tick()   # Encodeurs lus au plus une fois par pas
+        square.step(dt)
+
+    t0, wall_t0 = clock.monotonic(), time.perf_counter()
     try:
-        while not square.is_finished():
-            square.step(dt)
-            time.sleep(dt)
+        loop.run(tick, until=square.is_finished)
     except KeyboardInterrupt:
         print("\n🛑 Arrêt manuel, stoppage immédiat.")
     finally:
         # 5) Assurez-vous d’arrêter les moteurs
-        robot_adapter.robot.set_motor_dps("MOTOR_LEFT",  0)
-        robot_adapter.robot.set_motor_dps("MOTOR_RIGHT", 0)
+        robot_adapter.robot.set_motor_dps(gpg3.MOTOR_LEFT,  0)
+        robot_adapter.robot.set_motor_dps(gpg3.MOTOR_RIGHT, 0)
         print("✅ Moteurs coupés, fin du programme.")
+        print(f"Durée du parcours : {clock.monotonic() - t0:.2f} s "
+              f"(exécuté en {time.perf_counter() - wall_t0:.2f} s)")
+        print(f"Lectures des encodeurs : {robot_adapter.stats()}")
+        print(loop.report())
+        if server is not None:
+            print(f"Allers-retours réseau : {gpg3.round_trips}, messages envoyés : {gpg3.messages_sent}")
+            gpg3.close()
+            server.stop()
 
 if __name__ == "__main__":
-    run_cli()
+    # --virtual : horloge simulée, le parcours s'exécute sans attendre
+    run_cli(clock=VirtualClock() if "--virtual" in sys.argv else time,
+            latency=0.01 if "--latency" in sys.argv else 0.0,
+            encoder_noise=0.5 if "--noise" in sys.argv else 0.0,
+            verbose="--quiet" not in sys.argv,
+            remote="--remote" in sys.argv)
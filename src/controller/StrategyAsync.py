@@ -1,7 +1,10 @@
 import time
 import math
 import logging
-from utils.geometry import normalize_angle
+from utils.geometry import normalize_angle, arc_update
+from utils.motion_profile import TrapezoidalProfile
+from vision.tracking import BeaconTracker
+from vision.kalman import BeaconKalman
 
 # Interface de commande asynchrone
 class AsyncCommande:
@@ -19,19 +22,38 @@ class AsyncCommande:
 
 # Commande pour avancer d'une distance donnée (en cm) en se basant sur les encodeurs
 class Avancer(AsyncCommande):
-    def __init__(self, distance_cm, vitesse, adapter):
+    def __init__(self, distance_cm, vitesse, adapter, acceleration=None, tolerance_cm=0.05,
+                 check_tolerance_cm=1.0):
         super().__init__(adapter)
         self.distance_cm = distance_cm      # Distance à parcourir en cm
         self.vitesse = vitesse              # Vitesse en dps (degrés par seconde)
+        self.acceleration = acceleration    # Accélération en dps/s (None : vitesse constante)
+        self.tolerance_cm = tolerance_cm    # Arrêt quand il reste moins que ça (avec profil)
+        self.check_tolerance_cm = check_tolerance_cm  # Écart signalé entre distance mesurée et demandée
+        self.traveled_cm = None             # Distance mesurée à l'arrêt
         self.wheel_radius = 2.5             # Rayon de la roue en cm
         self.started = False
         self.finished = False
+        self.elapsed = 0.0
+        self.profile = None
         self.logger = logging.getLogger("AvancerAdapter")
 
     def start(self):
-        self.adapter.set_motor_speed("left", self.vitesse)
-        print("lina")
-        self.adapter.set_motor_speed("right", self.vitesse)
+        # Distance mesurée à partir d'ici : pas la rotation des roues du virage précédent
+        self.adapter.resetDistance()
+        if self.acceleration is not None:
+            # Profil planifié en degrés de roue pour rester en dps
+            distance_deg = math.degrees(self.distance_cm / self.wheel_radius)
+            self.profile = TrapezoidalProfile(distance_deg, self.vitesse, self.acceleration,
+                                              v_min=0.05 * self.vitesse)
+            self.elapsed = 0.0
+            self.adapter.set_motor_speed("left", 0)
+            self.adapter.set_motor_speed("right", 0)
+            self.logger.info(f"Profil trapézoïdal: durée prévue {self.profile.duration():.2f} s")
+        else:
+            self.adapter.set_motor_speed("left", self.vitesse)
+            print("lina")
+            self.adapter.set_motor_speed("right", self.vitesse)
         
         self.started = True
         print("Commande Avancer démarrée.")
@@ -40,33 +62,72 @@ class Avancer(AsyncCommande):
         if not self.started:
             self.start()
         traveled_distance = self.adapter.calculer_distance_parcourue()
+        if self.profile is not None:
+            return self._step_profile(traveled_distance, delta_time)
         if traveled_distance >= self.distance_cm:
-            self.adapter.set_motor_speed("left", 0)
-            self.adapter.set_motor_speed("right", 0)
-            self.finished = True
-            self.logger.info(f"Commande terminée, distance parcourue: {traveled_distance:.2f} cm")
-            self.adapter.resetDistance()
+            self._stop(traveled_distance)
         return self.finished
 
+    def _step_profile(self, traveled_distance, delta_time):
+        remaining_cm = self.distance_cm - traveled_distance
+        if remaining_cm <= self.tolerance_cm:
+            self._stop(traveled_distance)
+            return self.finished
+        self.elapsed += delta_time
+        remaining_deg = math.degrees(remaining_cm / self.wheel_radius)
+        speed = self.profile.speed(self.elapsed, remaining_deg, delta_time)
+        self.adapter.set_motor_speed("left", speed)
+        self.adapter.set_motor_speed("right", speed)
+        return self.finished
+
+    def _stop(self, traveled_distance):
+        self.adapter.set_motor_speed("left", 0)
+        self.adapter.set_motor_speed("right", 0)
+        self.finished = True
+        self.traveled_cm = traveled_distance
+        self.logger.info(f"Commande terminée, distance parcourue: {traveled_distance:.2f} cm")
+        if self.profile is not None:
+            self.logger.info(f"Durée: {self.elapsed:.2f} s (prévue {self.profile.duration():.2f} s)")
+        if abs(traveled_distance - self.distance_cm) > self.check_tolerance_cm:
+            self.logger.warning(f"Distance parcourue {traveled_distance:.2f} cm au lieu de "
+                                f"{self.distance_cm:.2f} cm (tolérance {self.check_tolerance_cm} cm)")
+        self.adapter.resetDistance()
+
     def is_finished(self):
         return self.finished
 
 # Commande pour tourner d'un angle donné avec une vitesse de référence
 # Commande pour tourner d'un angle donné avec une vitesse de référence
 class Tourner(AsyncCommande):
-    def __init__(self, angle_rad, vitesse_deg_s, adapter):
+    def __init__(self, angle_rad, vitesse_deg_s, adapter, acceleration=None,
+                 wheel_radius=2.5, wheel_base=20.0):
         super().__init__(adapter)
         self.angle_rad = angle_rad
         self.base_speed = vitesse_deg_s
+        self.acceleration = acceleration  # Accélération de la roue rapide en dps/s (None : paliers fixes)
+        self.wheel_radius = wheel_radius
+        self.wheel_base = wheel_base
         self.started = False
         self.finished = False
+        self.elapsed = 0.0
+        self.profile = None
         self.logger = logging.getLogger("strategy.Tourner")
         self.speed_ratio = 0.5  # Pour créer une différence de vitesse entre les roues
 
+    def _fast_wheel_degrees(self, angle_rad):
+        """Rotation de la roue rapide (en degrés) nécessaire pour tourner le robot de angle_rad."""
+        return math.degrees(angle_rad * self.wheel_base / ((1 - self.speed_ratio) * self.wheel_radius))
+
     def start(self):
         self.adapter.decide_turn_direction(self.angle_rad, self.base_speed)
         self.fast_wheel = self.adapter.fast_wheel
         self.slow_wheel = self.adapter.slow_wheel
+        if self.acceleration is not None:
+            self.profile = TrapezoidalProfile(self._fast_wheel_degrees(abs(self.angle_rad)),
+                                              self.base_speed, self.acceleration,
+                                              v_min=0.05 * self.base_speed)
+            self.elapsed = 0.0
+            self.logger.info(f"Profil trapézoïdal: durée prévue {self.profile.duration():.2f} s")
         self.started = True
         self.logger.info(f"Début virage: {math.degrees(self.angle_rad):.1f}°")
         print("Commande tourner démarrée.")
@@ -74,17 +135,24 @@ class Tourner(AsyncCommande):
     def step(self, delta_time):
         angle = self.adapter.calcule_angle()
 
-        error = self.angle_rad - abs(angle)
+        # Angle restant en valeur absolue : le sens du virage est fixé par decide_turn_direction
+        error = abs(self.angle_rad) - abs(angle)
         tol =math.radians(0.3)  # Tolérance de 0.3°
         close  = abs(error) < math.radians(8)
 
-        coeff  = 0.3 if close else 1.0
+        if self.profile is not None:
+            self.elapsed += delta_time
+            speed = self.profile.speed(self.elapsed, self._fast_wheel_degrees(max(error, 0.0)), delta_time)
+            coeff = speed / self.base_speed
+        else:
+            coeff  = 0.3 if close else 1.0
         self.adapter.set_motor_speed(self.fast_wheel, self.base_speed * coeff)
         
-        # Correction proportionnelle sur la roue lente
+        # Correction proportionnelle sur la roue lente : plus il reste d'angle,
+        # plus elle ralentit (un dépassement la fait accélérer)
         Kp = 0.6
         correction = Kp * math.degrees(error)
-        new_slow_speed = self.base_speed * self.speed_ratio * coeff + correction
+        new_slow_speed = self.base_speed * self.speed_ratio * coeff - correction
         new_slow_speed = max(min(new_slow_speed, self.base_speed * coeff), 0)
         self.adapter.slow_speed(new_slow_speed)
         print(abs(error))
@@ -131,7 +199,7 @@ class Arreter(AsyncCommande):
 
 # Stratégie composite pour faire suivre au robot un chemin polygonal
 class PolygonStrategy(AsyncCommande):
-    def __init__(self, n, adapter, side_length_cm, vitesse_avance, vitesse_rotation):
+    def __init__(self, n, adapter, side_length_cm, vitesse_avance, vitesse_rotation, acceleration=None):
         super().__init__(adapter)
         if n < 3:
             raise ValueError("Au moins 3 côtés sont requis.")
@@ -139,8 +207,8 @@ class PolygonStrategy(AsyncCommande):
         self.commands = []
         turning_angle = math.radians(90)
         for i in range(n):
-            self.commands.append(Avancer(side_length_cm, vitesse_avance, adapter))
-            self.commands.append(Tourner(turning_angle, vitesse_rotation, adapter))
+            self.commands.append(Avancer(side_length_cm, vitesse_avance, adapter, acceleration=acceleration))
+            self.commands.append(Tourner(turning_angle, vitesse_rotation, adapter, acceleration=acceleration))
             self.logger.info(f"Côté {i+1} ajouté.")
         self.commands.append(Arreter(adapter))
         self.current_index = 0
@@ -167,6 +235,222 @@ class PolygonStrategy(AsyncCommande):
         return self.finished
 
 
+def polygone_points(n, side_length_cm):
+    """
+    Sommets d'un polygone régulier parcouru en tournant à droite,
+    exprimés dans le repère de départ du robot (x vers l'avant).
+    Le dernier point referme le polygone sur le point de départ.
+    """
+    exterior = 2 * math.pi / n
+    points = [(0.0, 0.0)]
+    x, y = 0.0, 0.0
+    for i in range(n):
+        x += side_length_cm * math.cos(i * exterior)
+        y += side_length_cm * math.sin(i * exterior)
+        points.append((x, y))
+    return points
+
+
+# Commande de suivi de chemin par poursuite pure (pure pursuit)
+class SuivreChemin(AsyncCommande):
+    """
+    Suit une polyligne de points de passage sans s'arrêter aux coins.
+
+    À chaque step, la pose est intégrée à partir des encodeurs (même modèle
+    d'arc que la simulation), un point cible est pris à `lookahead_cm` devant
+    la projection du robot sur le chemin, et les deux roues reçoivent la
+    vitesse qui place le robot sur l'arc passant par ce point.
+    La vitesse est réduite quand la courbure demandée augmente (coins)
+    et à l'approche du dernier point.
+    """
+    def __init__(self, waypoints, vitesse, adapter,
+                 lookahead_cm: float = 10.0,
+                 tolerance_cm: float = 1.0,
+                 curvature_gain: float = 15.0,
+                 vitesse_min_ratio: float = 0.2,
+                 pose_initiale=(0.0, 0.0, 0.0),
+                 wheel_radius: float = 2.5,
+                 wheel_base: float = 20.0):
+        super().__init__(adapter)
+        if len(waypoints) < 2:
+            raise ValueError("Au moins 2 points de passage sont requis.")
+        self.waypoints = [(float(x), float(y)) for x, y in waypoints]
+        self.vitesse = vitesse                  # Vitesse max en dps
+        self.lookahead_cm = lookahead_cm
+        self.tolerance_cm = tolerance_cm
+        self.curvature_gain = curvature_gain
+        self.vitesse_min_ratio = vitesse_min_ratio
+        self.wheel_radius = wheel_radius        # Rayon de la roue en cm
+        self.wheel_base = wheel_base            # Entraxe en cm
+        self.pose = tuple(pose_initiale)        # (x, y, angle) estimés
+        self.started = False
+        self.finished = False
+        self.logger = logging.getLogger("strategy.SuivreChemin")
+
+        # Longueurs cumulées pour la distance restante le long du chemin
+        self.segment_lengths = [math.dist(a, b) for a, b in zip(self.waypoints, self.waypoints[1:])]
+        self.remaining_after = [0.0] * len(self.segment_lengths)
+        for i in range(len(self.segment_lengths) - 2, -1, -1):
+            self.remaining_after[i] = self.remaining_after[i + 1] + self.segment_lengths[i + 1]
+        self.segment_index = 0
+        self.segment_t = 0.0
+
+    def start(self):
+        positions = self.adapter.get_motor_positions()
+        self.last_left = positions["left"]
+        self.last_right = positions["right"]
+        self.started = True
+        self.logger.info(f"Suivi de chemin démarré: {len(self.waypoints)} points")
+
+    def _update_pose(self):
+        positions = self.adapter.get_motor_positions()
+        left, right = positions["left"], positions["right"]
+        d_left = math.radians(left - self.last_left) * self.wheel_radius
+        d_right = math.radians(right - self.last_right) * self.wheel_radius
+        self.last_left, self.last_right = left, right
+        x, y, angle = self.pose
+        x, y, angle = arc_update(x, y, angle, d_left, d_right, self.wheel_base)
+        self.pose = (x, y, normalize_angle(angle))
+
+    def _project(self, x, y):
+        """Avance l'index de segment (jamais en arrière) jusqu'à la projection du robot."""
+        last = len(self.segment_lengths) - 1
+        while True:
+            (ax, ay), (bx, by) = self.waypoints[self.segment_index], self.waypoints[self.segment_index + 1]
+            length = self.segment_lengths[self.segment_index]
+            if length == 0:
+                t = 1.0
+            else:
+                t = ((x - ax) * (bx - ax) + (y - ay) * (by - ay)) / (length * length)
+            if t >= 1.0 and self.segment_index < last:
+                self.segment_index += 1
+                self.segment_t = 0.0
+                continue
+            self.segment_t = min(max(t, self.segment_t), 1.0)
+            return
+
+    def _lookahead_point(self):
+        i = self.segment_index
+        (ax, ay), (bx, by) = self.waypoints[i], self.waypoints[i + 1]
+        distance = self.lookahead_cm + self.segment_t * self.segment_lengths[i]
+        while i < len(self.segment_lengths) - 1 and distance > self.segment_lengths[i]:
+            distance -= self.segment_lengths[i]
+            i += 1
+        (ax, ay), (bx, by) = self.waypoints[i], self.waypoints[i + 1]
+        length = self.segment_lengths[i]
+        ratio = 1.0 if length == 0 else min(distance / length, 1.0)
+        return ax + ratio * (bx - ax), ay + ratio * (by - ay)
+
+    def remaining_distance(self):
+        i = self.segment_index
+        return (1.0 - self.segment_t) * self.segment_lengths[i] + self.remaining_after[i]
+
+    def step(self, delta_time):
+        if self.finished:
+            return True
+        if not self.started:
+            self.start()
+        self._update_pose()
+        x, y, angle = self.pose
+        self._project(x, y)
+
+        goal_x, goal_y = self.waypoints[-1]
+        remaining = self.remaining_distance()
+        if remaining <= self.tolerance_cm or (
+                self.segment_index == len(self.segment_lengths) - 1 and self.segment_t >= 1.0):
+            self.adapter.set_motor_speed("left", 0)
+            self.adapter.set_motor_speed("right", 0)
+            self.finished = True
+            self.logger.info(f"Chemin terminé | écart final: {math.hypot(goal_x - x, goal_y - y):.2f} cm")
+            return True
+
+        # Point cible exprimé dans le repère du robot
+        target_x, target_y = self._lookahead_point()
+        dx, dy = target_x - x, target_y - y
+        local_x = math.cos(angle) * dx + math.sin(angle) * dy
+        local_y = -math.sin(angle) * dx + math.cos(angle) * dy
+        dist2 = local_x * local_x + local_y * local_y
+        curvature = 0.0 if dist2 == 0 else 2 * local_y / dist2
+
+        # Vitesse linéaire (cm/s) réduite dans les virages et en fin de chemin
+        v_max = math.radians(self.vitesse) * self.wheel_radius
+        ratio = 1.0 / (1.0 + self.curvature_gain * abs(curvature))
+        ratio = min(ratio, remaining / (2 * self.lookahead_cm))
+        v = v_max * max(ratio, self.vitesse_min_ratio)
+        # Pas plus d'un pas de temps de trajet au-delà du but
+        if delta_time > 0:
+            v = min(v, remaining / delta_time)
+
+        # Même convention que la simulation : omega = (v_gauche - v_droite) / entraxe
+        omega = v * curvature
+        left_velocity = v + omega * self.wheel_base / 2
+        right_velocity = v - omega * self.wheel_base / 2
+        self.adapter.set_motor_speed("left", math.degrees(left_velocity / self.wheel_radius))
+        self.adapter.set_motor_speed("right", math.degrees(right_velocity / self.wheel_radius))
+        return False
+
+    def is_finished(self):
+        return self.finished
+
+
+# Variante de PolygonStrategy sans arrêt aux coins
+class PolygonPursuitStrategy(AsyncCommande):
+    """
+    Polygone parcouru d'un seul SuivreChemin, sans arrêt ni pivot aux coins.
+
+    Carré de 500 cm à 1050 dps, boucle de 50 Hz en temps réel : 51,3 s (45,7 s
+    sans le virage final) contre 63,6 s pour PolygonStrategy (260 dps en
+    rotation). Le point visé à lookahead_cm devant le robot fait couper chaque
+    coin : 3,0 cm pour 10 cm.
+
+    Le chemin finit dans la direction du dernier côté (-90° pour un carré) ;
+    avec end_at_start_heading (par défaut), un Tourner final ramène le robot au
+    cap de départ, comme PolygonStrategy. L'angle de ce virage est calculé à la
+    fin du chemin, d'après la pose estimée par SuivreChemin.
+    """
+    def __init__(self, n, adapter, side_length_cm, vitesse_avance, lookahead_cm=10.0,
+                 end_at_start_heading=True, vitesse_rotation=260, acceleration=None):
+        super().__init__(adapter)
+        if n < 3:
+            raise ValueError("Au moins 3 côtés sont requis.")
+        self.logger = logging.getLogger("strategy.PolygonPursuitStrategy")
+        self.path = SuivreChemin(polygone_points(n, side_length_cm), vitesse_avance, adapter,
+                                 lookahead_cm=lookahead_cm)
+        self.commands = [self.path]
+        # Angle fixé au démarrage du virage, une fois le chemin parcouru
+        self.final_turn = None
+        if end_at_start_heading:
+            self.final_turn = Tourner(0.0, vitesse_rotation, adapter, acceleration=acceleration)
+            self.commands.append(self.final_turn)
+        self.commands.append(Arreter(adapter))
+        self.logger.info(f"Polygone à {n} côtés de {side_length_cm} cm préparé.")
+        self.current_index = 0
+        self.finished = False
+
+    def start(self):
+        if self.commands:
+            self.commands[0].start()
+
+    def step(self, delta_time):
+        if self.current_index < len(self.commands):
+            cmd = self.commands[self.current_index]
+            if not cmd.is_finished():
+                cmd.step(delta_time)
+            if cmd.is_finished():
+                self.current_index += 1
+                if self.current_index < len(self.commands):
+                    next_cmd = self.commands[self.current_index]
+                    if next_cmd is self.final_turn:
+                        next_cmd.angle_rad = -normalize_angle(self.path.pose[2])
+                    next_cmd.start()
+        else:
+            self.finished = True
+        return self.finished
+
+    def is_finished(self):
+        return self.finished
+
+
 
 class StopBeforeWall(AsyncCommande):
     """
@@ -217,7 +501,8 @@ class FollowBeaconByCommandsStrategy(AsyncCommande):
                  forward_speed: float         = 2000.0,
                  turn_speed_deg: float        = 90.0,
                  skip_centering_radius: float = 4.0,
-                 forward_cone_frac: float     = 0.4):
+                 forward_cone_frac: float     = 0.4,
+                 max_detection_interval: float = 0.2):
         super().__init__(adapter)
         self.view                   = ursina_view
         self.target_radius_px       = target_radius_px
@@ -229,6 +514,18 @@ class FollowBeaconByCommandsStrategy(AsyncCommande):
         self.composite              = None
         self.finished               = False
         self.logger                 = logging.getLogger("strategy.FollowBeacon")
+        # Recherche dans une fenêtre autour de la dernière détection
+        self.tracker                = BeaconTracker(self.view.detect_blue_beacon)
+        self.turn_rate              = 0.0   # rad/s, pour élargir la fenêtre en pivot
+        self.wheel_radius           = 2.5
+        self.wheel_base             = 20.0
+        # Avec un worker de vision : dernière image analysée et instant de la
+        # dernière commande (les détections d'images antérieures sont périmées)
+        self.last_frame_id          = None
+        self.command_time           = 0.0
+        # Relèvement et rayon filtrés : prédiction entre les détections et
+        # pendant les détections manquées, détections espacées si l'estimation est sûre
+        self.kalman                 = BeaconKalman(max_interval=max_detection_interval)
 
     def start(self):
         print("[FollowBeacon] start() → moteurs à 0")
@@ -246,25 +543,45 @@ class FollowBeaconByCommandsStrategy(AsyncCommande):
             print("  → continuation de l’Avancer en cours")
             running = not self.composite.step(delta_time)
             print(f"    → still running: {running}")
+            if not running:
+                self.command_time = time.monotonic()
+                self.kalman.reset()     # Le rayon a changé pendant l'Avancer : nouvelle mesure
             return not running
 
-        # 2) Récupérer l'image et détecter le beacon
-        img = self.view.get_robot_camera_image()
-        if img is None:
-            print("  → pas d'image, arrêt")
-            self.adapter.set_motor_speed("left",  0)
-            self.adapter.set_motor_speed("right", 0)
-            return False
-
-        beacon = self.view.detect_blue_beacon(img)
+        # 2) Détection (dernier résultat du worker de vision, sinon analyse
+        #    synchrone quand le filtre en demande une), puis estimation filtrée
+        self.kalman.predict(delta_time, self.turn_rate)
+        worker = getattr(self.view, "vision_worker", None)
+        if worker is not None:
+            detection = worker.latest()
+            if (detection is not None and detection.frame_id != self.last_frame_id
+                    and detection.timestamp >= self.command_time):
+                self.last_frame_id = detection.frame_id
+                if detection.shape[1] != self.kalman.width:
+                    self.kalman.set_width(detection.shape[1])
+                self.kalman.update(detection.beacon)
+            elif not self.kalman.initialized:
+                return False    # Pas encore d'image analysée depuis la dernière commande
+        elif self.kalman.wants_detection(self.turn_rate):
+            img = self.view.get_robot_camera_image()
+            if img is None:
+                print("  → pas d'image, arrêt")
+                self.adapter.set_motor_speed("left",  0)
+                self.adapter.set_motor_speed("right", 0)
+                return False
+            if img.shape[1] != self.kalman.width:
+                self.kalman.set_width(img.shape[1])     # Focale et relèvement à la largeur réelle
+            elapsed = self.kalman.since_detection if self.kalman.initialized else delta_time
+            self.kalman.update(self.tracker.locate(img, self.turn_rate, elapsed))
+
+        w = self.kalman.width       # Largeur de la dernière image analysée
+        beacon = self.kalman.estimate()
         if beacon is None:
             print("  → beacon perdu, pivot recherche")
-            self.adapter.set_motor_speed("left",  self.turn_speed_deg)
-            self.adapter.set_motor_speed("right", -self.turn_speed_deg)
+            self._pivot(self.turn_speed_deg)
             return False
 
         radius_px, cx, _ = beacon
-        w = img.shape[1]
         center_px = w // 2
         print(f"  → beacon vu: radius={radius_px:.1f}px, cx={cx}")
 
@@ -276,6 +593,11 @@ class FollowBeaconByCommandsStrategy(AsyncCommande):
             self.composite.start()
             self.composite.step(delta_time)
             self.finished = True
+            if worker is not None:
+                self.logger.info(f"Worker de vision: {worker.stats()}")
+            else:
+                self.logger.info(f"Suivi ROI: {self.tracker.stats()}")
+            self.logger.info(f"Filtre de Kalman: {self.kalman.stats()}")
             return True
 
         # 3) Si très loin, avance droit par un seul Avancer
@@ -303,17 +625,26 @@ class FollowBeaconByCommandsStrategy(AsyncCommande):
         # 5) Sinon, on recentre par pivot avant d’avancer
         if cx > center_px:
             print("    → beacon à droite, pivot à DROITE")
-            self.adapter.set_motor_speed("left",  -self.turn_speed_deg)
-            self.adapter.set_motor_speed("right",  self.turn_speed_deg)
+            self._pivot(-self.turn_speed_deg)
         else:
             print("    → beacon à gauche, pivot à GAUCHE")
-            self.adapter.set_motor_speed("left",   self.turn_speed_deg)
-            self.adapter.set_motor_speed("right",  -self.turn_speed_deg)
+            self._pivot(self.turn_speed_deg)
         return False
 
+    def _pivot(self, left_speed_deg):
+        """Pivot sur place (roue droite opposée) et mémorise la vitesse de rotation."""
+        turn_rate = 2 * math.radians(left_speed_deg) * self.wheel_radius / self.wheel_base
+        if turn_rate != self.turn_rate:
+            self.command_time = time.monotonic()
+        self.adapter.set_motor_speed("left",   left_speed_deg)
+        self.adapter.set_motor_speed("right", -left_speed_deg)
+        self.turn_rate = turn_rate
+
     def _launch_forward(self, dist_cm, delta_time):
         """Crée un composite Avancer(dist_cm) et le démarre une fois pour toutes."""
         print(f"      → création de Avancer({dist_cm:.1f} cm)")
+        self.turn_rate = 0.0
+        self.kalman.reset()
         self.composite = CommandeComposite(self.adapter)
         self.composite.ajouter_commande(
             Avancer(dist_cm, self.forward_speed, self.adapter)
@@ -1,9 +1,13 @@
 from abc import ABC, abstractmethod
+from collections import namedtuple
 import math
+import time
 import cv2
 import numpy as np
 from PIL import Image
 import cv2
+from vision.color_lut import ColorClassifier
+from utils.geometry import arc_update
 # Interface d'adaptateur abstraite
 class RobotAdapter(ABC):
     @abstractmethod
@@ -34,53 +38,144 @@ class RobotAdapter(ABC):
         """Retourne la lecture du capteur de distance (en mm)."""
         pass
 
+# Lecture des encodeurs (en degrés) partagée par toutes les requêtes d'un même pas
+EncoderSnapshot = namedtuple("EncoderSnapshot", "timestamp left right")
+
+
 # Adaptateur pour le robot réel
 class RealRobotAdapter(RobotAdapter):
-    def __init__(self, real_robot):
+    def __init__(self, real_robot, max_snapshot_age=0.01, clock=time.monotonic, pose=(0.0, 0.0, 0.0)):
+        """
+        :param max_snapshot_age: durée (s) de validité de la lecture des encodeurs
+                                 quand la boucle n'appelle pas begin_tick() ;
+                                 None pour ne la renouveler qu'à chaque pas
+        :param pose: pose odométrique initiale (x, y en cm, angle en rad)
+        """
         self.robot = real_robot
+        # Pose odométrique, intégrée à chaque lecture des encodeurs (cm, rad)
+        self.x, self.y, self.direction_angle = pose
+        self.motor_speeds = {"left": 0.0, "right": 0.0}     # Dernières vitesses commandées
+        self._pose_encoders = None
+        self.max_snapshot_age = max_snapshot_age
+        self.clock = clock
+        self.snapshot = None
+        self.ticks = 0
+        self.bus_reads = 0
+        self.tick_bus_reads = 0         # Lectures du bus depuis le début du pas
+        self.max_tick_bus_reads = 0
         self.motor_positions = {"left": 0, "right": 0}
-        self.last_motor_positions = self.robot.get_motor_position()
+        self.last_motor_positions = tuple(self.read_encoders()[1:])
         self.fast_wheel=None
         self.slow_wheel=None
         self.distance=0
+        # Classification des couleurs de balise en une passe (table précalculée)
+        self.color_classifier = ColorClassifier()
     
     def set_motor_speed(self, motor: str, speed: float):
-        port = 1 if motor == "left" else 2
+        # Les commandes de virage nomment les roues "MOTOR_LEFT" / "MOTOR_RIGHT"
+        left = motor in ("left", "MOTOR_LEFT")
+        port = self.robot.MOTOR_LEFT if left else self.robot.MOTOR_RIGHT
         self.robot.set_motor_dps(port, speed)
+        self.motor_speeds["left" if left else "right"] = speed
     
-    def get_motor_positions(self) -> dict:
+    # --- Encodeurs : une transaction sur le bus par pas de contrôle -------------
+    def begin_tick(self):
+        """Début d'un pas de contrôle : la prochaine requête relira les encodeurs."""
+        self.ticks += 1
+        self.tick_bus_reads = 0
+        self.snapshot = None
+
+    def refresh(self) -> EncoderSnapshot:
+        """Lit les encodeurs sur le bus et remplace la lecture du pas."""
         left, right = self.robot.get_motor_position()
-        return {"left": left, "right": right}
+        self.bus_reads += 1
+        self.tick_bus_reads += 1
+        self.max_tick_bus_reads = max(self.max_tick_bus_reads, self.tick_bus_reads)
+        self.snapshot = EncoderSnapshot(self.clock(), left, right)
+        self._update_pose(self.snapshot)
+        return self.snapshot
+
+    def read_encoders(self) -> EncoderSnapshot:
+        """Lecture des encodeurs du pas courant, relue seulement si elle a expiré."""
+        snapshot = self.snapshot
+        if (snapshot is None or self.max_snapshot_age is not None
+                and self.clock() - snapshot.timestamp > self.max_snapshot_age):
+            snapshot = self.refresh()
+        return snapshot
+
+    # --- Pose odométrique --------------------------------------------------------
+    def _update_pose(self, snapshot):
+        """Intègre le déplacement depuis la lecture précédente, avec le modèle d'arc de la simulation."""
+        previous, self._pose_encoders = self._pose_encoders, (snapshot.left, snapshot.right)
+        if previous is None:
+            return
+        # Degrés de roue → cm (WHEEL_DIAMETER et WHEEL_BASE_WIDTH en mm)
+        radius_cm = self.robot.WHEEL_DIAMETER / 20.0
+        left_distance = math.radians(snapshot.left - previous[0]) * radius_cm
+        right_distance = math.radians(snapshot.right - previous[1]) * radius_cm
+        self.x, self.y, self.direction_angle = arc_update(
+            self.x, self.y, self.direction_angle, left_distance, right_distance,
+            self.robot.WHEEL_BASE_WIDTH / 10.0)
+
+    def set_pose(self, x, y, angle):
+        """Recale la pose odométrique (par ex. sur la position de départ de la carte)."""
+        self.x, self.y, self.direction_angle = x, y, angle
+
+    def get_state(self) -> dict:
+        """État au format de RobotModel.get_state, sans autre lecture que celle du pas."""
+        self.read_encoders()
+        return {
+            'x': self.x,
+            'y': self.y,
+            'angle': self.direction_angle,
+            'left_speed': self.motor_speeds["left"],
+            'right_speed': self.motor_speeds["right"]
+        }
+
+    def stats(self) -> dict:
+        return {"ticks": self.ticks, "bus_reads": self.bus_reads,
+                "reads_per_tick": self.bus_reads / self.ticks if self.ticks else 0.0,
+                "max_reads_per_tick": self.max_tick_bus_reads}
+
+    def get_motor_positions(self) -> dict:
+        snapshot = self.read_encoders()
+        return {"left": snapshot.left, "right": snapshot.right}
     
  
     def calculer_distance_parcourue(self) -> float:
-        # Récupère les positions actuelles des encodeurs (en degrés)
-        new_positions = self.robot.get_motor_position()
+        # Récupère les positions des encodeurs du pas courant (en degrés)
+        snapshot = self.read_encoders()
+        new_positions = (snapshot.left, snapshot.right)
+        if self.last_motor_positions is None:
+            self.last_motor_positions = new_positions
         # Calcul des variations d'angle pour chaque roue 
         delta_left = new_positions[0] - self.last_motor_positions[0]
         delta_right = new_positions[1] - self.last_motor_positions[1]
-        # Conversion des variations d'angle en distance parcourue (en mètres)
-        # math.radians() convertit les degrés en radians
-        left_distance = math.radians(delta_left) * self.robot.WHEEL_DIAMETER / 2.0
-        right_distance = math.radians(delta_right) * self.robot.WHEEL_DIAMETER / 2.0
+        # Conversion des variations d'angle en distance parcourue (en cm, comme Avancer)
+        # math.radians() convertit les degrés en radians, WHEEL_DIAMETER est en mm
+        left_distance = math.radians(delta_left) * self.robot.WHEEL_DIAMETER / 20.0
+        right_distance = math.radians(delta_right) * self.robot.WHEEL_DIAMETER / 20.0
 
         # Mise à jour de la distance totale parcourue : moyenne des distances des deux roues
-        print(f" Avant Distance parcourue (m) : {self.distance:.2f}")
+        print(f" Avant Distance parcourue (cm) : {self.distance:.2f}")
         self.distance += (left_distance + right_distance) / 2
 
         # Mise à jour des positions précédentes pour la prochaine lecture
         self.last_motor_positions = new_positions
 
         # Affiche la distance cumulée parcourue par le robot
-        print(f"Distance parcourue (m) : {self.distance:.2f}")
+        print(f"Distance parcourue (cm) : {self.distance:.2f}")
 
         # Retourne la distance cumulée parcourue par le robot
         return self.distance
 
 
     def resetDistance(self):
-       print(f"Distance parcourue (m) a la fin de la phase avancer : {self.distance:.2f}")
+       print(f"Distance parcourue (cm) a la fin de la phase avancer : {self.distance:.2f}")
        self.distance=0
+       # Référence reprise à la prochaine mesure : la rotation des roues pendant
+       # un virage (entre deux Avancer) ne compte pas dans le côté suivant
+       self.last_motor_positions = None
 
     def decide_turn_direction(self,angle_rad,base_speed):
 
@@ -110,6 +205,10 @@ class RealRobotAdapter(RobotAdapter):
 
         return angle
     
+    def get_distance(self):
+        """Retourne la lecture du capteur de distance (en mm)."""
+        return self.robot.get_distance()
+
     def slow_speed(self,new_slow_speed):
         self.set_motor_speed(self.slow_wheel, new_slow_speed)
     def detect_multicolor_beacon(self, img_array=None):
@@ -122,56 +221,8 @@ class RealRobotAdapter(RobotAdapter):
         if img_array is None:
             return {}
 
-        # Flip vertical si nécessaire
-        frame = np.flipud(img_array)
-
-        # Conversion RGB → BGR → HSV
-        bgr = cv2.cvtColor(frame, cv2.COLOR_RGB2BGR)
-        hsv = cv2.cvtColor(bgr, cv2.COLOR_BGR2HSV)
-
-        # Définir les plages HSV pour chaque couleur
-        color_ranges = {
-            "blue":   ((100, 150, 50), (140, 255, 255)),
-            "red1":   ((0, 150, 50),   (10, 255, 255)),    # bas du rouge
-            "red2":   ((170, 150, 50), (180, 255, 255)),   # haut du rouge
-            "green":  ((40, 100, 50),  (80, 255, 255)),
-            "yellow": ((20, 100, 100), (35, 255, 255))
-        }
-
-        detected = {}
-
-        for color in ["blue", "green", "yellow"]:
-            lower, upper = color_ranges[color]
-            mask = cv2.inRange(hsv, np.array(lower), np.array(upper))
-
-            # Nettoyage
-            kernel = np.ones((5,5), np.uint8)
-            mask = cv2.morphologyEx(mask, cv2.MORPH_OPEN,  kernel)
-            mask = cv2.morphologyEx(mask, cv2.MORPH_CLOSE, kernel)
-
-            contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
-            if contours:
-                c = max(contours, key=cv2.contourArea)
-                (cx, cy), radius = cv2.minEnclosingCircle(c)
-                if radius > 5:
-                    detected[color] = (radius, int(cx), int(cy))
-
-        # Gestion spéciale du rouge (deux plages HSV à fusionner)
-        mask_red1 = cv2.inRange(hsv, np.array(color_ranges["red1"][0]), np.array(color_ranges["red1"][1]))
-        mask_red2 = cv2.inRange(hsv, np.array(color_ranges["red2"][0]), np.array(color_ranges["red2"][1]))
-        mask_red = cv2.bitwise_or(mask_red1, mask_red2)
-
-        mask_red = cv2.morphologyEx(mask_red, cv2.MORPH_OPEN,  kernel)
-        mask_red = cv2.morphologyEx(mask_red, cv2.MORPH_CLOSE, kernel)
-
-        contours, _ = cv2.findContours(mask_red, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
-        if contours:
-            c = max(contours, key=cv2.contourArea)
-            (cx, cy), radius = cv2.minEnclosingCircle(c)
-            if radius > 5:
-                detected["red"] = (radius, int(cx), int(cy))
-
-        return detected
+        # Une seule passe pour toutes les couleurs (image retournée verticalement)
+        return self.color_classifier.detect(img_array)
     
     def get_robot_camera_image(self):
         return self.get_image()
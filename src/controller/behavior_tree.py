@@ -0,0 +1,345 @@
+import time
+import logging
+from collections import deque
+from controller.StrategyAsync import AsyncCommande, FollowBeaconByCommandsStrategy, StopBeforeWall
+
+# Statuts renvoyés par les noeuds
+SUCCESS = "success"
+FAILURE = "failure"
+RUNNING = "running"
+
+
+class TickContext:
+    """
+    Contexte d'un tick : pas de temps, échéance et rapport des noeuds
+    reportés (budget épuisé) ou trop lents.
+    """
+    def __init__(self, delta_time, budget_s):
+        self.delta_time = delta_time
+        self.budget_s = budget_s
+        self.deadline = time.perf_counter() + budget_s
+        self.deferred = 0        # Nombre de noeuds non exécutés faute de temps
+        self.overruns = []       # [(nom, durée)] des noeuds dépassant le budget à eux seuls
+
+    def expired(self) -> bool:
+        return time.perf_counter() >= self.deadline
+
+
+class Node:
+    """Noeud de base : tick() gère le budget, update() contient la logique."""
+    def __init__(self, name=None):
+        self.name = name or type(self).__name__
+        self.status = None
+
+    def tick(self, ctx: TickContext) -> str:
+        if ctx.expired():
+            # Reporté au prochain tick : RUNNING laisse les parents en l'état
+            ctx.deferred += 1
+            return RUNNING
+        self.status = self.update(ctx)
+        return self.status
+
+    def update(self, ctx: TickContext) -> str:
+        raise NotImplementedError
+
+    def halt(self):
+        """Interrompt un noeud en cours et le remet à zéro."""
+        self.status = None
+
+
+class CommandeLeaf(Node):
+    """
+    Feuille exécutant une AsyncCommande existante.
+
+    Accepte une commande ou une fabrique (callable sans argument renvoyant
+    une commande) ; la fabrique permet de relancer la feuille après un halt
+    ou dans un Retry.
+    """
+    def __init__(self, commande, name=None):
+        if isinstance(commande, AsyncCommande):
+            self.factory = None
+            self.commande = commande
+            name = name or type(commande).__name__
+        else:
+            self.factory = commande
+            self.commande = None
+        super().__init__(name)
+        self.started = False
+        self.logger = logging.getLogger("strategy.BehaviorTree")
+
+    def update(self, ctx):
+        if self.commande is None:
+            self.commande = self.factory()
+        t0 = time.perf_counter()
+        try:
+            if not self.started:
+                self.commande.start()
+                self.started = True
+            if not self.commande.is_finished():
+                self.commande.step(ctx.delta_time)
+        except Exception as e:
+            self.logger.error(f"{self.name}: échec de la commande ({e})")
+            return FAILURE
+        finally:
+            elapsed = time.perf_counter() - t0
+            if elapsed > ctx.budget_s:
+                ctx.overruns.append((self.name, elapsed))
+        return SUCCESS if self.commande.is_finished() else RUNNING
+
+    def halt(self):
+        super().halt()
+        if self.commande is not None and self.started and not self.commande.is_finished():
+            adapter = self.commande.adapter
+            if adapter is not None:
+                adapter.set_motor_speed("left", 0)
+                adapter.set_motor_speed("right", 0)
+        self.started = False
+        if self.factory is not None:
+            self.commande = None
+
+
+class Condition(Node):
+    """Feuille booléenne : SUCCESS si le prédicat est vrai, FAILURE sinon."""
+    def __init__(self, predicate, name=None):
+        super().__init__(name)
+        self.predicate = predicate
+
+    def update(self, ctx):
+        return SUCCESS if self.predicate() else FAILURE
+
+
+class Sequence(Node):
+    """Exécute les enfants dans l'ordre ; échoue au premier échec."""
+    def __init__(self, children, name=None):
+        super().__init__(name)
+        self.children = list(children)
+        self.index = 0
+
+    def update(self, ctx):
+        while self.index < len(self.children):
+            status = self.children[self.index].tick(ctx)
+            if status == RUNNING:
+                return RUNNING
+            if status == FAILURE:
+                self.index = 0
+                return FAILURE
+            self.index += 1
+        self.index = 0
+        return SUCCESS
+
+    def halt(self):
+        super().halt()
+        for child in self.children:
+            child.halt()
+        self.index = 0
+
+
+class Selector(Node):
+    """Essaie les enfants dans l'ordre ; réussit au premier succès."""
+    def __init__(self, children, name=None):
+        super().__init__(name)
+        self.children = list(children)
+        self.index = 0
+
+    def update(self, ctx):
+        while self.index < len(self.children):
+            status = self.children[self.index].tick(ctx)
+            if status == RUNNING:
+                return RUNNING
+            if status == SUCCESS:
+                self.index = 0
+                return SUCCESS
+            self.index += 1
+        self.index = 0
+        return FAILURE
+
+    def halt(self):
+        super().halt()
+        for child in self.children:
+            child.halt()
+        self.index = 0
+
+
+class Parallel(Node):
+    """
+    Exécute tous les enfants à chaque tick.
+
+    Réussit quand `success_threshold` enfants ont réussi (tous par défaut),
+    échoue dès que ce seuil n'est plus atteignable. Si le budget s'épuise,
+    le tick suivant commence par le premier enfant reporté.
+    """
+    def __init__(self, children, success_threshold=None, name=None):
+        super().__init__(name)
+        self.children = list(children)
+        self.success_threshold = success_threshold or len(self.children)
+        self.results = [None] * len(self.children)
+        self.first = 0
+
+    def update(self, ctx):
+        n = len(self.children)
+        for k in range(n):
+            i = (self.first + k) % n
+            if self.results[i] in (SUCCESS, FAILURE):
+                continue
+            if ctx.expired():
+                self.first = i
+                ctx.deferred += 1
+                break
+            status = self.children[i].tick(ctx)
+            if status != RUNNING:
+                self.results[i] = status
+        successes = self.results.count(SUCCESS)
+        failures = self.results.count(FAILURE)
+        if successes >= self.success_threshold:
+            self.halt()
+            return SUCCESS
+        if failures > n - self.success_threshold:
+            self.halt()
+            return FAILURE
+        return RUNNING
+
+    def halt(self):
+        super().halt()
+        for child, result in zip(self.children, self.results):
+            if result is None:
+                child.halt()
+        self.results = [None] * len(self.children)
+        self.first = 0
+
+
+class Guard(Node):
+    """
+    Réévalue la condition à chaque tick avant l'enfant : si elle devient
+    fausse, l'enfant est interrompu et le garde échoue.
+    Ex. « suivre la balise tant que get_distance() >= seuil ».
+    """
+    def __init__(self, condition, child, name=None):
+        super().__init__(name)
+        self.condition = condition
+        self.child = child
+
+    def update(self, ctx):
+        if not self.condition():
+            self.child.halt()
+            return FAILURE
+        return self.child.tick(ctx)
+
+    def halt(self):
+        super().halt()
+        self.child.halt()
+
+
+class Retry(Node):
+    """Relance l'enfant après un échec, jusqu'à max_attempts tentatives."""
+    def __init__(self, child, max_attempts=3, name=None):
+        super().__init__(name)
+        self.child = child
+        self.max_attempts = max_attempts
+        self.attempts = 0
+
+    def update(self, ctx):
+        status = self.child.tick(ctx)
+        if status == FAILURE:
+            self.attempts += 1
+            self.child.halt()
+            if self.attempts < self.max_attempts:
+                return RUNNING
+        if status != RUNNING:
+            self.attempts = 0
+        return status
+
+    def halt(self):
+        super().halt()
+        self.child.halt()
+        self.attempts = 0
+
+
+class BehaviorTree(AsyncCommande):
+    """
+    Exécute un arbre de comportement comme une AsyncCommande.
+
+    Chaque step dispose d'un budget `budget_s` : une fois dépassé, les noeuds
+    restants sont reportés au step suivant (les composites gardent leur
+    position), ce qui borne la durée d'un step quelle que soit la taille de
+    l'arbre. Les noeuds reportés et les feuilles trop lentes sont comptés et
+    journalisés.
+    """
+    def __init__(self, root, adapter=None, budget_s=0.005, history=100):
+        super().__init__(adapter)
+        self.root = root
+        self.budget_s = budget_s
+        self.status = None
+        self.finished = False
+        self.ticks = 0
+        self.deferred_ticks = 0            # Ticks où au moins un noeud a été reporté
+        self.deferred_nodes = 0            # Total de noeuds reportés
+        self.overruns = deque(maxlen=history)   # (tick, nom, durée)
+        self.max_tick_time = 0.0
+        self.logger = logging.getLogger("strategy.BehaviorTree")
+
+    def start(self):
+        self.root.halt()
+        self.status = None
+        self.finished = False
+
+    def step(self, delta_time):
+        if self.finished:
+            return True
+        t0 = time.perf_counter()
+        ctx = TickContext(delta_time, self.budget_s)
+        self.status = self.root.tick(ctx)
+        self.ticks += 1
+        self.max_tick_time = max(self.max_tick_time, time.perf_counter() - t0)
+
+        if ctx.deferred:
+            self.deferred_ticks += 1
+            self.deferred_nodes += ctx.deferred
+            self.logger.debug(f"Tick {self.ticks}: {ctx.deferred} noeud(s) reporté(s)")
+        for name, elapsed in ctx.overruns:
+            self.overruns.append((self.ticks, name, elapsed))
+            self.logger.warning(f"Tick {self.ticks}: {name} a pris {elapsed * 1000:.1f} ms "
+                                f"(budget {self.budget_s * 1000:.1f} ms)")
+
+        if self.status != RUNNING:
+            self.finished = True
+            self.logger.info(f"Arbre terminé: {self.status}")
+        return self.finished
+
+    def is_finished(self):
+        return self.finished
+
+    def report(self) -> dict:
+        """Statistiques d'exécution de l'arbre."""
+        return {
+            "ticks": self.ticks,
+            "deferred_ticks": self.deferred_ticks,
+            "deferred_nodes": self.deferred_nodes,
+            "overruns": len(self.overruns),
+            "max_tick_ms": self.max_tick_time * 1000,
+        }
+
+
+class FollowBeaconUnlessWall(BehaviorTree):
+    """
+    Suit la balise tant que get_distance() >= distance_threshold ; sinon la
+    suite est interrompue et StopBeforeWall arrête le robot :
+
+        Selector(Guard(distance >= seuil, FollowBeacon), StopBeforeWall)
+
+    Les feuilles sont des fabriques : une nouvelle stratégie à chaque relance.
+    """
+    def __init__(self, adapter, view, distance_threshold=100.0, wall_speed_dps=1000.0,
+                 budget_s=0.005, **follow_options):
+        """
+        :param distance_threshold: distance (unités de adapter.get_distance()) sous laquelle on s'arrête
+        :param follow_options: paramètres de FollowBeaconByCommandsStrategy
+        """
+        self.distance_threshold = distance_threshold
+        follow = CommandeLeaf(lambda: FollowBeaconByCommandsStrategy(adapter, view, **follow_options),
+                              name="FollowBeacon")
+        stop = CommandeLeaf(lambda: StopBeforeWall(distance_threshold, wall_speed_dps, adapter),
+                            name="StopBeforeWall")
+        root = Selector([Guard(lambda: adapter.get_distance() >= distance_threshold, follow,
+                               name="SuivreBalise"),
+                         stop], name="BaliseSaufMur")
+        super().__init__(root, adapter, budget_s=budget_s)
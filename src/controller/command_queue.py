@@ -0,0 +1,110 @@
+import time
+import threading
+import logging
+from collections import deque
+
+
+class MotorCommandQueue:
+    """
+    File de commandes moteur appliquée par la simulation aux frontières de tick.
+
+    Chaque source (thread de stratégie, touches Tk/Ursina, saisie CLI...) a
+    sa propre deque : un seul producteur et un seul consommateur (le thread
+    de simulation), sans verrou sur le chemin d'envoi. Le verrou ne sert qu'à
+    l'enregistrement d'une source et au retrait des sources vides par apply()
+    (un thread terminé ne laisse pas sa deque derrière lui).
+
+    Une file pleine (maxlen) perd sa commande la plus ancienne : les pertes
+    sont comptées par source et signalées dans le journal.
+
+    Les commandes sont horodatées ; apply() les fusionne dans l'ordre des
+    horodatages et renvoie un nouveau dictionnaire de vitesses, que le
+    modèle installe en une seule affectation.
+    """
+
+    def __init__(self, maxlen=1024, history=256):
+        self._sources = {}                      # {source: deque[(t, moteur, valeur, relatif)]}
+        self._register_lock = threading.Lock()
+        self.maxlen = maxlen
+        self.history = deque(maxlen=history)    # Derniers lots appliqués (t_tick, [commandes])
+        self.applied = 0
+        self.dropped = {}                       # {source: commandes perdues, file pleine}
+        self.logger = logging.getLogger("simulation.commands")
+
+    def _queue_for(self, source):
+        queue = self._sources.get(source)
+        if queue is None:
+            with self._register_lock:
+                queue = self._sources.setdefault(source, deque(maxlen=self.maxlen))
+        return queue
+
+    def push(self, motor: str, value: float, relative: bool = False, source: str = None):
+        """
+        Envoie une commande.
+
+        :param relative: True pour ajouter value à la vitesse courante
+        :param source: nom de la source (par défaut le nom du thread appelant)
+        """
+        source = source or threading.current_thread().name
+        queue = self._queue_for(source)
+        if len(queue) == self.maxlen:
+            self._dropped(source)
+        queue.append((time.monotonic(), motor, value, relative))
+        if self._sources.get(source) is not queue:
+            # Retirée par apply() entre _queue_for() et append() : réinscrite avec sa commande
+            with self._register_lock:
+                self._sources.setdefault(source, queue)
+
+    def _dropped(self, source):
+        count = self.dropped.get(source, 0) + 1
+        self.dropped[source] = count
+        if count & (count - 1) == 0:        # 1, 2, 4, 8... : journal borné
+            self.logger.warning(f"File de {source} pleine ({self.maxlen}) : "
+                                f"{count} commande(s) perdue(s)")
+
+    def pending(self) -> int:
+        return sum(len(q) for q in list(self._sources.values()))
+
+    def apply(self, speeds: dict) -> dict:
+        """
+        Vide toutes les files et renvoie les vitesses résultantes
+        (le dictionnaire d'origine n'est pas modifié).
+        """
+        batch = []
+        idle = []
+        for source, queue in list(self._sources.items()):
+            if not queue:
+                idle.append(source)
+                continue
+            while True:
+                try:
+                    timestamp, motor, value, relative = queue.popleft()
+                except IndexError:
+                    break
+                batch.append((timestamp, source, motor, value, relative))
+        if idle:
+            # Vides depuis le tick précédent ; push() réinscrit une source retirée en pleine écriture
+            with self._register_lock:
+                for source in idle:
+                    queue = self._sources.get(source)
+                    if queue is not None and not queue:
+                        del self._sources[source]
+        if not batch:
+            return speeds
+
+        batch.sort(key=lambda command: command[0])
+        new_speeds = dict(speeds)
+        for _, _, motor, value, relative in batch:
+            new_speeds[motor] = new_speeds[motor] + value if relative else value
+        self.applied += len(batch)
+        self.history.append((time.monotonic(), batch))
+        self.logger.debug(f"{len(batch)} commande(s) appliquée(s): {new_speeds}")
+        return new_speeds
+
+    def stats(self) -> dict:
+        return {
+            "sources": len(self._sources),
+            "pending": self.pending(),
+            "applied": self.applied,
+            "dropped": sum(self.dropped.values()),
+        }
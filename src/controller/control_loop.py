@@ -0,0 +1,116 @@
+import time
+import bisect
+import atexit
+
+# Bornes des classes de l'histogramme (µs)
+HISTOGRAM_EDGES_US = (50, 100, 200, 500, 1000, 2000, 5000, 10000, 20000, 50000)
+
+
+class LatencyHistogram:
+    """Histogramme à classes fixes : ajout en O(log n) sans garder les échantillons."""
+
+    def __init__(self, edges_us=HISTOGRAM_EDGES_US):
+        self.edges = [edge * 1e-6 for edge in edges_us]
+        self.counts = [0] * (len(self.edges) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.maximum = 0.0
+
+    def add(self, value):
+        self.counts[bisect.bisect_right(self.edges, value)] += 1
+        self.count += 1
+        self.total += value
+        self.maximum = max(self.maximum, value)
+
+    def format(self, title) -> str:
+        if not self.count:
+            return f"{title}: aucun échantillon"
+        lines = [f"{title}: moyenne {self.total / self.count * 1e6:.0f} µs, "
+                 f"max {self.maximum * 1e6:.0f} µs"]
+        bounds = [0.0] + self.edges + [float("inf")]
+        width = max(self.counts)
+        for k, count in enumerate(self.counts):
+            if not count:
+                continue
+            high = "∞" if k == len(self.edges) else f"{bounds[k + 1] * 1e6:.0f}"
+            bar = "#" * max(1, round(40 * count / width))
+            lines.append(f"  {bounds[k] * 1e6:>6.0f} – {high:>6} µs {count:>7} {bar}")
+        return "\n".join(lines)
+
+
+class ControlLoop:
+    """
+    Boucle de contrôle cadencée sur des échéances absolues.
+
+    Le pas k démarre à t0 + k * period quelle que soit la durée des pas
+    précédents, et reçoit le temps réellement écoulé depuis le pas précédent.
+    Un pas qui finit après l'échéance suivante est un dépassement : les
+    échéances manquées sont sautées (pas de rafale de rattrapage).
+
+    Mesures : retard du démarrage de chaque pas sur son échéance (gigue, sur
+    l'horloge de la boucle) et durée de calcul du pas (temps réel).
+    Fonctionne avec time ou utils.clock.VirtualClock.
+    """
+
+    def __init__(self, period=0.02, clock=time, spin=0.0, report_at_exit=False):
+        """
+        :param spin: attente active (s) avant chaque échéance, pour une gigue
+                     inférieure à la résolution de sleep()
+        """
+        self.period = period
+        self.clock = clock
+        self.spin = spin
+        self.ticks = 0
+        self.overruns = 0
+        self.skipped = 0                # Échéances sautées après un dépassement
+        self.jitter = LatencyHistogram()
+        self.compute = LatencyHistogram()
+        if report_at_exit:
+            atexit.register(lambda: print(self.report()))
+
+    def _wait_until(self, deadline):
+        clock = self.clock
+        remaining = deadline - clock.monotonic()
+        if remaining - self.spin > 0:
+            clock.sleep(remaining - self.spin)
+        while clock.monotonic() < deadline:
+            pass
+
+    def run(self, step, until=None, max_ticks=None):
+        """
+        Appelle step(dt) à chaque période jusqu'à until() vrai (ou max_ticks pas).
+        :return: nombre de pas exécutés
+        """
+        clock = self.clock
+        deadline = clock.monotonic()
+        last_start = None
+        ticks = 0
+        while not (until is not None and until()) and (max_ticks is None or ticks < max_ticks):
+            self._wait_until(deadline)
+            start = clock.monotonic()
+            self.jitter.add(start - deadline)
+            dt = start - last_start if last_start is not None else self.period
+            last_start = start
+
+            compute_start = time.perf_counter()
+            step(dt)
+            self.compute.add(time.perf_counter() - compute_start)
+            ticks += 1
+
+            deadline += self.period
+            now = clock.monotonic()
+            if now > deadline:
+                self.overruns += 1
+                missed = int((now - deadline) / self.period) + 1
+                self.skipped += missed
+                deadline += missed * self.period
+        self.ticks += ticks
+        return ticks
+
+    def report(self) -> str:
+        return "\n".join([
+            f"Boucle {1 / self.period:.0f} Hz : {self.ticks} pas, {self.overruns} dépassement(s), "
+            f"{self.skipped} échéance(s) sautée(s)",
+            self.jitter.format("Gigue au démarrage"),
+            self.compute.format("Durée de calcul"),
+        ])
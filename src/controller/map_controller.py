@@ -75,9 +75,7 @@ class MapController:
                 self.map_model.current_shape = self.map_view.create_line((x, y), (x, y), fill="red", width=2)  # Access map_view
             else:
                 self.map_model.current_points.append((x, y))  # Access map_model
-                if len(self.map_model.current_points) > 1:
-                    line_id = self.map_view.create_line(self.map_model.current_points[-2], (x, y), fill="red", width=2)  # Access map_view, map_model
-                    self.map_model.current_lines.append(line_id)  # Access map_model
+                self.map_view.update_line(self.map_model.current_shape, self.map_model.current_points)  # Same polyline, one more vertex
 
     def add_obstacle(self):
         """Adds an obstacle to the map model."""
@@ -96,8 +94,7 @@ class MapController:
         if self.mode == 'set_obstacles' and self.map_model.current_shape:  # Access map_model
             # Drawing a new obstacle
             self.map_model.current_points.append((x, y))  # Access map_model
-            line_id = self.map_view.create_line(self.map_model.current_points[-2], self.map_model.current_points[-1], fill="red", width=2)  # Access map_view, map_model
-            self.map_model.current_lines.append(line_id)  # Access map_model
+            self.map_view.update_line(self.map_model.current_shape, self.map_model.current_points)  # Same polyline, one more vertex
 
 
     def is_shape_closed(self):
@@ -113,7 +110,8 @@ class MapController:
         """Finalizes the drawn shape and adds it as an obstacle."""
         if self.mode == 'set_obstacles' and self.map_model.current_shape:  # Access map_model
             if self.is_shape_closed():
-                # Delete the temporary lines used for drawing
+                # Delete the temporary polyline used for drawing
+                self.map_view.delete_item(self.map_model.current_shape)  # Access map_view
                 for line_id in self.map_model.current_lines:  # Access map_model
                     self.map_view.delete_item(line_id)  # Access map_view
                 self.map_model.current_lines = []  # Access map_model
@@ -0,0 +1,543 @@
+import math
+import heapq
+import logging
+from controller.StrategyAsync import AsyncCommande, SuivreChemin, Arreter
+from utils.geometry import scale_polygon, segment_intersects_polygon, ray_cast
+
+# Facteur de collision utilisé par MapModel.is_collision (point_in_polygon)
+COLLISION_SCALE = 1.5
+
+
+def _obstacle_points(value):
+    """Les obstacles sont stockés soit en (points, polygon_id, line_ids), soit en points."""
+    if isinstance(value, tuple):
+        return value[0]
+    return value
+
+
+class PathCostMatrix:
+    """
+    Matrice des coûts de chemin entre des positions de la carte.
+
+    Le coût vaut la distance en ligne droite quand le segment est libre,
+    sinon la longueur du plus court chemin dans le graphe de visibilité
+    formé par les sommets (légèrement élargis) des obstacles.
+    La matrice écoute le MapModel : quand un obstacle change, le graphe de
+    visibilité est mis à jour pour cet obstacle seulement (arêtes qu'il coupe,
+    paires qu'il masquait), et seules les lignes dont un chemin peut être
+    touché sont recalculées. close() cesse l'écoute (sinon la carte garde la
+    matrice en vie et continue de la tenir à jour).
+    """
+
+    def __init__(self, map_model, positions, clearance=1.7):
+        self.map_model = map_model
+        self.positions = [tuple(p) for p in positions]
+        self.clearance = clearance      # Échelle des sommets de contournement (> COLLISION_SCALE)
+        self.logger = logging.getLogger("planner.PathCostMatrix")
+        self.obstacles = {}             # {id: (polygone de collision, bbox, sommets de contournement)}
+        # Graphe de visibilité, tenu à jour obstacle par obstacle. Nœuds : sommets
+        # de contournement (entiers >= 0) et positions (-1 - i).
+        self.vertices = {}              # {sommet: point}
+        self.vertex_owner = {}          # {sommet: obstacle qui l'a créé}
+        self.hidden = {}                # {sommet: obstacle qui le recouvre} (hors du graphe)
+        self.vertex_edges = {}          # {sommet: {sommet: distance}}
+        self.position_edges = [{} for _ in self.positions]   # {sommet: distance} par position
+        self.direct = {}                # {(i, j): distance} positions à vue directe, i < j
+        self.blocked = {}               # {obstacle: paires de nœuds qu'il masque}
+        self._next_vertex = 0
+        self.edge_tests = 0             # Segments testés contre les obstacles
+        for obstacle_id, value in map_model.obstacles.items():
+            self._add_obstacle(obstacle_id, _obstacle_points(value))
+        n = len(self.positions)
+        for i in range(n):
+            for j in range(i + 1, n):
+                self._connect(-1 - i, -1 - j)
+        self.costs = [[0.0] * n for _ in range(n)]
+        self.paths = {}                 # {(i, j): [points]} avec i < j
+        self.rows_recomputed = 0
+        self.recompute_rows(range(n))
+        map_model.add_event_listener(self.handle_map_event)
+
+    def close(self):
+        """Se désabonne des événements de la carte : la matrice n'est plus tenue à jour."""
+        self.map_model.remove_event_listener(self.handle_map_event)
+
+    # --- Obstacles et graphe de visibilité ---------------------------------
+    def _point(self, node):
+        return self.positions[-1 - node] if node < 0 else self.vertices[node]
+
+    def _blocker(self, a, b, obstacles=None):
+        """Un obstacle qui coupe le segment [a, b], ou None si le segment est libre."""
+        self.edge_tests += 1
+        min_x, max_x = min(a[0], b[0]), max(a[0], b[0])
+        min_y, max_y = min(a[1], b[1]), max(a[1], b[1])
+        for obstacle_id, (polygon, bbox, _) in (obstacles if obstacles is not None else self.obstacles.items()):
+            if max_x < bbox[0] or min_x > bbox[2] or max_y < bbox[1] or min_y > bbox[3]:
+                continue
+            if segment_intersects_polygon(a, b, polygon):
+                return obstacle_id
+        return None
+
+    def _is_free(self, a, b, obstacles=None):
+        return self._blocker(a, b, obstacles) is None
+
+    def _covering(self, point):
+        """Obstacle dont la zone de collision contient le point, ou None."""
+        for obstacle_id, (polygon, bbox, _) in self.obstacles.items():
+            if bbox[0] <= point[0] <= bbox[2] and bbox[1] <= point[1] <= bbox[3] \
+                    and ray_cast(point[0], point[1], polygon):
+                return obstacle_id
+        return None
+
+    def _active(self, node):
+        return node < 0 or node in self.vertex_edges
+
+    def _set_edge(self, a, b, d):
+        if b < 0:
+            self.direct[(-1 - a, -1 - b)] = d
+        elif a < 0:
+            self.position_edges[-1 - a][b] = d
+        else:
+            self.vertex_edges[a][b] = d
+            self.vertex_edges[b][a] = d
+
+    def _drop_edge(self, a, b):
+        if b < 0:
+            self.direct.pop((-1 - a, -1 - b), None)
+        elif a < 0:
+            self.position_edges[-1 - a].pop(b, None)
+        else:
+            self.vertex_edges[a].pop(b, None)
+            self.vertex_edges[b].pop(a, None)
+
+    def _connect(self, a, b):
+        """Teste la paire (a, b) : arête si libre, sinon rangée sous l'obstacle qui la masque."""
+        pa, pb = self._point(a), self._point(b)
+        blocker = self._blocker(pa, pb)
+        if blocker is None:
+            self._set_edge(a, b, math.dist(pa, pb))
+        else:
+            self.blocked[blocker].add((a, b))
+
+    def _activate(self, vertex):
+        """Ajoute un sommet au graphe : visibilité vers les autres sommets et les positions."""
+        others = list(self.vertex_edges)
+        self.vertex_edges[vertex] = {}
+        for other in others:
+            self._connect(vertex, other)
+        for i in range(len(self.positions)):
+            self._connect(-1 - i, vertex)
+
+    def _deactivate(self, vertex):
+        for other in self.vertex_edges.pop(vertex):
+            self.vertex_edges[other].pop(vertex, None)
+        for edges in self.position_edges:
+            edges.pop(vertex, None)
+
+    def _add_obstacle(self, obstacle_id, points):
+        polygon = scale_polygon(points, COLLISION_SCALE)
+        xs = [p[0] for p in polygon]
+        ys = [p[1] for p in polygon]
+        bbox = (min(xs), min(ys), max(xs), max(ys))
+        entry = (polygon, bbox, scale_polygon(points, self.clearance))
+        only = [(obstacle_id, entry)]
+        self.obstacles[obstacle_id] = entry
+        blocked = self.blocked[obstacle_id] = set()
+        # Seules les arêtes existantes qui le traversent sont testées (contre lui seul)
+        crossing = [(a, b) for a, edges in self.vertex_edges.items() for b in edges if a < b]
+        crossing += [(-1 - i, b) for i, edges in enumerate(self.position_edges) for b in edges]
+        crossing += [(-1 - i, -1 - j) for i, j in self.direct]
+        for a, b in crossing:
+            pa, pb = self._point(a), self._point(b)
+            if max(pa[0], pb[0]) < bbox[0] or min(pa[0], pb[0]) > bbox[2] \
+                    or max(pa[1], pb[1]) < bbox[1] or min(pa[1], pb[1]) > bbox[3]:
+                continue
+            if self._blocker(pa, pb, only) is not None:
+                self._drop_edge(a, b)
+                blocked.add((a, b))
+        # Sommets recouverts par le nouvel obstacle
+        for vertex in list(self.vertex_edges):
+            point = self.vertices[vertex]
+            if bbox[0] <= point[0] <= bbox[2] and bbox[1] <= point[1] <= bbox[3] \
+                    and ray_cast(point[0], point[1], polygon):
+                self._deactivate(vertex)
+                self.hidden[vertex] = obstacle_id
+        # Sommets de contournement du nouvel obstacle
+        for point in entry[2]:
+            vertex = self._next_vertex
+            self._next_vertex += 1
+            self.vertices[vertex] = point
+            self.vertex_owner[vertex] = obstacle_id
+            cover = self._covering(point)
+            if cover is None:
+                self._activate(vertex)
+            else:
+                self.hidden[vertex] = cover
+
+    def _remove_obstacle(self, obstacle_id):
+        entry = self.obstacles.pop(obstacle_id, None)
+        if entry is None:
+            return None
+        for vertex in [v for v, owner in self.vertex_owner.items() if owner == obstacle_id]:
+            if vertex in self.vertex_edges:
+                self._deactivate(vertex)
+            self.hidden.pop(vertex, None)
+            del self.vertices[vertex], self.vertex_owner[vertex]
+        # Seules les paires qu'il masquait sont retestées
+        for a, b in self.blocked.pop(obstacle_id):
+            if self._active(a) and self._active(b):
+                self._connect(a, b)
+        # Sommets qu'il recouvrait
+        for vertex in [v for v, cover in self.hidden.items() if cover == obstacle_id]:
+            cover = self._covering(self.vertices[vertex])
+            if cover is None:
+                del self.hidden[vertex]
+                self._activate(vertex)
+            else:
+                self.hidden[vertex] = cover
+        return entry
+
+    def _visible_from(self, i):
+        return self.position_edges[i].items()
+
+    # --- Calcul des lignes -----------------------------------------------
+    def _detour_paths(self, i, blocked):
+        """Dijkstra depuis la position i à travers les sommets ; renvoie {j: (coût, chemin)}."""
+        dist = {}
+        previous = {}
+        heap = []
+        for k, d in self._visible_from(i):
+            dist[k] = d
+            heapq.heappush(heap, (d, k))
+        done = set()
+        while heap:
+            d, u = heapq.heappop(heap)
+            if u in done:
+                continue
+            done.add(u)
+            for v, w in self.vertex_edges[u].items():
+                nd = d + w
+                if nd < dist.get(v, math.inf):
+                    dist[v] = nd
+                    previous[v] = u
+                    heapq.heappush(heap, (nd, v))
+        result = {}
+        for j in blocked:
+            best, last = math.inf, None
+            for k, d in self._visible_from(j):
+                if dist.get(k, math.inf) + d < best:
+                    best, last = dist[k] + d, k
+            if last is None:
+                result[j] = (math.inf, None)
+                continue
+            path = [self.positions[j], self.vertices[last]]
+            while last in previous:
+                last = previous[last]
+                path.append(self.vertices[last])
+            path.append(self.positions[i])
+            result[j] = (best, path[::-1])
+        return result
+
+    def recompute_rows(self, rows):
+        rows = set(rows)
+        for i in sorted(rows):
+            blocked = []
+            for j, target in enumerate(self.positions):
+                # Paire déjà traitée depuis l'autre ligne dans ce même calcul
+                if j == i or (j in rows and j < i):
+                    continue
+                d = self.direct.get((min(i, j), max(i, j)))
+                if d is not None:
+                    self._store(i, j, d, [self.positions[i], target])
+                else:
+                    blocked.append(j)
+            if blocked:
+                for j, (cost, path) in self._detour_paths(i, blocked).items():
+                    self._store(i, j, cost, path)
+        self.rows_recomputed += len(rows)
+
+    def _store(self, i, j, cost, path):
+        self.costs[i][j] = self.costs[j][i] = cost
+        if i < j:
+            self.paths[(i, j)] = path
+        else:
+            self.paths[(j, i)] = path[::-1] if path else None
+
+    def path(self, i, j):
+        """Polyligne du chemin de la position i à la position j."""
+        if i < j:
+            return self.paths[(i, j)]
+        path = self.paths[(j, i)]
+        return path[::-1] if path else None
+
+    # --- Mise à jour incrémentale ------------------------------------------
+    def _rows_crossing(self, obstacle_id):
+        """Lignes dont un chemin traverse le nouvel obstacle."""
+        only = [(obstacle_id, self.obstacles[obstacle_id])]
+        rows = set()
+        for (i, j), path in self.paths.items():
+            if path is None:
+                continue
+            if any(not self._is_free(a, b, only) for a, b in zip(path, path[1:])):
+                rows.add(i)
+        return rows
+
+    def _rows_near(self, entry):
+        """
+        Lignes dont un détour pourrait raccourcir quand cet obstacle disparaît ou
+        apporte ses sommets de contournement : un chemin plus court passant par
+        sa zone doit rester dans l'ellipse de foyers i, j et de grand axe égal
+        au coût actuel. La zone est la boîte des sommets de contournement, qui
+        contient celle de collision.
+        """
+        around = entry[2]
+        min_x, min_y = min(p[0] for p in around), min(p[1] for p in around)
+        max_x, max_y = max(p[0] for p in around), max(p[1] for p in around)
+
+        def to_bbox(p):
+            dx = max(min_x - p[0], 0.0, p[0] - max_x)
+            dy = max(min_y - p[1], 0.0, p[1] - max_y)
+            return math.hypot(dx, dy)
+
+        rows = set()
+        for (i, j), path in self.paths.items():
+            if path is not None and len(path) == 2:
+                continue
+            if path is None or to_bbox(self.positions[i]) + to_bbox(self.positions[j]) < self.costs[i][j]:
+                rows.add(i)
+        return rows
+
+    def handle_map_event(self, event_type, **kwargs):
+        if event_type == "obstacle_added":
+            self._add_obstacle(kwargs["obstacle_id"], kwargs["points"])
+            rows = self._rows_crossing(kwargs["obstacle_id"])
+            rows |= self._rows_near(self.obstacles[kwargs["obstacle_id"]])
+        elif event_type == "obstacle_removed":
+            entry = self._remove_obstacle(kwargs["obstacle_id"])
+            if entry is None:
+                return
+            rows = self._rows_near(entry)
+        elif event_type == "obstacle_moved":
+            rows = set()
+            entry = self._remove_obstacle(kwargs["obstacle_id"])
+            if entry is not None:
+                rows = self._rows_near(entry)
+            self._add_obstacle(kwargs["obstacle_id"], _obstacle_points(kwargs["new_points"]))
+            rows |= self._rows_crossing(kwargs["obstacle_id"])
+            rows |= self._rows_near(self.obstacles[kwargs["obstacle_id"]])
+        elif event_type == "map_reset":
+            for obstacle_id in list(self.obstacles):
+                self._remove_obstacle(obstacle_id)
+            rows = {i for (i, j), path in self.paths.items() if path is None or len(path) > 2}
+        else:
+            return
+        if rows:
+            self.recompute_rows(rows)
+            self.logger.info(f"{event_type}: {len(rows)} ligne(s) recalculée(s)")
+
+
+class MissionPlanner:
+    """
+    Planifie l'ordre de visite d'un ensemble de balises.
+
+    Heuristique du voyageur de commerce sur la matrice PathCostMatrix :
+    plus proche voisin depuis la position de départ, puis améliorations 2-opt
+    sur le chemin ouvert (le départ reste fixe).
+    """
+
+    def __init__(self, map_model, start, beacons):
+        """
+        :param start: position de départ du robot (x, y)
+        :param beacons: {nom: (x, y)}, par ex. les couleurs de detect_multicolor_beacon
+        """
+        self.names = list(beacons.keys())
+        self.matrix = PathCostMatrix(map_model, [start] + [beacons[n] for n in self.names])
+        self.logger = logging.getLogger("planner.MissionPlanner")
+
+    def close(self):
+        """Libère la matrice des coûts (plus de mise à jour sur les événements de la carte)."""
+        self.matrix.close()
+
+    def _route_cost(self, route):
+        costs = self.matrix.costs
+        return sum(costs[a][b] for a, b in zip(route, route[1:]))
+
+    def plan(self):
+        """Renvoie (ordre des noms de balises, coût total)."""
+        costs = self.matrix.costs
+        n = len(self.names) + 1
+        route = [0]
+        unvisited = set(range(1, n))
+        while unvisited:
+            last = route[-1]
+            nxt = min(unvisited, key=lambda j: costs[last][j])
+            route.append(nxt)
+            unvisited.remove(nxt)
+
+        # 2-opt : inverse route[i..k] tant que le coût diminue
+        improved = True
+        while improved:
+            improved = False
+            for i in range(1, n - 1):
+                for k in range(i + 1, n):
+                    a, b = route[i - 1], route[i]
+                    c = route[k]
+                    d = route[k + 1] if k + 1 < n else None
+                    before = costs[a][b] + (costs[c][d] if d is not None else 0.0)
+                    after = costs[a][c] + (costs[b][d] if d is not None else 0.0)
+                    if after < before - 1e-9:
+                        route[i:k + 1] = reversed(route[i:k + 1])
+                        improved = True
+        self.route = route
+        total = self._route_cost(route)
+        self.logger.info(f"Ordre de visite: {[self.names[i - 1] for i in route[1:]]} ({total:.1f} cm)")
+        return [self.names[i - 1] for i in route[1:]], total
+
+    def legs(self):
+        """Polylignes des étapes de la dernière route planifiée."""
+        return [self.matrix.path(a, b) for a, b in zip(self.route, self.route[1:])]
+
+
+class MissionStrategy(AsyncCommande):
+    """
+    Exécute une mission multi-balises : chaque étape est un SuivreChemin
+    créé au moment de son démarrage, à partir de la pose estimée en fin
+    d'étape précédente. Les étapes sont fixées à la construction ; le
+    planificateur est fermé (close) à la fin de la mission ou à son arrêt.
+    """
+
+    def __init__(self, planner, adapter, vitesse, start_angle=0.0, lookahead_cm=10.0):
+        super().__init__(adapter)
+        self.planner = planner
+        self.vitesse = vitesse
+        self.lookahead_cm = lookahead_cm
+        self.order, self.total_cost = planner.plan()
+        self.legs = planner.legs()
+        if any(leg is None for leg in self.legs):
+            planner.close()
+            raise ValueError("Au moins une balise est inaccessible.")
+        self.pose = (*planner.matrix.positions[0], start_angle)
+        self.current = None
+        self.leg_index = 0
+        self.finished = False
+        self.logger = logging.getLogger("strategy.MissionStrategy")
+
+    def _start_leg(self):
+        leg = self.legs[self.leg_index]
+        self.current = SuivreChemin(leg, self.vitesse, self.adapter,
+                                    lookahead_cm=self.lookahead_cm, pose_initiale=self.pose)
+        self.current.start()
+
+    def start(self):
+        if self.legs:
+            self._start_leg()
+        else:
+            self.current = Arreter(self.adapter)
+            self.current.start()
+
+    def step(self, delta_time):
+        if self.finished:
+            return True
+        if self.current is None:
+            self.start()
+        if not self.current.is_finished():
+            self.current.step(delta_time)
+        if self.current.is_finished():
+            if isinstance(self.current, SuivreChemin):
+                self.pose = self.current.pose
+                self.logger.info(f"Balise {self.order[self.leg_index]} atteinte.")
+            self.leg_index += 1
+            if self.leg_index < len(self.legs):
+                self._start_leg()
+            else:
+                self.finished = True
+        if self.finished:
+            self.planner.close()
+        return self.finished
+
+    def stop(self):
+        """Interrompt la mission : moteurs à l'arrêt, planificateur fermé."""
+        self.adapter.set_motor_speed("left", 0)
+        self.adapter.set_motor_speed("right", 0)
+        self.finished = True
+        self.planner.close()
+
+    def is_finished(self):
+        return self.finished
+
+
+if __name__ == "__main__":
+    # Coût d'un événement d'obstacle (graphe incrémental) contre un calcul complet,
+    # et vérification que les deux donnent les mêmes coûts
+    import time
+    import random
+    from model.map_model import MapModel
+
+    def square(cx, cy, half):
+        return [(cx - half, cy - half), (cx + half, cy - half), (cx + half, cy + half), (cx - half, cy + half)]
+
+    def fresh_costs(obstacles, positions):
+        copy = MapModel()
+        for obstacle_id, points in obstacles.items():
+            copy.add_obstacle(obstacle_id, points, None, [])
+        t0 = time.perf_counter()
+        matrix = PathCostMatrix(copy, positions)
+        return matrix.costs, time.perf_counter() - t0
+
+    rng = random.Random(1)
+    map_model = MapModel()
+    obstacles = {}
+    for k in range(10):
+        obstacles[f"obstacle_{k}"] = square(rng.uniform(100, 900), rng.uniform(100, 900), 20)
+        map_model.add_obstacle(f"obstacle_{k}", obstacles[f"obstacle_{k}"], None, [])
+    positions = []
+    while len(positions) < 41:
+        p = (rng.uniform(0, 1000), rng.uniform(0, 1000))
+        if not map_model.is_collision(*p):
+            positions.append(p)
+    matrix = PathCostMatrix(map_model, positions)
+
+    timings = {"obstacle_added": [], "obstacle_removed": [], "obstacle_moved": []}
+    full = []
+    mismatches = 0
+    for n in range(60):
+        # Autour de 10 obstacles
+        kind = rng.choice(list(timings))
+        if len(obstacles) < 9:
+            kind = "obstacle_added"
+        elif len(obstacles) > 11:
+            kind = "obstacle_removed"
+        if kind == "obstacle_added":
+            obstacle_id = f"obstacle_{10 + n}"
+            points = square(rng.uniform(100, 900), rng.uniform(100, 900), 20)
+            if any(math.dist(p, points[0]) < 60 for p in positions):
+                continue
+            obstacles[obstacle_id] = points
+            t0 = time.perf_counter()
+            map_model.add_obstacle(obstacle_id, points, None, [])
+        elif kind == "obstacle_removed":
+            obstacle_id = rng.choice(list(obstacles))
+            del obstacles[obstacle_id]
+            t0 = time.perf_counter()
+            map_model.remove_obstacle(obstacle_id)
+        else:
+            obstacle_id = rng.choice(list(obstacles))
+            (x, y) = obstacles[obstacle_id][0]
+            points = square(x + 20 + rng.uniform(-40, 40), y + 20 + rng.uniform(-40, 40), 20)
+            if any(math.dist(p, points[0]) < 60 for p in positions):
+                continue
+            obstacles[obstacle_id] = points
+            t0 = time.perf_counter()
+            map_model.move_obstacle(obstacle_id, points)
+        timings[kind].append(time.perf_counter() - t0)
+        costs, elapsed = fresh_costs(obstacles, positions)
+        full.append(elapsed)
+        mismatches += sum(abs(a - b) > 1e-6 for row_a, row_b in zip(costs, matrix.costs)
+                          for a, b in zip(row_a, row_b))
+
+    print(f"{len(positions)} positions, ~{len(obstacles)} obstacles, {len(matrix.vertex_edges)} sommets actifs")
+    for kind, samples in timings.items():
+        if samples:
+            print(f"{kind:17}: {sum(samples) / len(samples) * 1000:.1f} ms en moyenne ({len(samples)} événements)")
+    print(f"calcul complet   : {sum(full) / len(full) * 1000:.1f} ms en moyenne")
+    print(f"coûts différents du calcul complet : {mismatches}")
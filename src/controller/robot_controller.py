@@ -36,25 +36,21 @@ class RobotController:
         self.robot_model.set_motor_speed("right", 0)
 
     def increase_left_speed(self):
-        new_speed = self.robot_model.motor_speeds["left"] + self.SPEED_STEP
-        self.robot_model.set_motor_speed("left", new_speed)
+        self.robot_model.change_motor_speed("left", self.SPEED_STEP)
 
     def decrease_left_speed(self):
-        new_speed = self.robot_model.motor_speeds["left"] - self.SPEED_STEP
-        self.robot_model.set_motor_speed("left", new_speed)
+        self.robot_model.change_motor_speed("left", -self.SPEED_STEP)
 
     def increase_right_speed(self):
-        new_speed = self.robot_model.motor_speeds["right"] + self.SPEED_STEP
-        self.robot_model.set_motor_speed("right", new_speed)
+        self.robot_model.change_motor_speed("right", self.SPEED_STEP)
 
     def decrease_right_speed(self):
-        new_speed = self.robot_model.motor_speeds["right"] - self.SPEED_STEP
-        self.robot_model.set_motor_speed("right", new_speed)
+        self.robot_model.change_motor_speed("right", -self.SPEED_STEP)
 
     def move_forward(self):
-        self.robot_model.set_motor_speed("left", self.robot_model.motor_speeds["left"] + self.SPEED_STEP)
-        self.robot_model.set_motor_speed("right", self.robot_model.motor_speeds["right"] + self.SPEED_STEP)
+        self.robot_model.change_motor_speed("left", self.SPEED_STEP)
+        self.robot_model.change_motor_speed("right", self.SPEED_STEP)
 
     def move_backward(self):
-        self.robot_model.set_motor_speed("left", self.robot_model.motor_speeds["left"] - self.SPEED_STEP)
-        self.robot_model.set_motor_speed("right", self.robot_model.motor_speeds["right"] - self.SPEED_STEP)
+        self.robot_model.change_motor_speed("left", -self.SPEED_STEP)
+        self.robot_model.change_motor_speed("right", -self.SPEED_STEP)
@@ -2,10 +2,14 @@
 import threading
 import time
 import math
-import logging
 from typing import Callable, List
 from model.robot import RobotModel
 from controller.robot_controller import RobotController
+from controller.command_queue import MotorCommandQueue
+from controller.control_loop import ControlLoop
+from utils.geometry import arc_update
+from utils.trajectory_recorder import TrajectoryRecorder
+from model.trajectory_store import TrajectoryStore
 
 # Multiplicateur pour accélérer la simulation
 SPEED_MULTIPLIER = 8.0
@@ -34,14 +38,15 @@ class SimulationController:
         self.simulation_running = False
         self.listeners: List[Callable[[dict], None]] = []
         self.update_interval = 0.02  # Intervalle de mise à jour : 50 Hz
+        self.control_loop = None     # Cadence et gigue de la dernière simulation
+        # Commandes moteur appliquées en début de tick pendant la simulation
+        self.command_queue = MotorCommandQueue()
 
-        # Logger pour la traçabilité des positions du robot
-        self.position_logger = logging.getLogger('traceability.positions')
-        self.position_logger.setLevel(logging.INFO)
-        position_handler = logging.FileHandler('traceability_positions.log')
-        position_formatter = logging.Formatter('%(asctime)s - Position: %(message)s')
-        position_handler.setFormatter(position_formatter)
-        self.position_logger.addHandler(position_handler)
+        # Traçabilité des positions du robot : trace binaire écrite hors du thread
+        # de simulation (export texte : self.trajectory_recorder.export_text())
+        self.trajectory_recorder = TrajectoryRecorder('traceability_positions.traj')
+        # Trajectoire affichée par les vues : queue complète + historique décimé
+        self.trajectory = TrajectoryStore()
 
 
         self.simulation_thread = None
@@ -67,20 +72,20 @@ class SimulationController:
             self.robot_model.x, self.robot_model.y = start_pos
 
         self.simulation_running = True
+        self.robot_model.command_queue = self.command_queue
         self.simulation_thread = threading.Thread(target=self.run_loop, daemon=True)
         self.simulation_thread.start()
 
     def run_loop(self):
         """Boucle principale de la simulation, s'exécutant dans un thread séparé."""
-        last_time = time.time()
-        while self.simulation_running:
-            current_time = time.time()
-            delta_time = current_time - last_time
-            last_time = current_time
-
+        def tick(delta_time):
+            self.robot_model.apply_pending_commands()
             self.update_physics(delta_time)
             self._notify_listeners()
-            time.sleep(self.update_interval)
+
+        # Échéances absolues : la cadence ne dérive pas avec la durée du pas
+        self.control_loop = ControlLoop(self.update_interval)
+        self.control_loop.run(tick, until=lambda: not self.simulation_running)
 
     def update_physics(self, delta_time: float):
         """
@@ -91,38 +96,24 @@ class SimulationController:
         if delta_time <= 0:
             return
 
-        # --- Calcul des vitesses à partir des moteurs ---
-        left_speed = self.robot_model.motor_speeds["left"]
-        right_speed = self.robot_model.motor_speeds["right"]
+        # --- Calcul des vitesses à partir des moteurs (snapshot du tick) ---
+        speeds = self.robot_model.motor_speeds
+        left_speed = speeds["left"]
+        right_speed = speeds["right"]
 
         # Conversion des vitesses (degrés/s) en vitesse linéaire (cm/s)
         left_velocity = (left_speed / 360.0) * (2 * math.pi * self.WHEEL_RADIUS)
         right_velocity = (right_speed / 360.0) * (2 * math.pi * self.WHEEL_RADIUS)
 
-        # Calcul de la vitesse linéaire et angulaire
-        linear_velocity = (left_velocity + right_velocity) / 2
-        angular_velocity = (left_velocity - right_velocity) / self.WHEEL_BASE_WIDTH
-
         # Application du multiplicateur de vitesse pour la simulation
         effective_delta = delta_time 
 
-        # --- Mise à jour de la position en fonction du type de mouvement ---
-        if left_velocity == right_velocity:
-            # Mouvement en ligne droite
-            new_x = self.robot_model.x + linear_velocity * math.cos(self.robot_model.direction_angle) * effective_delta
-            new_y = self.robot_model.y + linear_velocity * math.sin(self.robot_model.direction_angle) * effective_delta
-            new_angle = self.robot_model.direction_angle
-        else:
-            # Mouvement circulaire (arc de cercle)
-            delta_theta = angular_velocity * effective_delta
-            R = (self.WHEEL_BASE_WIDTH / 2) * (left_velocity + right_velocity) / (left_velocity - right_velocity)
-            # Centre de rotation
-            center_x = self.robot_model.x - R * math.sin(self.robot_model.direction_angle)
-            center_y = self.robot_model.y + R * math.cos(self.robot_model.direction_angle)
-            # Nouvelle position calculée sur l'arc
-            new_x = center_x + R * math.sin(self.robot_model.direction_angle + delta_theta)
-            new_y = center_y - R * math.cos(self.robot_model.direction_angle + delta_theta)
-            new_angle = self.robot_model.direction_angle + delta_theta
+        # --- Mise à jour de la position sur l'arc de cercle (ou ligne droite) ---
+        new_x, new_y, new_angle = arc_update(
+            self.robot_model.x, self.robot_model.y, self.robot_model.direction_angle,
+            left_velocity * effective_delta, right_velocity * effective_delta,
+            self.WHEEL_BASE_WIDTH
+        )
 
         # Mise à jour du modèle du robot
         self.robot_model.update_position(new_x, new_y, new_angle)
@@ -131,16 +122,21 @@ class SimulationController:
         
 
         # Enregistrement de la position actuelle pour la traçabilité
-        self.position_logger.info(
-            f"x={self.robot_model.x:.2f}, y={self.robot_model.y:.2f}, angle={math.degrees(self.robot_model.direction_angle):.2f}°"
-        )
+        robot = self.robot_model
+        self.trajectory_recorder.record(time.time(), robot.x, robot.y, robot.direction_angle,
+                                        left_speed, right_speed)
+        self.trajectory.append(robot.x, robot.y, robot.direction_angle)
 
     def stop_simulation(self):
         """Arrête la simulation et le contrôleur du robot."""
         self.simulation_running = False
-        self.robot_controller.stop()
-        if self.simulation_thread:
+        if self.simulation_thread and self.simulation_thread is not threading.current_thread():
             self.simulation_thread.join()
+        # Plus de tick : on applique ce qui reste et on repasse en écriture directe
+        self.robot_model.apply_pending_commands()
+        self.robot_model.command_queue = None
+        self.robot_controller.stop()
+        self.trajectory_recorder.flush()
 
     def reset_simulation(self):
         """
@@ -150,3 +146,4 @@ class SimulationController:
         self.stop_simulation()
         self.robot_model.x, self.robot_model.y = self.map_model.start_position
         self.robot_model.direction_angle = 0.0
+        self.trajectory.clear()
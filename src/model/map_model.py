@@ -18,6 +18,11 @@ class MapModel:
     def add_event_listener(self, listener):
         self.event_listeners.append(listener)
 
+    def remove_event_listener(self, listener):
+        """Retire un écouteur ajouté par add_event_listener (sans effet s'il n'y est plus)."""
+        if listener in self.event_listeners:
+            self.event_listeners.remove(listener)
+
     def notify_event_listeners(self, event_type, **kwargs):
         for listener in self.event_listeners:
             listener(event_type, **kwargs)
@@ -19,6 +19,8 @@ class RobotModel(RobotAdapter):
         self.distance=0
         self.fast_wheel = None
         self.slow_wheel=None
+        # File de commandes installée par la simulation pendant qu'elle tourne
+        self.command_queue = None
 
     def update_position(self, new_x: float, new_y: float, new_angle: float):
         """Met à jour la position après vérification des collisions"""
@@ -30,21 +32,41 @@ class RobotModel(RobotAdapter):
     def set_motor_speed(self, motor: str, dps: int):
         """Définit la vitesse d'un moteur avec validation"""
         if motor in ["left", "right"]:
-            self.motor_speeds[motor] = dps
+            queue = self.command_queue
+            if queue is not None:
+                queue.push(motor, dps)
+            else:
+                self.motor_speeds[motor] = dps
+
+    def change_motor_speed(self, motor: str, delta: float):
+        """Ajoute delta à la vitesse d'un moteur (appliqué au prochain tick si la simulation tourne)"""
+        if motor in ["left", "right"]:
+            queue = self.command_queue
+            if queue is not None:
+                queue.push(motor, delta, relative=True)
+            else:
+                self.motor_speeds[motor] += delta
+
+    def apply_pending_commands(self):
+        """Applique d'un bloc les commandes en attente (appelé par la simulation en début de tick)"""
+        if self.command_queue is not None:
+            self.motor_speeds = self.command_queue.apply(self.motor_speeds)
 
     def get_state(self) -> dict:
         """Retourne un snapshot de l'état courant"""
+        speeds = self.motor_speeds
         return {
             'x': self.x,
             'y': self.y,
             'angle': self.direction_angle,
-            'left_speed': self.motor_speeds["left"],
-            'right_speed': self.motor_speeds["right"]
+            'left_speed': speeds["left"],
+            'right_speed': speeds["right"]
         }
     def update_motors(self, delta_time):
         """Met à jour les positions des moteurs avec le temps écoulé"""
+        speeds = self.motor_speeds
         for motor in ["left", "right"]:
-            self.motor_positions[motor] += self.motor_speeds[motor] * delta_time
+            self.motor_positions[motor] += speeds[motor] * delta_time
 
 
     
@@ -87,6 +109,8 @@ class RobotModel(RobotAdapter):
     
     def resetDistance(self):
         self.distance=0
+        # Les rotations de roue antérieures (virage) ne comptent pas dans la suite
+        self.last_motor_positions = self.motor_positions.copy()
     def decide_turn_direction(self,angle_rad,base_speed):
 
         speed_ratio = 0.5
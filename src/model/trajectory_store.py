@@ -0,0 +1,189 @@
+import math
+import threading
+import numpy as np
+
+
+def _decimate(points, anchor, distance, angle):
+    """
+    Garde les points à plus de `distance` (cm) ou `angle` (rad) du dernier gardé.
+    :param anchor: dernier point gardé avant `points` (ou None)
+    """
+    kept = []
+    if anchor is None:
+        kept.append(0)
+        ax, ay, aa = points[0]
+    else:
+        ax, ay, aa = anchor
+    d2 = distance * distance
+    for k, (x, y, a) in enumerate(points.tolist()):
+        if (x - ax) ** 2 + (y - ay) ** 2 >= d2 or abs(math.remainder(a - aa, math.tau)) >= angle:
+            kept.append(k)
+            ax, ay, aa = x, y, a
+    return points[kept]
+
+
+class _Level:
+    """Historique décimé à une tolérance donnée, dans un tableau préalloué."""
+
+    def __init__(self, size, distance, angle):
+        self.points = np.empty((size, 3))
+        self.count = 0
+        self.distance = distance
+        self.angle = angle
+
+    def last(self):
+        return self.points[self.count - 1] if self.count else None
+
+
+class TrajectoryStore:
+    """
+    Trajectoire du robot partagée par les vues, en mémoire bornée.
+
+    Les `tail_size` derniers points sont gardés à pleine résolution. La moitié
+    la plus ancienne de la queue, quand elle est pleine, passe dans le niveau 0
+    de l'historique, décimé par seuil de distance / d'angle ; un niveau plein
+    cède de même sa moitié ancienne au niveau suivant, à tolérance double.
+    Le passé lointain est donc de plus en plus grossier, et le nombre de points
+    gardés croît comme le logarithme de la longueur parcourue.
+
+    Les vues interrogent points() à leur propre résolution d'affichage.
+    Écrit par le thread de simulation, lu par les threads des vues.
+    """
+
+    def __init__(self, tail_size=2048, level_size=2048, min_distance=0.5,
+                 min_angle=math.radians(3), max_levels=12):
+        """
+        :param min_distance: tolérance du niveau 0 (cm), doublée à chaque niveau
+        :param min_angle: tolérance angulaire du niveau 0 (rad), doublée à chaque niveau
+        """
+        self.tail_size = tail_size
+        self.level_size = level_size
+        self.min_distance = min_distance
+        self.min_angle = min_angle
+        self.max_levels = max_levels
+        self._lock = threading.Lock()
+        self.clear()
+
+    def clear(self):
+        with self._lock:
+            self._tail = np.empty((self.tail_size, 3))
+            self._tail_count = 0
+            self._levels = []               # _levels[0] : historique le plus récent
+            self.appended = 0               # Points reçus depuis clear()
+            self.revision = 0               # Change à chaque modification
+
+    def append(self, x, y, angle):
+        """Ajoute une pose (appelé à chaque pas de simulation ; robot immobile : ignorée)."""
+        with self._lock:
+            count = self._tail_count
+            if count and self._tail[count - 1, 0] == x and self._tail[count - 1, 1] == y \
+                    and self._tail[count - 1, 2] == angle:
+                return
+            self._tail[count] = (x, y, angle)
+            count += 1
+            if count == self.tail_size:
+                half = count // 2
+                self._push(0, self._tail[:half])
+                self._tail[:count - half] = self._tail[half:count]
+                count -= half
+            self._tail_count = count
+            self.appended += 1
+            self.revision += 1
+
+    def _push(self, depth, points):
+        """Range `points` (plus récents que tout le niveau `depth`) dans ce niveau."""
+        if depth == len(self._levels):
+            scale = 2 ** depth
+            self._levels.append(_Level(self.level_size, self.min_distance * scale, self.min_angle * scale))
+        level = self._levels[depth]
+        kept = _decimate(points, level.last(), level.distance, level.angle)
+        while level.count + len(kept) > self.level_size:
+            if level.count > 1 and depth + 1 < self.max_levels:
+                half = level.count // 2
+                self._push(depth + 1, level.points[:half])
+                level.points[:level.count - half] = level.points[half:level.count]
+                level.count -= half
+            else:
+                # Dernier niveau (ou lot trop dense) : redécimation à tolérance double
+                level.distance *= 2
+                level.angle *= 2
+                coarse = _decimate(level.points[:level.count], None, level.distance, level.angle) \
+                    if level.count else level.points[:0]
+                level.count = len(coarse)
+                level.points[:level.count] = coarse
+            kept = _decimate(points, level.last(), level.distance, level.angle)
+        level.points[level.count:level.count + len(kept)] = kept
+        level.count += len(kept)
+
+    def __len__(self):
+        """Nombre de points gardés."""
+        with self._lock:
+            return self._tail_count + sum(level.count for level in self._levels)
+
+    def points(self, resolution=0.0, max_points=None) -> np.ndarray:
+        """
+        Trajectoire gardée, du plus ancien au plus récent : tableau (n, 2) de (x, y).
+
+        :param resolution: taille (cm) d'un pixel de la vue ; les points consécutifs
+                           dans la même case ne sont rendus qu'une fois
+        :param max_points: au plus ce nombre de points (sous-échantillonnage régulier)
+        """
+        with self._lock:
+            parts = [level.points[:level.count, :2] for level in reversed(self._levels)]
+            parts.append(self._tail[:self._tail_count, :2])
+            points = np.concatenate(parts)
+        if resolution > 0 and len(points) > 2:
+            cells = np.floor(points / resolution)
+            keep = np.empty(len(points), bool)
+            keep[0] = keep[-1] = True
+            keep[1:-1] = (cells[1:-1] != cells[:-2]).any(axis=1)
+            points = points[keep]
+        if max_points is not None and len(points) > max_points:
+            points = points[np.linspace(0, len(points) - 1, max_points).astype(int)]
+        return points
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "appended": self.appended,
+                "tail": self._tail_count,
+                "levels": [level.count for level in self._levels],
+                "kept": self._tail_count + sum(level.count for level in self._levels),
+            }
+
+
+if __name__ == "__main__":
+    # Trois heures de simulation à 50 Hz : coût d'ajout, mémoire et écart à la trajectoire complète
+    import time
+
+    n = 3 * 3600 * 50
+    t = np.arange(n) * 0.02
+    # Promenade : lignes droites et virages successifs
+    angle = np.cumsum(np.where((t // 4) % 2 == 0, 0.0, 0.02))
+    x = 400 + np.cumsum(np.cos(angle)) * 0.2
+    y = 300 + np.cumsum(np.sin(angle)) * 0.2
+
+    store = TrajectoryStore()
+    t0 = time.perf_counter()
+    for pose in zip(x.tolist(), y.tolist(), angle.tolist()):
+        store.append(*pose)
+    append_cost = (time.perf_counter() - t0) / n
+    stats = store.stats()
+    print(f"{n} poses ajoutées : {append_cost * 1e6:.2f} µs par ajout, {stats['kept']} points gardés "
+          f"({stats['kept'] * 24 / 1024:.0f} Kio au lieu de {n * 24 / 1024 ** 2:.0f} Mio), niveaux {stats['levels']}")
+
+    for resolution, max_points in ((0.0, None), (2.0, None), (2.0, 2000)):
+        t0 = time.perf_counter()
+        points = store.points(resolution, max_points)
+        elapsed = time.perf_counter() - t0
+        print(f"points(resolution={resolution}, max_points={max_points}) : {len(points)} points "
+              f"en {elapsed * 1e3:.2f} ms")
+
+    # Écart : distance de chaque pose réelle (un échantillon) au point gardé le plus proche
+    kept = store.points()
+    sample = np.stack([x, y], axis=1)[::997]
+    gaps = np.array([np.min(np.hypot(*(kept - p).T)) for p in sample])
+    recent = sample[-len(sample) // 100:]
+    recent_gaps = np.array([np.min(np.hypot(*(kept - p).T)) for p in recent])
+    print(f"écart à la trajectoire complète : médiane {np.median(gaps):.2f} cm, max {gaps.max():.1f} cm "
+          f"(dernier pourcent : max {recent_gaps.max():.2f} cm)")
@@ -0,0 +1,65 @@
+"""
+Protocole binaire entre une stratégie et le robot (TCP, petit-boutiste).
+
+Chaque message est un en-tête (type u8, numéro de séquence u32) suivi d'une
+charge de taille fixe selon le type :
+
+  client → serveur
+    MOTOR   port u8, dps f32      vitesse d'un moteur, sans réponse (pipeline)
+    READ    -                     demande une télémétrie immédiate
+    STREAM  rate f32              télémétrie poussée à `rate` Hz (0 : arrêt)
+  serveur → client
+    HELLO     diamètre f32, entraxe f32 (mm) ; envoyé à la connexion
+    TELEMETRY ack u32, t f64, gauche f64, droite f64 (degrés), distance f64 (mm)
+
+`ack` est le numéro du dernier message du client traité avant la lecture des
+encodeurs : le client sait ainsi quelles commandes la télémétrie reflète sans
+accusé de réception par commande.
+"""
+import struct
+
+HEADER = struct.Struct("<BI")
+
+MOTOR = 1
+READ = 2
+STREAM = 3
+HELLO = 128
+TELEMETRY = 129
+
+PAYLOADS = {
+    MOTOR: struct.Struct("<Bf"),
+    READ: struct.Struct("<"),
+    STREAM: struct.Struct("<f"),
+    HELLO: struct.Struct("<ff"),
+    TELEMETRY: struct.Struct("<Idddd"),
+}
+
+
+def pack(kind, sequence, *values) -> bytes:
+    return HEADER.pack(kind, sequence) + PAYLOADS[kind].pack(*values)
+
+
+class MessageReader:
+    """Découpe un flux d'octets en messages (type, séquence, valeurs)."""
+
+    def __init__(self):
+        self.buffer = bytearray()
+
+    def feed(self, data):
+        """Ajoute les octets reçus et renvoie la liste des messages complets."""
+        self.buffer += data
+        messages = []
+        offset = 0
+        buffer = self.buffer
+        while len(buffer) - offset >= HEADER.size:
+            kind, sequence = HEADER.unpack_from(buffer, offset)
+            payload = PAYLOADS.get(kind)
+            if payload is None:
+                raise ValueError(f"Type de message inconnu: {kind}")
+            end = offset + HEADER.size + payload.size
+            if len(buffer) < end:
+                break
+            messages.append((kind, sequence, payload.unpack_from(buffer, offset + HEADER.size)))
+            offset = end
+        del buffer[:offset]
+        return messages
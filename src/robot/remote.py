@@ -0,0 +1,291 @@
+import time
+import socket
+import logging
+import threading
+from robot import protocol
+from robot.protocol import pack, MessageReader
+
+
+def _configure(sock):
+    # Messages de quelques octets : pas d'attente de Nagle
+    sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+
+class RobotServer:
+    """
+    Expose un robot (MockRobot2IN013, ou le vrai robot) sur TCP avec le
+    protocole de robot.protocol. Un thread par client ; les accès au robot
+    sont sérialisés. La télémétrie poussée (STREAM) est cadencée en temps
+    réel, ses horodatages viennent de l'horloge du robot.
+    """
+
+    def __init__(self, robot, host="127.0.0.1", port=0, clock=time):
+        self.robot = robot
+        self.clock = clock
+        self._lock = threading.Lock()
+        self.sock = socket.create_server((host, port))
+        self.address = self.sock.getsockname()
+        self.running = False
+        self.logger = logging.getLogger("robot.RobotServer")
+
+    def start(self):
+        self.running = True
+        threading.Thread(target=self._accept_loop, name="robot-server", daemon=True).start()
+        self.logger.info(f"Serveur du robot sur {self.address[0]}:{self.address[1]}")
+        return self
+
+    def stop(self):
+        self.running = False
+        self.sock.close()
+
+    def _accept_loop(self):
+        while self.running:
+            try:
+                conn, peer = self.sock.accept()
+            except OSError:
+                break
+            _configure(conn)
+            threading.Thread(target=self._serve, args=(conn,), name=f"robot-client-{peer[1]}",
+                             daemon=True).start()
+
+    def _telemetry(self, ack) -> bytes:
+        with self._lock:
+            left, right = self.robot.get_motor_position()
+            distance = self.robot.get_distance()
+            t = self.clock.monotonic()
+        return pack(protocol.TELEMETRY, 0, ack, t, left, right, distance)
+
+    def _serve(self, conn):
+        send_lock = threading.Lock()
+        stream = {"rate": 0.0, "ack": 0, "thread": None}
+        closed = threading.Event()
+
+        def send(data):
+            with send_lock:
+                conn.sendall(data)
+
+        def stream_loop():
+            # Échéances absolues : pas de dérive de la cadence
+            deadline = time.monotonic()
+            while not closed.is_set() and stream["rate"] > 0:
+                deadline += 1.0 / stream["rate"]
+                closed.wait(max(deadline - time.monotonic(), 0.0))
+                try:
+                    send(self._telemetry(stream["ack"]))
+                except OSError:
+                    break
+            stream["thread"] = None
+
+        robot = self.robot
+        reader = MessageReader()
+        send(pack(protocol.HELLO, 0, robot.WHEEL_DIAMETER, robot.WHEEL_BASE_WIDTH))
+        try:
+            while True:
+                data = conn.recv(65536)
+                if not data:
+                    break
+                replies = []
+                for kind, sequence, values in reader.feed(data):
+                    stream["ack"] = sequence
+                    if kind == protocol.MOTOR:
+                        with self._lock:
+                            robot.set_motor_dps(*values)
+                    elif kind == protocol.READ:
+                        replies.append(self._telemetry(sequence))
+                    elif kind == protocol.STREAM:
+                        stream["rate"] = values[0]
+                        if stream["rate"] > 0 and stream["thread"] is None:
+                            stream["thread"] = threading.Thread(target=stream_loop, daemon=True)
+                            stream["thread"].start()
+                # Une seule écriture pour toutes les réponses du lot reçu
+                if replies:
+                    send(b"".join(replies))
+        except (OSError, ValueError) as e:
+            self.logger.warning(f"Connexion fermée: {e}")
+        finally:
+            closed.set()
+            conn.close()
+
+
+class RemoteRobot:
+    """
+    Robot distant, utilisable à la place du robot réel par RealRobotAdapter.
+
+    Les commandes moteur partent sans attendre de réponse (pipeline) ; une
+    lecture des encodeurs ou du capteur de distance (transportés ensemble
+    par la télémétrie) coûte un aller-retour, ou aucun si la télémétrie
+    est poussée par le serveur (stream_rate en Hz) : on renvoie alors la
+    dernière reçue.
+    """
+
+    MOTOR_LEFT = 1
+    MOTOR_RIGHT = 2
+
+    def __init__(self, host="127.0.0.1", port=8765, stream_rate=0.0, timeout=1.0):
+        self.timeout = timeout
+        self.sock = socket.create_connection((host, port), timeout=timeout)
+        self.sock.settimeout(None)
+        _configure(self.sock)
+        self.sequence = 0
+        self.telemetry = None           # (ack, t, gauche, droite, distance)
+        self.round_trips = 0
+        self.messages_sent = 0
+        self.bytes_sent = 0
+        self.telemetry_received = 0
+        self._send_lock = threading.Lock()
+        self._condition = threading.Condition()
+        self._hello = None
+        self._receiver = threading.Thread(target=self._receive_loop, name="remote-robot", daemon=True)
+        self._receiver.start()
+        with self._condition:
+            if not self._condition.wait_for(lambda: self._hello is not None, timeout):
+                raise TimeoutError("Pas de réponse du serveur du robot")
+        self.WHEEL_DIAMETER, self.WHEEL_BASE_WIDTH = self._hello
+        self.stream_rate = 0.0
+        if stream_rate:
+            self.stream(stream_rate)
+
+    def _receive_loop(self):
+        reader = MessageReader()
+        while True:
+            try:
+                data = self.sock.recv(65536)
+            except OSError:
+                break
+            if not data:
+                break
+            with self._condition:
+                for kind, _, values in reader.feed(data):
+                    if kind == protocol.TELEMETRY:
+                        self.telemetry = values
+                        self.telemetry_received += 1
+                    elif kind == protocol.HELLO:
+                        self._hello = values
+                self._condition.notify_all()
+
+    def _send(self, kind, *values) -> int:
+        with self._send_lock:
+            self.sequence = (self.sequence + 1) & 0xFFFFFFFF
+            data = pack(kind, self.sequence, *values)
+            self.sock.sendall(data)
+            self.messages_sent += 1
+            self.bytes_sent += len(data)
+            return self.sequence
+
+    def set_motor_dps(self, port, dps):
+        """:param port: MOTOR_LEFT, MOTOR_RIGHT (ou leur somme), 'left' ou 'right'"""
+        if isinstance(port, str):
+            port = self.MOTOR_LEFT if port in ("left", "MOTOR_LEFT") else self.MOTOR_RIGHT
+        self._send(protocol.MOTOR, port, dps)
+
+    def stream(self, rate):
+        """Demande au serveur de pousser la télémétrie à `rate` Hz (0 : arrêt)."""
+        self.stream_rate = rate
+        self._send(protocol.STREAM, rate)
+
+    def read_telemetry(self):
+        """(ack, t, gauche, droite, distance) : la dernière poussée, ou une lecture demandée au serveur."""
+        with self._condition:
+            if self.stream_rate > 0:
+                ready = self._condition.wait_for(lambda: self.telemetry is not None, self.timeout)
+            else:
+                sequence = self._send(protocol.READ)
+                self.round_trips += 1
+                ready = self._condition.wait_for(
+                    lambda: self.telemetry is not None and self.telemetry[0] == sequence, self.timeout)
+            if not ready:
+                raise TimeoutError("Télémétrie du robot non reçue")
+            return self.telemetry
+
+    def get_motor_position(self):
+        _, _, left, right, _ = self.read_telemetry()
+        return left, right
+
+    def get_distance(self):
+        """Capteur de distance (mm), lu par le serveur avec les encodeurs."""
+        return self.read_telemetry()[4]
+
+    def stop(self):
+        self.set_motor_dps(self.MOTOR_LEFT + self.MOTOR_RIGHT, 0)
+
+    def close(self):
+        try:
+            self.sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self.sock.close()
+
+
+if __name__ == "__main__":
+    # Test de charge local : serveur autour de MockRobot2IN013, clients TCP
+    import numpy as np
+    from robot.robot import MockRobot2IN013
+    from controller.adapter import RealRobotAdapter
+
+    def percentiles(samples):
+        p50, p99 = np.percentile(np.array(samples) * 1e6, [50, 99])
+        return f"médiane {p50:.0f} µs, p99 {p99:.0f} µs"
+
+    def ticks(robot, n):
+        """Pas de contrôle typique : deux commandes moteur et une lecture des encodeurs."""
+        samples = []
+        for k in range(n):
+            t0 = time.perf_counter()
+            robot.set_motor_dps(robot.MOTOR_LEFT, 100 + k % 10)
+            robot.set_motor_dps(robot.MOTOR_RIGHT, 100 - k % 10)
+            robot.get_motor_position()
+            samples.append(time.perf_counter() - t0)
+        return samples
+
+    mock = MockRobot2IN013(clock=time, verbose=False)
+    server = RobotServer(mock).start()
+    host, port = server.address
+
+    print(f"en processus     : {percentiles(ticks(mock, 5000))} par pas")
+    remote = RemoteRobot(host, port)
+    print(f"distant          : {percentiles(ticks(remote, 5000))} par pas, "
+          f"{remote.round_trips / 5000:.1f} aller-retour par pas")
+
+    # Commandes en pipeline : débit sans attente de réponse
+    n = 100000
+    t0 = time.perf_counter()
+    for k in range(n):
+        remote.set_motor_dps(remote.MOTOR_LEFT, k % 360)
+    sequence = remote.sequence
+    remote.read_telemetry()
+    elapsed = time.perf_counter() - t0
+    print(f"pipeline         : {n / elapsed:.0f} commandes/s ({remote.bytes_sent / remote.messages_sent:.0f} "
+          f"octets par message), dernière commande acquittée: {remote.telemetry[0] > sequence}")
+
+    # Télémétrie poussée : aucune attente côté client
+    streamed = RemoteRobot(host, port, stream_rate=200)
+    time.sleep(1.0)
+    print(f"flux 200 Hz      : {streamed.telemetry_received} télémétries reçues en 1 s, "
+          f"{percentiles(ticks(streamed, 5000))} par pas sans aller-retour")
+    streamed.close()
+
+    # Plusieurs clients en parallèle
+    clients = [RemoteRobot(host, port) for _ in range(8)]
+    results = [None] * len(clients)
+
+    def run(k):
+        results[k] = ticks(clients[k], 2000)
+
+    threads = [threading.Thread(target=run, args=(k,)) for k in range(len(clients))]
+    t0 = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - t0
+    total = sum(len(r) for r in results)
+    print(f"{len(clients)} clients        : {total / elapsed:.0f} pas/s au total, "
+          f"{percentiles([s for r in results for s in r])} par pas")
+
+    # La stratégie parle au robot distant à travers l'adaptateur habituel
+    adapter = RealRobotAdapter(remote)
+    adapter.begin_tick()
+    print(f"adaptateur       : positions {adapter.get_motor_positions()}, {adapter.stats()}")
+    for client in clients + [remote]:
+        client.close()
+    server.stop()
@@ -3,20 +3,35 @@ import math
 import threading
 from collections import deque
 import numpy as np
+from utils.clock import VirtualClock
 
 class MockRobot2IN013:
     """
     Mock-up du robot réel Robot2IN013.
-    Toutes les actions sont simulées par des affichages (print).
+    Les actions sont simulées par des affichages (print, si verbose).
+
+    Les encodeurs suivent une horloge (module time par défaut, ou
+    utils.clock.VirtualClock pour tourner plus vite que le temps réel) : la
+    position des moteurs est intégrée à chaque lecture ou commande. Une
+    commande de vitesse ne prend effet qu'après `latency` secondes ; les
+    lectures sont quantifiées à `encoder_resolution` degrés et bruitées
+    (écart type `encoder_noise` degrés). Sans horloge (par défaut), seul
+    update_encoders(delta_time) fait avancer les moteurs.
     """
     
     WHEEL_BASE_WIDTH         = 117   # en mm
     WHEEL_DIAMETER           = 66.5  # en mm
     WHEEL_BASE_CIRCUMFERENCE = WHEEL_BASE_WIDTH * math.pi  # en mm
     WHEEL_CIRCUMFERENCE      = WHEEL_DIAMETER * math.pi      # en mm
+    # Ports des moteurs, comme EasyGoPiGo3 (combinables : MOTOR_LEFT + MOTOR_RIGHT)
+    MOTOR_LEFT               = 1
+    MOTOR_RIGHT              = 2
    
-    def __init__(self, nb_img=10, fps=25, resolution=(640,480), servoPort="SERVO1", motionPort="AD1"):
-        print("MockRobot2IN013: Initialisation du robot simulé.")
+    def __init__(self, nb_img=10, fps=25, resolution=(640,480), servoPort="SERVO1", motionPort="AD1",
+                 clock=None, latency=0.0, encoder_resolution=1.0, encoder_noise=0.0, seed=None,
+                 verbose=True):
+        self.verbose = verbose
+        self._log("MockRobot2IN013: Initialisation du robot simulé.")
         self.nb_img = nb_img
         self.fps = fps
         self.resolution = resolution
@@ -24,91 +39,141 @@ class MockRobot2IN013:
         # Simulation des positions et vitesses des moteurs
         self.motor_positions = {"MOTOR_LEFT": 0.0, "MOTOR_RIGHT": 0.0}
         self.motor_speeds = {"MOTOR_LEFT": 0.0, "MOTOR_RIGHT": 0.0}
+        # Sans horloge, temps interne avancé par update_encoders() seulement
+        self._manual = clock is None
+        self.clock = VirtualClock() if clock is None else clock
+        self.latency = latency
+        self.encoder_resolution = encoder_resolution
+        self.encoder_noise = encoder_noise
+        self._rng = np.random.default_rng(seed)
+        self._pending = deque()             # (instant d'effet, moteur, dps)
+        self._last_time = self.clock.monotonic()
         self._recording = False
         self._thread = None
         self.fps_camera = fps
         # Démarrage de l'enregistrement simulé des images
         self.start_recording()
 
+    def _log(self, message):
+        if self.verbose:
+            print(message)
+
     def stop(self):
         """Arrête le robot (simulation)."""
-        print("MockRobot2IN013: Arrêt du robot.")
+        self._log("MockRobot2IN013: Arrêt du robot.")
         self.set_motor_dps("left", 0)
         self.set_motor_dps("right", 0)
-        print("MockRobot2IN013: LED éteintes (simulé).")
+        self._log("MockRobot2IN013: LED éteintes (simulé).")
 
     def get_image(self):
         """Retourne la dernière image simulée."""
         if self._img_queue:
-            print("MockRobot2IN013: Retour de la dernière image simulée.")
+            self._log("MockRobot2IN013: Retour de la dernière image simulée.")
             return self._img_queue[-1][0]
         else:
-            print("MockRobot2IN013: Aucune image disponible.")
+            self._log("MockRobot2IN013: Aucune image disponible.")
             return None
 
     def get_images(self):
         """Retourne la liste des images simulées."""
-        print("MockRobot2IN013: Retour de toutes les images simulées.")
+        self._log("MockRobot2IN013: Retour de toutes les images simulées.")
         return list(self._img_queue)
 
+    def _motors(self, port):
+        """Noms des moteurs désignés par un port (1, 2, 3) ou un nom ('left', 'MOTOR_LEFT'...)."""
+        if isinstance(port, str):
+            return ["MOTOR_LEFT"] if port in ("left", "MOTOR_LEFT") else ["MOTOR_RIGHT"]
+        return [motor for motor, bit in (("MOTOR_LEFT", self.MOTOR_LEFT), ("MOTOR_RIGHT", self.MOTOR_RIGHT))
+                if port & bit]
+
     def set_motor_dps(self, port, dps):
         """
         Définit la vitesse d'un moteur en degrés par seconde.
-        :param port: 'left' ou 'right'
+        :param port: MOTOR_LEFT, MOTOR_RIGHT (ou leur somme), 'left' ou 'right'
         :param dps: vitesse en dps
         """
-       
-        self.motor_speeds[port] = dps
-        print(f"[Mock] Vitesse du moteur '{port}' réglée à {dps} dps")
- 
-
+        self._advance()
+        effective = self.clock.monotonic() + self.latency
+        for motor in self._motors(port):
+            if self.latency > 0:
+                self._pending.append((effective, motor, dps))
+            else:
+                self.motor_speeds[motor] = dps
+        self._log(f"[Mock] Vitesse du moteur '{port}' réglée à {dps} dps")
+
+    def _integrate(self, until):
+        delta_time = until - self._last_time
+        if delta_time > 0:
+            for motor in ("MOTOR_LEFT", "MOTOR_RIGHT"):
+                self.motor_positions[motor] += self.motor_speeds[motor] * delta_time
+            self._last_time = until
+
+    def _advance(self):
+        """Intègre les moteurs jusqu'à l'instant de l'horloge, commandes en attente comprises."""
+        now = self.clock.monotonic()
+        while self._pending and self._pending[0][0] <= now:
+            effective, motor, dps = self._pending.popleft()
+            self._integrate(effective)
+            self.motor_speeds[motor] = dps
+        self._integrate(now)
 
     def update_encoders(self, delta_time):
         """
         Met à jour les positions des moteurs en fonction du temps écoulé.
+        Sans horloge, fait avancer le temps interne ; sinon l'horloge fait foi.
         :param delta_time: Temps écoulé (en secondes)
         """
-       
-        for motor in ["MOTOR_LEFT", "MOTOR_RIGHT"]:
-            # La position augmente de (vitesse en dps * delta_time)
-           
-            self.motor_positions[motor] += self.motor_speeds[motor] * delta_time
-        print(f"[Mock] Nouvelles positions des moteurs : {self.motor_positions}")
+        if self._manual:
+            self.clock.advance(delta_time)
+        self._advance()
+        self._log(f"[Mock] Nouvelles positions des moteurs : {self.motor_positions}")
+
+    def _encoder(self, motor):
+        value = self.motor_positions[motor]
+        if self.encoder_noise:
+            value += self._rng.normal(0.0, self.encoder_noise)
+        if self.encoder_resolution:
+            value = round(value / self.encoder_resolution) * self.encoder_resolution
+        return value
 
     def get_motor_position(self):
         """
         Retourne la position actuelle des moteurs sous forme de tuple (left, right).
         """
-        print(f"[Mock] Lecture des positions : {self.motor_positions}")
-        return (self.motor_positions["MOTOR_LEFT"], self.motor_positions["MOTOR_RIGHT"])
+        self._advance()
+        self._log(f"[Mock] Lecture des positions : {self.motor_positions}")
+        return (self._encoder("MOTOR_LEFT"), self._encoder("MOTOR_RIGHT"))
+
     def offset_motor_encoder(self, port, offset):
         """Simule le décalage de l'encodeur pour un moteur."""
-        print(f"MockRobot2IN013: Décalage de l'encodeur du moteur '{port}' de {offset} degrés.")
-        self.motor_positions[port] += offset
+        self._advance()
+        self._log(f"MockRobot2IN013: Décalage de l'encodeur du moteur '{port}' de {offset} degrés.")
+        for motor in self._motors(port):
+            self.motor_positions[motor] += offset
 
     def get_distance(self):
         """Simule la lecture du capteur de distance (en mm)."""
         simulated_distance = 100  # valeur fixe simulée
-        print(f"MockRobot2IN013: Capteur de distance simulé retourne {simulated_distance} mm.")
+        self._log(f"MockRobot2IN013: Capteur de distance simulé retourne {simulated_distance} mm.")
         return simulated_distance
 
     def servo_rotate(self, position):
         """Simule la rotation du servo."""
-        print(f"MockRobot2IN013: Rotation du servo à {position} degrés.")
+        self._log(f"MockRobot2IN013: Rotation du servo à {position} degrés.")
 
     def start_recording(self):
         """Démarre l'enregistrement simulé des images."""
-        print("MockRobot2IN013: Démarrage de l'enregistrement des images simulé.")
+        self._log("MockRobot2IN013: Démarrage de l'enregistrement des images simulé.")
 
 
     def _stop_recording(self):
         """Arrête l'enregistrement simulé."""
-        print("MockRobot2IN013: Arrêt de l'enregistrement des images simulé.")
+        self._log("MockRobot2IN013: Arrêt de l'enregistrement des images simulé.")
 
 
     def _start_recording(self):
         """Fonction interne pour simuler l'enregistrement d'images."""
-        print("MockRobot2IN013: Enregistrement des images simulé en cours.")
+        self._log("MockRobot2IN013: Enregistrement des images simulé en cours.")
 
 
     def __getattr__(self, attr):
@@ -117,7 +182,7 @@ class MockRobot2IN013:
         Par exemple, pour simuler set_led ou d'autres fonctions de EasyGoPiGo3.
         """
         def method(*args, **kwargs):
-            print(f"MockRobot2IN013: Méthode '{attr}' appelée avec args {args} et kwargs {kwargs} (simulé).")
+            self._log(f"MockRobot2IN013: Méthode '{attr}' appelée avec args {args} et kwargs {kwargs} (simulé).")
         return method
     
 if __name__ == "__main__":
@@ -126,6 +191,7 @@ if __name__ == "__main__":
     # Régler la vitesse des moteurs
     robot.set_motor_dps("left", 60)    # 60 dps pour le moteur gauche
     robot.set_motor_dps("right", 60)   # 60 dps pour le moteur droit
+    robot.update_encoders(1.0)         # 1 s de temps interne
     
     # Obtenir et afficher les positions finales après les mises à jour
     positions = robot.get_motor_position()
@@ -4,6 +4,7 @@ from model.robot import RobotModel
 from controller.simulation_controller import SimulationController
 from view.ursina_control_panel import UrsinaControlPanel
 from view.ursina_view import UrsinaView
+import sys
 import time
 
 
@@ -20,7 +21,9 @@ class MainApplication:
 
         # Initialiser la vue et le panneau de contrôle
         self.control_panel = UrsinaControlPanel(self.sim_controller, self.map_model)
-        self.ursina_view = UrsinaView(self.sim_controller, self.control_panel)
+        # --vision-process : détection de balise sur un autre coeur
+        self.ursina_view = UrsinaView(self.sim_controller, self.control_panel,
+                                      vision_process="--vision-process" in sys.argv)
 
         # Liaison de la boucle principale
         self.last_time = time.time()
@@ -0,0 +1,21 @@
+class VirtualClock:
+    """
+    Horloge simulée, interchangeable avec le module time (monotonic, sleep) :
+    le temps n'avance que par sleep() ou advance(), sans jamais attendre.
+    Une boucle de contrôle cadencée par cette horloge tourne donc plus vite
+    que le temps réel.
+    """
+
+    def __init__(self, start: float = 0.0):
+        self.now = start
+
+    def monotonic(self) -> float:
+        return self.now
+
+    time = perf_counter = monotonic
+
+    def sleep(self, seconds: float):
+        if seconds > 0:
+            self.now += seconds
+
+    advance = sleep
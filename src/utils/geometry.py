@@ -5,9 +5,13 @@ def point_in_polygon(x, y, polygon):
     if isinstance(polygon, tuple):  
         polygon = polygon[0]
 
+    polygon=scale_polygon(polygon,1.5)
+    return ray_cast(x, y, polygon)
+
+def ray_cast(x, y, polygon):
+    """ Ray casting test on the polygon as given (no scaling) """
     n = len(polygon)
     inside = False
-    polygon=scale_polygon(polygon,1.5)
     p1x, p1y = polygon[0]
     for i in range(n + 1):
         p2x, p2y = polygon[i % n]
@@ -20,6 +24,27 @@ def point_in_polygon(x, y, polygon):
                         inside = not inside
         p1x, p1y = p2x, p2y
     return inside
+def segments_intersect(p1, p2, q1, q2):
+    """ True if segments [p1, p2] and [q1, q2] cross each other """
+    def orient(a, b, c):
+        return (b[0] - a[0]) * (c[1] - a[1]) - (b[1] - a[1]) * (c[0] - a[0])
+    d1 = orient(q1, q2, p1)
+    d2 = orient(q1, q2, p2)
+    d3 = orient(p1, p2, q1)
+    d4 = orient(p1, p2, q2)
+    return ((d1 > 0) != (d2 > 0)) and ((d3 > 0) != (d4 > 0)) and d1 != 0 and d2 != 0 and d3 != 0 and d4 != 0
+
+def segment_intersects_polygon(a, b, polygon):
+    """ True if the segment [a, b] enters the polygon (polygon used as given) """
+    if ray_cast(a[0], a[1], polygon) or ray_cast(b[0], b[1], polygon):
+        return True
+    n = len(polygon)
+    for i in range(n):
+        if segments_intersect(a, b, polygon[i], polygon[(i + 1) % n]):
+            return True
+    # Segment joining two opposite vertices: its midpoint is inside
+    return ray_cast((a[0] + b[0]) / 2, (a[1] + b[1]) / 2, polygon)
+
 def scale_polygon(polygon, factor):
     # Calculer le centroïde
     cx = sum(x for x, y in polygon) / len(polygon)
@@ -43,3 +68,29 @@ def normalize_angle( angle):
     while angle < -math.pi:
         angle += 2 * math.pi
     return angle
+
+
+def arc_update(x, y, angle, left_distance, right_distance, wheel_base):
+    """
+    Intègre le déplacement d'un robot à deux roues sur un arc de cercle.
+
+    La corde de l'arc est calculée sous la forme 2R.sin(dθ/2), ce qui reste
+    précis quand les deux roues ont presque la même vitesse (R très grand).
+
+    :param left_distance: distance parcourue par la roue gauche (même unité que x, y)
+    :param right_distance: distance parcourue par la roue droite
+    :param wheel_base: entraxe des roues
+    :return: (new_x, new_y, new_angle)
+    """
+    distance = (left_distance + right_distance) / 2
+    delta_theta = (left_distance - right_distance) / wheel_base
+    if abs(delta_theta) < 1e-12:
+        # Mouvement en ligne droite
+        chord = distance
+    else:
+        # Mouvement circulaire : corde = 2R.sin(dθ/2) avec R = distance / dθ
+        chord = distance * math.sin(delta_theta / 2) / (delta_theta / 2)
+    heading = angle + delta_theta / 2
+    return (x + chord * math.cos(heading),
+            y + chord * math.sin(heading),
+            angle + delta_theta)
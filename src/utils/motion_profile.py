@@ -0,0 +1,54 @@
+import math
+
+
+class TrapezoidalProfile:
+    """
+    Profil de vitesse trapézoïdal : accélération, palier, décélération.
+
+    Les unités sont libres mais cohérentes (par ex. degrés de roue, dps, dps/s).
+    L'accélération suit le temps écoulé, la décélération suit la distance
+    restante mesurée : le robot ralentit donc toujours à temps pour s'arrêter
+    sur la cible, même si la vitesse réelle a dévié du plan.
+    """
+
+    def __init__(self, distance: float, v_max: float, acceleration: float, v_min: float = 0.0):
+        if acceleration <= 0:
+            raise ValueError("L'accélération doit être positive.")
+        self.distance = abs(distance)
+        self.v_max = abs(v_max)
+        self.acceleration = acceleration
+        self.v_min = min(abs(v_min), self.v_max)
+
+        # Distance nécessaire pour atteindre v_max ; sinon profil triangulaire
+        accel_distance = self.v_max ** 2 / (2 * acceleration)
+        if 2 * accel_distance > self.distance:
+            self.v_peak = math.sqrt(acceleration * self.distance)
+            self.accel_time = self.v_peak / acceleration
+            self.cruise_time = 0.0
+        else:
+            self.v_peak = self.v_max
+            self.accel_time = self.v_max / acceleration
+            self.cruise_time = (self.distance - 2 * accel_distance) / self.v_max
+
+    def duration(self) -> float:
+        """Durée prévue du mouvement (s)."""
+        return 2 * self.accel_time + self.cruise_time
+
+    def speed(self, elapsed: float, remaining: float, delta_time: float = 0.0) -> float:
+        """
+        Vitesse à commander.
+
+        :param elapsed: temps écoulé depuis le début du mouvement (s)
+        :param remaining: distance restante mesurée
+        :param delta_time: pas de contrôle ; la vitesse est bornée pour ne pas
+                           dépasser la cible pendant ce pas
+        """
+        if remaining <= 0:
+            return 0.0
+        v = min(self.v_peak,
+                self.acceleration * elapsed,
+                math.sqrt(2 * self.acceleration * remaining))
+        v = max(v, self.v_min)
+        if delta_time > 0:
+            v = min(v, remaining / delta_time)
+        return v
@@ -0,0 +1,451 @@
+"""
+Analyse de trajectoires : traces binaires de TrajectoryRecorder,
+traceability_positions.log et traceability_square.log.
+
+Les fichiers sont lus par blocs (mémoire bornée, quelle que soit leur
+taille) et chaque bloc est converti d'un coup en tableaux NumPy.
+"""
+import re
+import math
+import argparse
+from datetime import datetime, timezone
+import numpy as np
+from utils.trajectory_recorder import MAGIC, load_trajectory
+
+# --- Lecture de traceability_positions.log ----------------------------------------
+# « 2025-05-27 23:19:52,186 - Position: x=265.00, y=245.00, angle=0.00° » : la date
+# a une largeur fixe en début de ligne et chaque valeur suit un « = ». Plutôt
+# que de convertir le texte caractère par caractère, on copie la date et une
+# fenêtre après chaque « = » de toutes les lignes du bloc dans des matrices
+# d'octets, converties d'un coup.
+POSITION_FIELDS = 10
+DATE_WIDTH = 23
+DATE_FIELDS = (0, 4), (5, 7), (8, 10), (11, 13), (14, 16), (17, 19), (20, 23)
+DATE_SEPARATORS = (4, b"-"), (7, b"-"), (10, b" "), (13, b":"), (16, b":"), (19, b",")
+POSITION_PREFIX = np.frombuffer(b" - Position: x=", np.uint8)    # Juste après la date
+VALUE_WIDTHS = 8, 24
+POSITION_LINE = re.compile(rb"(\d{4})-(\d\d)-(\d\d) (\d\d):(\d\d):(\d\d),(\d{3}) - Position: "
+                           rb"x=(-?[\d.]+), y=(-?[\d.]+), angle=(-?[\d.]+)")
+
+# Poids des chiffres de la date : champs = octets @ DATE_WEIGHTS - DATE_OFFSETS
+# (float32 : exact pour des entiers de quatre chiffres, deux fois moins de mémoire)
+DATE_WEIGHTS = np.zeros((DATE_WIDTH, len(DATE_FIELDS)), np.float32)
+for _field, (_a, _b) in enumerate(DATE_FIELDS):
+    DATE_WEIGHTS[_a:_b, _field] = 10.0 ** np.arange(_b - _a - 1, -1, -1)
+DATE_OFFSETS = ord("0") * DATE_WEIGHTS.sum(axis=0)
+
+
+def _parse_numbers(window):
+    """
+    Nombre décimal au début de chaque ligne d'une matrice d'octets, ou None
+    si l'un d'eux la remplit. Colonne par colonne : quelques opérations
+    vectorielles par caractère, toutes lignes confondues.
+    """
+    columns = np.ascontiguousarray(window.T)
+    negative = columns[0] == 45
+    mantissa = np.zeros(len(negative))
+    decimals = np.zeros(len(negative), np.int64)
+    seen_dot = np.zeros(len(negative), bool)
+    active = np.ones(len(negative), bool)
+    for k, column in enumerate(columns):
+        digit = (column >= 48) & (column <= 57)
+        dot = column == 46
+        active &= digit | dot | (negative if k == 0 else False)
+        if not active.any():
+            return np.where(negative, -mantissa, mantissa) / 10.0 ** decimals
+        digit &= active
+        mantissa = np.where(digit, mantissa * 10 + (column - 48.0), mantissa)
+        decimals += digit & seen_dot
+        seen_dot |= active & dot
+    return None
+
+
+def _parse_fixed_layout(block: bytes):
+    """Lecture rapide des lignes de position ; None si le bloc contient d'autres lignes."""
+    data = np.frombuffer(block + b" " * max(VALUE_WIDTHS + (DATE_WIDTH + len(POSITION_PREFIX),)), np.uint8)
+    starts = np.concatenate(([0], np.flatnonzero(data == 10)[:-1] + 1))
+    equals = np.flatnonzero(data == 61)
+    # Exactement trois « = » par ligne, et « - Position: x= » à sa place après la date
+    per_line = np.diff(np.searchsorted(equals, starts), append=len(equals))
+    if (per_line != 3).any():
+        return None
+    heads = np.lib.stride_tricks.sliding_window_view(data, DATE_WIDTH + len(POSITION_PREFIX))[starts]
+    if (heads[:, DATE_WIDTH:] != POSITION_PREFIX).any():
+        return None
+    dates = heads[:, :DATE_WIDTH]
+    for offset, char in DATE_SEPARATORS:
+        if (dates[:, offset] != ord(char)).any():
+            return None
+    fields = np.empty((len(starts), POSITION_FIELDS))
+    fields[:, :len(DATE_FIELDS)] = dates.astype(np.float32) @ DATE_WEIGHTS - DATE_OFFSETS
+    for width in VALUE_WIDTHS:
+        values = _parse_numbers(np.lib.stride_tricks.sliding_window_view(data, width)[equals + 1])
+        if values is not None:
+            fields[:, len(DATE_FIELDS):] = values.reshape(-1, 3)
+            return fields
+    return None
+
+
+def _parse_position_block(block: bytes) -> np.ndarray:
+    """Lignes de position d'un bloc de lignes complètes → tableau (n, 10)."""
+    fields = _parse_fixed_layout(block)
+    if fields is not None:
+        return fields
+    # Lignes d'un autre format dans le bloc : lecture ligne par ligne
+    rows = POSITION_LINE.findall(block)
+    return np.array(rows, dtype=float).reshape(-1, POSITION_FIELDS)
+
+
+def _timestamps(fields) -> np.ndarray:
+    """Secondes depuis l'époque des colonnes date/heure (heure locale, comme time.time())."""
+    dates = ((fields[:, 0].astype(np.int64) - 1970).astype("datetime64[Y]")
+             + (fields[:, 1].astype(np.int64) - 1).astype("timedelta64[M]")).astype("datetime64[D]")
+    days = (dates + (fields[:, 2].astype(np.int64) - 1).astype("timedelta64[D]")).astype(np.int64)
+    wall = days * 86400.0 + fields[:, 3] * 3600 + fields[:, 4] * 60 + fields[:, 5] + fields[:, 6] / 1000
+    return wall - _utc_offsets(wall)
+
+
+def _utc_offset(wall) -> float:
+    """Décalage (s) de l'heure locale sur UTC à l'heure locale `wall` (lue comme UTC)."""
+    naive = datetime.fromtimestamp(wall, timezone.utc).replace(tzinfo=None)
+    return wall - naive.timestamp()
+
+
+def _utc_offsets(wall) -> np.ndarray:
+    """_utc_offset de chaque heure : un seul calcul par bloc, sauf s'il chevauche un changement d'heure."""
+    if not len(wall):
+        return np.zeros(0)
+    first, last = _utc_offset(wall[0]), _utc_offset(wall[-1])
+    if first == last and wall[0] <= wall[-1]:
+        return np.full(len(wall), first)
+    hours, inverse = np.unique(wall // 3600, return_inverse=True)
+    return np.array([_utc_offset(h * 3600.0) for h in hours])[inverse]
+
+
+def iter_position_log(path, block_size=1 << 24):
+    """Itère sur (t, x, y, angle en rad) par blocs de block_size octets au plus."""
+    with open(path, "rb") as f:
+        rest = b""
+        while True:
+            data = f.read(block_size)
+            if not data:
+                block, rest = rest, b""
+            else:
+                data = rest + data
+                cut = data.rfind(b"\n") + 1
+                if cut == 0:
+                    rest = data
+                    continue
+                block, rest = data[:cut], data[cut:]
+            if block:
+                fields = _parse_position_block(block)
+                if len(fields):
+                    yield _timestamps(fields), fields[:, 7], fields[:, 8], np.radians(fields[:, 9])
+            if not data:
+                break
+
+
+def iter_trajectory(path, chunk_size=1 << 20):
+    """Itère sur (t, x, y, angle) d'une trace binaire, par blocs de chunk_size enregistrements."""
+    records = load_trajectory(path)
+    for start in range(0, len(records), chunk_size):
+        block = records[start:start + chunk_size]
+        yield block["t"], block["x"], block["y"], block["angle"]
+
+
+# --- Métriques ------------------------------------------------------------------------
+SPEED_BINS = np.array([0, 1, 2, 5, 10, 20, 50, 100, 200, np.inf])     # cm/s
+PHASE_NAMES = {0: "arrêt", 1: "avancer", 2: "tourner"}
+
+
+class TrajectoryAnalyzer:
+    """
+    Métriques d'une trajectoire reçue par blocs (t, x, y, angle) : l'état
+    nécessaire d'un bloc au suivant tient en quelques scalaires et la liste
+    des phases (une par commande).
+
+    La trajectoire est coupée en sessions aux trous de plus de `gap`
+    secondes (un lancement de la simulation par session), chaque pas est
+    classé arrêt / avancer / tourner, et les pas consécutifs de même classe
+    forment une phase : durée par commande, coins (position moyenne pendant
+    un virage), longueur du chemin, profil de vitesse, erreur de fermeture.
+    """
+
+    def __init__(self, gap=1.0, moving_speed=0.5, turning_rate=math.radians(5), min_phase=0.06):
+        """
+        :param moving_speed: vitesse (cm/s) au-dessus de laquelle le robot avance
+        :param turning_rate: vitesse angulaire (rad/s) au-dessus de laquelle il tourne
+        :param min_phase: durée (s) sous laquelle une phase est fusionnée avec ses voisines
+        """
+        self.gap = gap
+        self.moving_speed = moving_speed
+        self.turning_rate = turning_rate
+        self.min_phase = min_phase
+        self.sessions = []
+        self._session = None
+        self._last = None
+
+    def _open_session(self, t, x, y, angle):
+        self._close_session()
+        self._session = {
+            "start": (t, x, y, angle), "end": (t, x, y, angle), "samples": 0,
+            "length": 0.0, "turned": 0.0, "max_speed": 0.0,
+            "speed_histogram": np.zeros(len(SPEED_BINS) - 1, np.int64),
+            "phases": [],
+        }
+
+    def _close_session(self):
+        session = self._session
+        if session is None:
+            return
+        session["phases"] = self._merge_phases(session["phases"])
+        self.sessions.append(session)
+        self._session = None
+
+    def feed(self, t, x, y, angle):
+        n = len(t)
+        if not n:
+            return
+        t, x, y, angle = (np.asarray(a, dtype=float) for a in (t, x, y, angle))
+        previous = self._last if self._last is not None else (t[0], x[0], y[0], angle[0])
+        dt = np.diff(t, prepend=previous[0])
+        ds = np.hypot(np.diff(x, prepend=previous[1]), np.diff(y, prepend=previous[2]))
+        dangle = np.diff(angle, prepend=previous[3])
+        dangle = (dangle + math.pi) % (2 * math.pi) - math.pi
+        self._last = (t[-1], x[-1], y[-1], angle[-1])
+
+        breaks = np.flatnonzero((dt > self.gap) | (dt < 0)).tolist()
+        if self._session is None and (not breaks or breaks[0] != 0):
+            breaks.insert(0, 0)
+        bounds = breaks + [n]
+        if bounds[0] != 0:
+            bounds.insert(0, 0)
+        for a, b in zip(bounds[:-1], bounds[1:]):
+            if a in breaks:
+                # Pas de déplacement compté à travers un trou
+                dt[a] = ds[a] = dangle[a] = 0.0
+                self._open_session(t[a], x[a], y[a], angle[a])
+            self._accumulate(t[a:b], x[a:b], y[a:b], angle[a:b], dt[a:b], ds[a:b], dangle[a:b])
+
+    def _accumulate(self, t, x, y, angle, dt, ds, dangle):
+        session = self._session
+        session["samples"] += len(t)
+        session["length"] += ds.sum()
+        session["turned"] += dangle.sum()
+        session["end"] = (t[-1], x[-1], y[-1], angle[-1])
+        timed = dt > 0
+        speed = np.zeros_like(ds)
+        np.divide(ds, dt, out=speed, where=timed)
+        rate = np.zeros_like(ds)
+        np.divide(np.abs(dangle), dt, out=rate, where=timed)
+        if timed.any():
+            session["speed_histogram"] += np.histogram(speed[timed], SPEED_BINS)[0]
+            session["max_speed"] = max(session["max_speed"], speed[timed].max())
+
+        kind = np.where(rate > self.turning_rate, 2, np.where(speed > self.moving_speed, 1, 0))
+        phases = session["phases"]
+        if phases:
+            kind[~timed] = phases[-1]["kind"]
+        starts = np.concatenate(([0], np.flatnonzero(kind[1:] != kind[:-1]) + 1))
+        ends = np.append(starts[1:], len(kind))
+        # Sommes par plage de même classe d'un seul appel par colonne
+        sums = {key: np.add.reduceat(values, starts).tolist()
+                for key, values in (("sum_x", x), ("sum_y", y), ("distance", ds), ("turn", dangle))}
+        peaks = np.maximum.reduceat(speed, starts).tolist()
+        kinds = kind[starts].tolist()
+        for r, (a, b) in enumerate(zip(starts.tolist(), ends.tolist())):
+            if not phases or phases[-1]["kind"] != kinds[r]:
+                phases.append({"kind": kinds[r], "start": t[a] - dt[a], "end": t[a], "samples": 0,
+                               "sum_x": 0.0, "sum_y": 0.0, "distance": 0.0, "turn": 0.0,
+                               "peak_speed": 0.0})
+            phase = phases[-1]
+            phase["end"] = t[b - 1]
+            phase["samples"] += b - a
+            for key, values in sums.items():
+                phase[key] += values[r]
+            phase["peak_speed"] = max(phase["peak_speed"], peaks[r])
+
+    def _merge_phases(self, phases):
+        """Fusionne les phases trop courtes (bruit de classement) avec la précédente."""
+        merged = []
+        for phase in phases:
+            if merged and (phase["end"] - phase["start"] < self.min_phase or phase["kind"] == merged[-1]["kind"]):
+                last = merged[-1]
+                last["end"] = phase["end"]
+                for key in ("samples", "sum_x", "sum_y", "distance", "turn"):
+                    last[key] += phase[key]
+                last["peak_speed"] = max(last["peak_speed"], phase["peak_speed"])
+            else:
+                merged.append(phase)
+        return merged
+
+    def finish(self):
+        self._close_session()
+        return self.sessions
+
+
+def session_metrics(session) -> dict:
+    """Métriques d'une session de TrajectoryAnalyzer."""
+    t0, x0, y0, a0 = session["start"]
+    t1, x1, y1, a1 = session["end"]
+    phases = session["phases"]
+    moving = [p for p in phases if p["kind"] == 1]
+    moving_time = sum(p["end"] - p["start"] for p in moving)
+    durations = {}
+    for phase in phases:
+        durations.setdefault(PHASE_NAMES[phase["kind"]], []).append(phase["end"] - phase["start"])
+    corners = [(p["sum_x"] / p["samples"], p["sum_y"] / p["samples"]) for p in phases if p["kind"] == 2]
+    return {
+        "start_time": t0, "duration": t1 - t0, "samples": session["samples"],
+        "start": (x0, y0), "end": (x1, y1),
+        "length": session["length"],
+        "closure_error": math.hypot(x1 - x0, y1 - y0),
+        "heading_error": math.degrees((a1 - a0 + math.pi) % (2 * math.pi) - math.pi),
+        "turned": math.degrees(session["turned"]),
+        "mean_speed": sum(p["distance"] for p in moving) / moving_time if moving_time > 0 else 0.0,
+        "max_speed": session["max_speed"],
+        "speed_histogram": session["speed_histogram"],
+        "corners": corners,
+        "command_durations": durations,
+        "sides": [p["distance"] for p in moving],
+    }
+
+
+def format_session(index, metrics, brief=False) -> str:
+    start = datetime.fromtimestamp(metrics["start_time"]).strftime("%Y-%m-%d %H:%M:%S")
+    head = (f"Session {index} ({start}) : {metrics['duration']:.2f} s, {metrics['samples']} pas, "
+            f"chemin {metrics['length']:.1f} cm, fermeture {metrics['closure_error']:.2f} cm / "
+            f"{metrics['heading_error']:.2f}°, {len(metrics['corners'])} coin(s)")
+    if brief:
+        return head
+    lines = [head,
+             f"  départ ({metrics['start'][0]:.1f}, {metrics['start'][1]:.1f}) → arrivée "
+             f"({metrics['end'][0]:.1f}, {metrics['end'][1]:.1f}), rotation totale {metrics['turned']:.1f}°",
+             f"  vitesse : moyenne en ligne droite {metrics['mean_speed']:.1f} cm/s, "
+             f"max {metrics['max_speed']:.1f} cm/s"]
+    counts = metrics["speed_histogram"]
+    if counts.sum():
+        width = counts.max()
+        for low, high, count in zip(SPEED_BINS[:-1], SPEED_BINS[1:], counts):
+            if count:
+                lines.append(f"    {low:>5.0f} – {high:>5.0f} cm/s {count:>9} "
+                             + "#" * max(1, round(30 * count / width)))
+    for name, values in metrics["command_durations"].items():
+        values = np.array(values)
+        lines.append(f"  {name} : {len(values)} commande(s), durée moyenne {values.mean():.2f} s "
+                     f"(min {values.min():.2f}, max {values.max():.2f})")
+    if metrics["sides"]:
+        lines.append("  côtés (cm) : " + ", ".join(f"{d:.1f}" for d in metrics["sides"]))
+    if metrics["corners"]:
+        lines.append("  coins : " + ", ".join(f"({x:.1f}, {y:.1f})" for x, y in metrics["corners"]))
+    return "\n".join(lines)
+
+
+# --- Lecture de traceability_square.log ----------------------------------------------
+SQUARE_START = re.compile(r"Début du dessin d'un carré de côté ([\d.]+) cm")
+SQUARE_CORNER = re.compile(r"Coin enregistré: \(([-\d.e]+), ([-\d.e]+)\)")
+SQUARE_SIDE_END = re.compile(r"Côté terminé, distance atteinte = ([-\d.]+) cm")
+
+
+def _log_time(line) -> float:
+    return datetime.strptime(line[:23], "%Y-%m-%d %H:%M:%S,%f").timestamp()
+
+
+def parse_square_log(path):
+    """Tracés de carré du journal (ligne par ligne) : coins, côtés, durées des commandes."""
+    runs = []
+    run = None
+    side_start = rotation_start = None
+    with open(path, encoding="utf-8", errors="replace") as f:
+        for line in f:
+            match = SQUARE_START.search(line)
+            if match:
+                run = {"start_time": _log_time(line), "side": float(match.group(1)), "corners": [],
+                       "sides": [], "side_durations": [], "rotation_durations": [], "finished": False}
+                runs.append(run)
+                continue
+            if run is None:
+                continue
+            if "Nouveau côté commencé" in line:
+                side_start = _log_time(line)
+            elif "Rotation démarrée" in line:
+                rotation_start = _log_time(line)
+            elif "Rotation terminée" in line and rotation_start is not None:
+                run["rotation_durations"].append(_log_time(line) - rotation_start)
+                rotation_start = None
+            elif "Dessin du carré terminé" in line:
+                run["finished"] = True
+            else:
+                match = SQUARE_CORNER.search(line) or SQUARE_SIDE_END.search(line)
+                if match is None:
+                    continue
+                if match.re is SQUARE_CORNER:
+                    run["corners"].append((float(match.group(1)), float(match.group(2))))
+                else:
+                    run["sides"].append(float(match.group(1)))
+                    if side_start is not None:
+                        run["side_durations"].append(_log_time(line) - side_start)
+                        side_start = None
+    return runs
+
+
+def format_square_run(index, run, brief=False) -> str:
+    corners = run["corners"]
+    start = datetime.fromtimestamp(run["start_time"]).strftime("%Y-%m-%d %H:%M:%S")
+    closure = math.dist(corners[0], corners[-1]) if len(corners) > 4 else None
+    head = (f"Carré {index} ({start}) : côté {run['side']:.0f} cm, {len(run['sides'])} côté(s), "
+            + (f"fermeture {closure:.2f} cm" if closure is not None else "non refermé")
+            + ("" if run["finished"] else ", interrompu"))
+    if brief:
+        return head
+    lines = [head]
+    if run["sides"]:
+        errors = np.array(run["sides"]) - run["side"]
+        lines.append(f"  erreur de côté : moyenne {errors.mean():+.2f} cm, max {np.abs(errors).max():.2f} cm")
+    for name, values in (("avancer", run["side_durations"]), ("tourner", run["rotation_durations"])):
+        if values:
+            lines.append(f"  {name} : {len(values)} commande(s), durée moyenne {np.mean(values):.2f} s "
+                         f"(min {min(values):.2f}, max {max(values):.2f})")
+    if corners:
+        lines.append("  coins : " + ", ".join(f"({x:.1f}, {y:.1f})" for x, y in corners))
+    return "\n".join(lines)
+
+
+# --- Ligne de commande ------------------------------------------------------------------
+def file_kind(path) -> str:
+    with open(path, "rb") as f:
+        head = f.read(4096)
+    if head.startswith(MAGIC):
+        return "trajectory"
+    if b"Position:" in head:
+        return "positions"
+    return "square"
+
+
+def analyze_file(path, gap=1.0, brief=False) -> str:
+    kind = file_kind(path)
+    if kind == "square":
+        runs = parse_square_log(path)
+        return "\n".join(format_square_run(k, run, brief) for k, run in enumerate(runs, 1))
+    analyzer = TrajectoryAnalyzer(gap=gap)
+    blocks = iter_trajectory(path) if kind == "trajectory" else iter_position_log(path)
+    for t, x, y, angle in blocks:
+        analyzer.feed(t, x, y, angle)
+    return "\n".join(format_session(k, session_metrics(s), brief)
+                     for k, s in enumerate(analyzer.finish(), 1))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Analyse de trajectoires (.traj, traceability_*.log)")
+    parser.add_argument("files", nargs="+")
+    parser.add_argument("--gap", type=float, default=1.0,
+                        help="trou (s) qui sépare deux sessions dans une trace")
+    parser.add_argument("--brief", action="store_true", help="une ligne par session")
+    args = parser.parse_args(argv)
+    for path in args.files:
+        print(f"== {path}")
+        print(analyze_file(path, gap=args.gap, brief=args.brief))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+import os
+import time
+import queue
+import atexit
+import logging
+import threading
+import numpy as np
+
+# Un enregistrement par pas de simulation (angle en rad, vitesses des roues en dps)
+TRAJECTORY_DTYPE = np.dtype([("t", "f8"), ("x", "f8"), ("y", "f8"), ("angle", "f8"),
+                             ("left", "f8"), ("right", "f8")])
+# En-tête du fichier binaire, de taille fixe, suivi des enregistrements bruts
+MAGIC = b"TRAJ1 t,x,y,angle,left,right <f8"
+HEADER_SIZE = 64
+
+
+class TrajectoryRecorder:
+    """
+    Trace de la trajectoire du robot, en colonnes binaires.
+
+    record() range une ligne (t, x, y, angle, left, right) dans un bloc NumPy
+    préalloué ; un bloc plein (ou flush()) est confié à un thread qui l'ajoute
+    à la fin du fichier. Le fichier n'est jamais réécrit : un en-tête fixe,
+    puis les enregistrements de TRAJECTORY_DTYPE, relus par load_trajectory
+    (np.memmap) ou convertis en texte par export_text.
+    """
+
+    def __init__(self, path="traceability_positions.traj", chunk_size=4096):
+        self.path = path
+        self.chunk_size = chunk_size
+        self._chunk = np.empty(chunk_size, TRAJECTORY_DTYPE)
+        self._count = 0
+        self._free = []                 # Blocs écrits, réutilisables
+        self._free_lock = threading.Lock()
+        self._pending = queue.Queue()
+        self.recorded = 0
+        self.logger = logging.getLogger("traceability.TrajectoryRecorder")
+        self._file = self._open()
+        self._writer = threading.Thread(target=self._write_loop, name="trajectory-recorder", daemon=True)
+        self._writer.start()
+        atexit.register(self.close)
+
+    def record(self, t, x, y, angle, left, right):
+        """Ajoute un enregistrement (appelé à chaque pas de simulation)."""
+        self._chunk[self._count] = (t, x, y, angle, left, right)
+        self._count += 1
+        if self._count == self.chunk_size:
+            self._hand_off()
+
+    def _hand_off(self):
+        self._pending.put((self._chunk, self._count))
+        self.recorded += self._count
+        with self._free_lock:
+            self._chunk = self._free.pop() if self._free else np.empty(self.chunk_size, TRAJECTORY_DTYPE)
+        self._count = 0
+
+    def flush(self):
+        """Confie le bloc en cours au thread d'écriture."""
+        if self._count:
+            self._hand_off()
+
+    def _open(self):
+        """
+        Ouvre le fichier pour y ajouter des enregistrements : en-tête écrit s'il
+        est neuf (ou si l'en-tête lui-même est incomplet), sinon vérifié, et
+        dernier enregistrement incomplet (arrêt pendant une écriture) retiré
+        pour que les suivants restent alignés.
+        """
+        f = open(self.path, "a+b")
+        try:
+            size = f.seek(0, os.SEEK_END)
+            f.seek(0)
+            header = f.read(HEADER_SIZE)
+            if size < HEADER_SIZE and MAGIC.startswith(header[:len(MAGIC)]):
+                f.truncate(0)
+                f.write(MAGIC.ljust(HEADER_SIZE - 1) + b"\n")
+            elif not header.startswith(MAGIC):
+                raise ValueError(f"{self.path} n'est pas une trajectoire binaire")
+            else:
+                aligned = HEADER_SIZE + (size - HEADER_SIZE) // TRAJECTORY_DTYPE.itemsize * TRAJECTORY_DTYPE.itemsize
+                if aligned != size:
+                    self.logger.warning(f"{self.path}: enregistrement incomplet de {size - aligned} octets retiré")
+                    f.truncate(aligned)
+            f.flush()
+        except Exception:
+            f.close()
+            raise
+        return f
+
+    def _write_loop(self):
+        with self._file as f:
+            while True:
+                item = self._pending.get()
+                if item is None:
+                    break
+                chunk, count = item
+                try:
+                    f.write(chunk[:count].tobytes())
+                    f.flush()
+                except OSError as e:
+                    self.logger.error(f"Écriture de la trajectoire impossible: {e}")
+                with self._free_lock:
+                    self._free.append(chunk)
+                self._pending.task_done()
+
+    def sync(self):
+        """Écrit tout ce qui a été enregistré et attend que ce soit sur disque."""
+        self.flush()
+        self._pending.join()
+
+    def close(self):
+        if not self._writer.is_alive():
+            return
+        self.flush()
+        self._pending.put(None)
+        self._writer.join()
+
+    def export_text(self, text_path=None):
+        """Export texte à la demande (format de l'ancien traceability_positions.log)."""
+        self.sync()
+        return export_text(self.path, text_path)
+
+
+def load_trajectory(path) -> np.ndarray:
+    """Enregistrements d'un fichier de TrajectoryRecorder, projetés en mémoire (lecture seule)."""
+    with open(path, "rb") as f:
+        header = f.read(HEADER_SIZE)
+    if not header.startswith(MAGIC):
+        raise ValueError(f"{path} n'est pas une trajectoire binaire")
+    # Un dernier enregistrement incomplet (écriture en cours) est ignoré
+    count = (os.path.getsize(path) - HEADER_SIZE) // TRAJECTORY_DTYPE.itemsize
+    if count <= 0:
+        return np.empty(0, TRAJECTORY_DTYPE)
+    return np.memmap(path, dtype=TRAJECTORY_DTYPE, mode="r", offset=HEADER_SIZE, shape=(count,))
+
+
+def export_text(path, text_path=None, chunk_size=100000) -> str:
+    """Convertit une trajectoire binaire en lignes « date - Position: x=…, y=…, angle=…° »."""
+    if text_path is None:
+        text_path = os.path.splitext(path)[0] + ".log"
+    records = load_trajectory(path)
+    with open(text_path, "w", encoding="utf-8") as f:
+        for start in range(0, len(records), chunk_size):
+            block = records[start:start + chunk_size]
+            for t, x, y, angle in zip(block["t"], block["x"], block["y"], np.degrees(block["angle"])):
+                stamp = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(t))
+                f.write(f"{stamp},{int(t * 1000) % 1000:03d} - Position: "
+                        f"x={x:.2f}, y={y:.2f}, angle={angle:.2f}°\n")
+    return text_path
+
+
+if __name__ == "__main__":
+    # Coût par pas : ligne de log formatée et écrite vs enregistrement binaire
+    import math
+    import tempfile
+
+    n = 200000
+    directory = tempfile.mkdtemp(prefix="trajectory_")
+    logger = logging.getLogger("benchmark.positions")
+    logger.propagate = False
+    logger.setLevel(logging.INFO)
+    handler = logging.FileHandler(os.path.join(directory, "positions.log"))
+    handler.setFormatter(logging.Formatter('%(asctime)s - Position: %(message)s'))
+    logger.addHandler(handler)
+    t0 = time.perf_counter()
+    for k in range(n):
+        logger.info(f"x={k * 0.1:.2f}, y={k * 0.2:.2f}, angle={math.degrees(k * 1e-3):.2f}°")
+    log_cost = (time.perf_counter() - t0) / n
+    handler.close()
+
+    recorder = TrajectoryRecorder(os.path.join(directory, "positions.traj"))
+    t0 = time.perf_counter()
+    for k in range(n):
+        recorder.record(time.time(), k * 0.1, k * 0.2, k * 1e-3, 100.0, 100.0)
+    record_cost = (time.perf_counter() - t0) / n
+    recorder.close()
+    records = load_trajectory(recorder.path)
+    print(f"logging: {log_cost * 1e6:.1f} µs par pas, enregistreur: {record_cost * 1e6:.2f} µs par pas "
+          f"({len(records)} enregistrements relus, {os.path.getsize(recorder.path) / n:.0f} octets chacun)")
+    t0 = time.perf_counter()
+    export_text(recorder.path, os.path.join(directory, "export.log"))
+    print(f"export texte: {time.perf_counter() - t0:.2f} s")
@@ -0,0 +1,57 @@
+import numpy as np
+from vision.raycast import RaycastCamera
+from vision.color_lut import ColorClassifier
+from vision.oracle import BeaconOracle
+
+
+class HeadlessCameraView:
+    """
+    Remplace UrsinaView auprès des stratégies de vision, sans fenêtre ni GPU :
+    get_robot_camera_image() rend la vue du robot avec RaycastCamera et
+    detect_blue_beacon() applique le même détecteur.
+
+    Permet de lancer FollowBeaconByCommandsStrategy dans une simulation en lot.
+    """
+
+    def __init__(self, robot_model, map_model, beacons=None, **camera_options):
+        self.robot_model = robot_model
+        self.camera = RaycastCamera(map_model, beacons=beacons, **camera_options)
+        self.color_classifier = ColorClassifier(channel_order=self.camera.channel_order)
+        self._frame = np.empty((self.camera.height, self.camera.width, 3), np.uint8)
+        self.img_array = None
+
+    def get_robot_camera_image(self):
+        """Image de la pose courante du robot, dans un tampon réutilisé."""
+        robot = self.robot_model
+        self.img_array = self.camera.render(robot.x, robot.y, robot.direction_angle, out=self._frame)
+        return self.img_array
+
+    def detect_blue_beacon(self, img_array=None, roi=None):
+        """Renvoie (radius, cx, cy) du plus grand spot bleu détecté, ou None."""
+        if img_array is None:
+            img_array = self.img_array
+        if img_array is None:
+            return None
+        return self.color_classifier.detect(img_array, colors=("blue",), roi=roi).get("blue")
+
+
+class OracleCameraView:
+    """
+    Comme HeadlessCameraView, mais la détection est calculée par BeaconOracle
+    (projection de MapModel.end_position) : aucune image n'est rendue.
+    get_robot_camera_image() renvoie une image sans canal, qui n'a que les
+    dimensions attendues par les stratégies.
+    """
+
+    def __init__(self, robot_model, map_model, **oracle_options):
+        self.robot_model = robot_model
+        self.oracle = BeaconOracle(map_model, **oracle_options)
+        self.img_array = np.empty((self.oracle.height, self.oracle.width, 0), np.uint8)
+
+    def get_robot_camera_image(self):
+        return self.img_array
+
+    def detect_blue_beacon(self, img_array=None, roi=None):
+        """Renvoie (radius, cx, cy) de la balise projetée, ou None (la ROI est ignorée)."""
+        robot = self.robot_model
+        return self.oracle.locate(robot.x, robot.y, robot.direction_angle)
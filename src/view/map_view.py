@@ -57,6 +57,10 @@ class MapView:
         """Creates a line on the canvas."""
         return self.canvas.create_line(p1, p2, fill=fill, width=width)
 
+    def update_line(self, line_id, points):
+        """Replaces the vertices of an existing line (no new canvas item)."""
+        self.canvas.coords(line_id, *[c for point in points for c in point])
+
     def create_polygon(self, points, fill="red", outline="black"):
         """Creates a polygon on the canvas."""
         return self.canvas.create_polygon(points, fill=fill, outline=outline)
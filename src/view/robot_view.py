@@ -13,8 +13,20 @@ class RobotView:
         self.speed_label.pack()
         self.WHEEL_BASE_WIDTH = sim_controller.robot_model.WHEEL_BASE_WIDTH
         sim_controller.add_state_listener(self.update_display)
+        self.trajectory = sim_controller.trajectory
         self.last_x = None
         self.last_y = None
+        # Éléments persistants du canvas, déplacés par coords() à chaque pas :
+        # le robot, la trace récente (prolongée point par point) et l'historique
+        # (une seule ligne, reconstruite depuis la trajectoire partagée quand la
+        # trace récente atteint trace_segment points)
+        self.robot_item = None
+        self.trace_item = None
+        self.history_item = None
+        self.trace_points = []          # Coordonnées aplaties de la trace récente
+        self.trace_segment = 256
+        self.history_budget = 4000
+        self.history_resolution = 1.0   # px
 
     def update_display(self, state):
         self.parent.after(0, self._safe_update, state)
@@ -25,13 +37,11 @@ class RobotView:
 
     def _draw_robot(self, state):
         """Dessiner le robot avec self.x et self.y"""
-        self.canvas.delete("robot")
         x, y = state['x'], state['y']
         direction_angle = state['angle']
 
-        if self.last_x is not None and self.last_y is not None:
-            self.canvas.create_line(self.last_x, self.last_y, x, y, fill="gray", width=2, tags="trace")
-        
+        if (x, y) != (self.last_x, self.last_y):
+            self._extend_trace(x, y)
         self.last_x = x
         self.last_y = y
         
@@ -39,8 +49,36 @@ class RobotView:
         front = (x + size * math.cos(direction_angle),y + size * math.sin(direction_angle))
         left = (x + (self.WHEEL_BASE_WIDTH / 2) * math.cos(direction_angle + math.pi / 2), y + (self.WHEEL_BASE_WIDTH / 2) * math.sin(direction_angle + math.pi / 2))
         right = (x + (self.WHEEL_BASE_WIDTH / 2) * math.cos(direction_angle - math.pi / 2), y + (self.WHEEL_BASE_WIDTH / 2) * math.sin(direction_angle - math.pi / 2))
-        
-        self.canvas.create_polygon(front, left, right, fill="blue", tags="robot")
+
+        if self.robot_item is None:
+            self.robot_item = self.canvas.create_polygon(front, left, right, fill="blue", tags="robot")
+        else:
+            self.canvas.coords(self.robot_item, *front, *left, *right)
+
+    def _extend_trace(self, x, y):
+        """Prolonge la trace récente ; pleine, elle passe dans l'historique."""
+        self.trace_points += (x, y)
+        if len(self.trace_points) < 4:
+            return
+        if self.trace_item is None:
+            self.trace_item = self.canvas.create_line(*self.trace_points, fill="gray", width=2, tags="trace")
+            self.canvas.tag_raise("robot")
+        else:
+            self.canvas.coords(self.trace_item, *self.trace_points)
+        if len(self.trace_points) >= 2 * self.trace_segment:
+            self._refresh_history()
+            self.trace_points = [x, y]  # La trace récente repart du dernier point
+
+    def _refresh_history(self):
+        points = self.trajectory.points(self.history_resolution, self.history_budget)
+        if len(points) < 2:
+            return
+        if self.history_item is None:
+            self.history_item = self.canvas.create_line(*points.ravel().tolist(), fill="gray", width=2,
+                                                        tags="trace")
+            self.canvas.tag_raise("robot")
+        else:
+            self.canvas.coords(self.history_item, *points.ravel().tolist())
 
     def _update_labels(self, state):
         angle_deg = math.degrees(state['angle'])
@@ -51,6 +89,10 @@ class RobotView:
         """Clears the robot from the canvas."""
         self.canvas.delete("robot")
         self.canvas.delete("trace")
+        self.robot_item = None
+        self.trace_item = None
+        self.history_item = None
+        self.trace_points = []
         self.last_x = None
         self.last_y = None
 
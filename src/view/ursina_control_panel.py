@@ -1,5 +1,6 @@
 from ursina import Button, Text, color
 from controller.StrategyAsync import FollowBeaconByCommandsStrategy
+from controller.control_loop import ControlLoop
 import threading
 import time 
 
@@ -39,7 +40,13 @@ class UrsinaControlPanel:
             Button(text='Reset', color=color.red, text_color=color.black, position=(-0.8, -0.15), scale=(0.2, 0.08),
                    on_click=self.reset_simulation),
             Button(text='Stop Wall', color=color.orange, text_color=color.black, position=(-0.8, -0.25), scale=(0.2, 0.08),
-                   on_click=self.stop_before_wall)
+                   on_click=self.stop_before_wall),
+            Button(text='Smooth Square', color=color.cyan, text_color=color.black, position=(-0.8, -0.35), scale=(0.2, 0.08),
+                   on_click=self.draw_smooth_square),
+            Button(text='Balise sauf mur', color=color.yellow, text_color=color.black, position=(-0.8, -0.45), scale=(0.2, 0.08),
+                   on_click=self.follow_beacon_unless_wall),
+            Button(text='Mission', color=color.lime, text_color=color.black, position=(-0.58, 0.45), scale=(0.2, 0.08),
+                   on_click=self.run_mission)
         ]
 
         self.status_text = Text(text='Mode: None', position=(-0.85, 0.55), origin=(0, 0), scale=1.2)
@@ -116,6 +123,73 @@ class UrsinaControlPanel:
         self.beacon_thread = threading.Thread(target=run_strategy, daemon=True)
         self.beacon_thread.start()
 
+    def follow_beacon_unless_wall(self):
+        """ suit la balise, arrêt devant un mur (arbre de comportement) """
+        if not self.simulation_controller.simulation_running:
+            print("⚠️ Veuillez d'abord démarrer la simulation.")
+            return
+
+        if self.beacon_thread and self.beacon_thread.is_alive():
+            print("⚠️  Suivi de balise déjà en cours - ignorer.")
+            return
+        from controller.behavior_tree import FollowBeaconUnlessWall
+
+        # Selector(Guard(distance >= 100, FollowBeacon), StopBeforeWall)
+        self.beacon_strategy = FollowBeaconUnlessWall(self.simulation_controller.robot_model, self.ursina_view,
+                                                      distance_threshold=100)
+
+        def run_strategy():
+            strategy = self.beacon_strategy
+            strategy.start()
+            loop = ControlLoop(period=0.02)
+            loop.run(strategy.step,
+                     until=lambda: not self.simulation_controller.simulation_running or strategy.is_finished())
+            print(f"✅ Balise sauf mur terminée ({strategy.status}) : {strategy.report()}")
+            self.beacon_thread = None
+            self.beacon_strategy = None
+
+        self.beacon_thread = threading.Thread(target=run_strategy, daemon=True)
+        self.beacon_thread.start()
+
+    def run_mission(self):
+        """ rejoint la balise en contournant les obstacles (MissionPlanner + MissionStrategy) """
+        if not self.simulation_controller.simulation_running:
+            print("⚠️ Veuillez d'abord démarrer la simulation.")
+            return
+
+        if self.square_thread and self.square_thread.is_alive():
+            print("⚠️  Parcours déjà en cours - ignorer.")
+            return
+        if self.map_model.end_position is None:
+            print("⚠️ Veuillez d'abord placer la balise.")
+            return
+        from controller.mission_planner import MissionPlanner, MissionStrategy
+
+        robot = self.simulation_controller.robot_model
+        planner = MissionPlanner(self.map_model, (robot.x, robot.y), {"balise": self.map_model.end_position})
+        try:
+            self.square_strategy = MissionStrategy(planner, robot, vitesse=700,
+                                                   start_angle=robot.direction_angle)
+        except ValueError as e:
+            print(f"⚠️ {e}")
+            return
+
+        def run_strategy():
+            strategy = self.square_strategy
+            strategy.start()
+            loop = ControlLoop(period=0.02)
+            try:
+                loop.run(strategy.step,
+                         until=lambda: not self.simulation_controller.simulation_running or strategy.is_finished())
+            finally:
+                planner.close()     # Aussi après un Reset : la carte ne garde pas la matrice
+            print(f"✅ Mission terminée : {strategy.order}, {strategy.total_cost:.0f} cm prévus")
+            self.square_thread = None
+            self.square_strategy = None
+
+        self.square_thread = threading.Thread(target=run_strategy, daemon=True)
+        self.square_thread.start()
+
     def draw_square(self):
         """ exécution de la stratégie de dessin de carré par le robot """
         if not self.simulation_controller.simulation_running:
@@ -127,7 +201,7 @@ class UrsinaControlPanel:
             return
         from controller.StrategyAsync import PolygonStrategy
         
-        self.square_strategy = PolygonStrategy(4,self.simulation_controller.robot_model, side_length_cm=500, vitesse_avance=1050, vitesse_rotation=260)
+        self.square_strategy = PolygonStrategy(4,self.simulation_controller.robot_model, side_length_cm=500, vitesse_avance=1050, vitesse_rotation=260, acceleration=3000)
         
         def run_strategy():
             delta_time = 0.02  # renouvelement 20 ms par fois
@@ -142,6 +216,34 @@ class UrsinaControlPanel:
         self.square_thread = threading.Thread(target=run_strategy, daemon=True)
         self.square_thread.start()
 
+    def draw_smooth_square(self):
+        """ exécution du carré par poursuite pure, sans arrêt aux coins """
+        if not self.simulation_controller.simulation_running:
+            print("⚠️ Veuillez d'abord démarrer la simulation.")
+            return
+
+        if self.square_thread and self.square_thread.is_alive():
+            print("⚠️  Carré déjà en cours - ignorer.")
+            return
+        from controller.StrategyAsync import PolygonPursuitStrategy
+
+        self.square_strategy = PolygonPursuitStrategy(4, self.simulation_controller.robot_model, side_length_cm=500, vitesse_avance=1050)
+
+        def run_strategy():
+            strategy = self.square_strategy
+            strategy.start()
+            # 50 Hz sur échéances absolues, dt réellement écoulé passé à step()
+            loop = ControlLoop(period=0.02)
+            loop.run(strategy.step,
+                     until=lambda: not self.simulation_controller.simulation_running or strategy.is_finished())
+            print(loop.report())
+
+            self.square_thread = None
+            self.square_strategy = None
+
+        self.square_thread = threading.Thread(target=run_strategy, daemon=True)
+        self.square_thread.start()
+
     def reset_simulation(self):
         if self.square_strategy:
             self.square_strategy.finished = True
@@ -1,14 +1,28 @@
 from ursina import *
 from panda3d.core import Texture, GraphicsOutput, GraphicsPipe, WindowProperties, FrameBufferProperties
 import time
+import atexit
 from controller.StrategyAsync import FollowBeaconByCommandsStrategy
 import numpy as np
 from PIL import Image
 import cv2
+from vision.color_lut import ColorClassifier
+from vision.tracking import BeaconTracker
+from vision.worker import VisionWorker
+from vision.acquisition import TextureFrameGrabber
+from vision.shared_ring import VisionProcess
+from vision.recording import FrameRecorder
 
 
 class UrsinaView(Entity):
-    def __init__(self, simulation_controller, control_panel):
+    # Taille (largeur, hauteur) de la caméra embarquée : fenêtre Panda3D et anneau d'images
+    CAMERA_SIZE = (400, 300)
+
+    def __init__(self, simulation_controller, control_panel, vision_process=False):
+        """
+        :param vision_process: détection dans un processus séparé (images en
+                               mémoire partagée) plutôt que dans un thread
+        """
         super().__init__()
         self.simulation_controller = simulation_controller
         self.control_panel = control_panel
@@ -16,11 +30,29 @@ class UrsinaView(Entity):
         self.create_scene()
         self.trail_points = []
         self.trail_entity = None
-        self.create_robot_camera_window()
+        self.trail_revision = None
+        self.trail_budget = 2000     # Sommets au plus dans le maillage de la trace
+        self.trail_resolution = 2.0  # cm
         self.frame_counter = 0
         self.img_array = None
+        self.frame_recorder = None      # Enregistrement continu ('r')
+        # Images lues dans l'ordre natif de Panda3D (BGR) : table construite pour cet ordre
+        self.color_classifier = ColorClassifier(channel_order=TextureFrameGrabber.channel_order)
+        # Détection hors du thread de rendu : update() dépose l'image, le worker
+        # publie la dernière détection (lue par le HUD et FollowBeaconByCommandsStrategy)
+        if vision_process:
+            width, height = self.CAMERA_SIZE
+            self.vision_worker = VisionProcess(shape=(height, width, 3),
+                                               channel_order=TextureFrameGrabber.channel_order)
+        else:
+            self.beacon_tracker = BeaconTracker(self.detect_blue_beacon)
+            self.vision_worker = VisionWorker(self.beacon_tracker.locate)
+        self.vision_worker.start()
+        atexit.register(self.vision_worker.stop)
+        self.create_robot_camera_window()
 
         self.speed_label = Text(text='Speed: L=0°/s  R=0°/s\nAngle: 0°', position=(-0.68,-0.45), origin=(0,0), scale=1, color=color.black)
+        self.beacon_label = Text(text='Beacon: -', position=(0.55,-0.45), origin=(0,0), scale=1, color=color.black)
 
     def create_scene(self):
         # le sol
@@ -74,7 +106,7 @@ class UrsinaView(Entity):
 
     def create_robot_camera_window(self):
         props = WindowProperties()
-        props.setSize(400, 300)
+        props.setSize(*self.CAMERA_SIZE)
         props.setTitle("🤖 Robot First-Person View")
 
         fb_props = FrameBufferProperties()
@@ -96,31 +128,46 @@ class UrsinaView(Entity):
         self.robot_cam.setHpr(-90, 0, 0)
         self.robot_cam_window.addRenderTexture(self.robot_cam_texture, GraphicsOutput.RTMCopyRam)
         self.robot_cam.node().getLens().setFov(50)
+        # En mode processus, les trames sont écrites directement dans la mémoire partagée
+        self.frame_grabber = TextureFrameGrabber(self.robot_cam_texture,
+                                                 ring=getattr(self.vision_worker, "ring", None))
     
     def get_robot_camera_image(self):
-        texture = self.robot_cam_texture
-
-        if texture.hasRamImage():
-            data = texture.getRamImageAs('RGB')
-            width = texture.getXSize()
-            height = texture.getYSize()
-            try:
-                self.img_array = np.frombuffer(data, dtype=np.uint8)
-                self.img_array = self.img_array.reshape((height,width,3))
-            except Exception as e:
-                print("Error while capturing image:",e)
-                return None
-            return self.img_array
-        else:
+        """
+        Image courante de la caméra embarquée (BGR, lignes de bas en haut),
+        copiée dans un tampon réutilisé ; si l'emplacement suivant est en cours
+        d'analyse, la dernière trame publiée. None si la texture n'est pas prête.
+        """
+        frame = self._grab_camera_image()
+        return frame if frame is not None else self.frame_grabber.latest()
+
+    def _grab_camera_image(self):
+        """Nouvelle trame de la caméra embarquée, ou None (texture pas prête, emplacement occupé)."""
+        try:
+            return self.frame_grabber.grab(busy=self.vision_worker.busy)
+        except Exception as e:
+            print("Error while capturing image:",e)
             return None
-    
+
+    def submit_camera_image(self, img_array):
+        """Dépose l'image pour le worker de vision, avec la rotation courante du robot."""
+        robot_model = self.simulation_controller.robot_model
+        speeds = robot_model.motor_speeds
+        turn_rate = (math.radians(speeds.get("left", 0) - speeds.get("right", 0))
+                     * robot_model.WHEEL_RADIUS / robot_model.WHEEL_BASE_WIDTH)
+        now = time.monotonic()
+        last = self.vision_worker.latest()
+        delta_time = now - last.timestamp if last is not None else 0.0
+        self.vision_worker.submit(img_array, now, turn_rate=turn_rate, delta_time=delta_time)
+
     def save_robot_camera_image(self):
         """
         Converts the image from the texture to PIL Image and saves it to disk
         """
-        if self.img_array is not None:
-            pil_img = Image.fromarray(self.img_array)
-            pil_img = pil_img.transpose(Image.FLIP_TOP_BOTTOM)
+        img_array = self.img_array if self.img_array is not None else self.frame_grabber.latest()
+        if img_array is not None:
+            # Vue à l'endroit, canaux remis en RGB pour PIL
+            pil_img = Image.fromarray(np.ascontiguousarray(self.frame_grabber.flipped(img_array)[..., ::-1]))
             filename = f"robot_camera_{self.frame_counter}.png"
             pil_img.save(filename)
             print(f"Image saved as '{filename}'.")
@@ -146,10 +193,18 @@ class UrsinaView(Entity):
         self.speed_label.text = f"Speed: L={left_speed:.2f}°/s  R={right_speed:.2f}°/s\nAngle: {angle_deg:.1f}°"
 
         self.frame_counter += 1
-        self.img_array = self.get_robot_camera_image()
-        beacon_pos = self.detect_blue_beacon()
-        if beacon_pos:
-            print(f"Beacon bleu détecté en pixel : {beacon_pos}")
+        self.img_array = self._grab_camera_image()     # Seules les nouvelles trames partent au worker
+        if self.img_array is not None:
+            self.submit_camera_image(self.img_array)
+            if self.frame_recorder is not None:
+                self.frame_recorder.record(self.img_array, robot_posx, robot_posy, robot_angle)
+        detection = self.vision_worker.latest()
+        if detection is not None and detection.beacon:
+            radius, cx, cy = detection.beacon
+            self.beacon_label.text = (f"Beacon: r={radius:.0f}px ({cx}, {cy})\n"
+                                      f"latence {detection.latency * 1000:.0f} ms")
+        else:
+            self.beacon_label.text = 'Beacon: -'
 
         if not self.simulation_controller.simulation_running:
             return
@@ -170,9 +225,12 @@ class UrsinaView(Entity):
 
 
                 
-        current_pos = (self.robot_entity.position.x, 0.1, self.robot_entity.position.z)
-        if not self.trail_points or self.trail_points[-1] != current_pos:
-            self.trail_points.append(current_pos)
+        # Trace reconstruite depuis la trajectoire partagée quand elle a changé
+        trajectory = self.simulation_controller.trajectory
+        if trajectory.revision != self.trail_revision:
+            self.trail_revision = trajectory.revision
+            points = trajectory.points(self.trail_resolution, self.trail_budget)
+            self.trail_points = [(px / 100 - 40, 0.1, py / 100 - 30) for px, py in points.tolist()]
             if len(self.trail_points) >= 2:
                 if self.trail_entity is None:
                     self.trail_entity = Entity(
@@ -183,7 +241,6 @@ class UrsinaView(Entity):
                     self.trail_entity.model.vertices = self.trail_points
                     self.trail_entity.model.generate()
 
-        self.img_array = self.get_robot_camera_image()
     # 2. Sauvegarder immédiatement, si présence d'image (pas obligatoire comme les images sont conservés dans la mémoire)
         # if self.img_array is not None:
         #     self.save_robot_camera_image()
@@ -191,6 +248,21 @@ class UrsinaView(Entity):
     def input(self, key):
         if key == 'p':
             self.save_robot_camera_image()
+        if key == 'r':
+            self.toggle_recording()
+
+    def toggle_recording(self):
+        """Démarre ou arrête l'enregistrement des images et de la pose (relu par FrameRecording)."""
+        if self.frame_recorder is None:
+            directory = time.strftime("recording_%Y%m%d_%H%M%S")
+            self.frame_recorder = FrameRecorder(directory, channel_order=TextureFrameGrabber.channel_order)
+            atexit.register(self.frame_recorder.close)
+            print(f"Enregistrement dans '{directory}'.")
+        else:
+            recorder, self.frame_recorder = self.frame_recorder, None
+            atexit.unregister(recorder.close)
+            recorder.close()
+            print(f"Enregistrement terminé : {recorder.recorded} image(s), {recorder.dropped} ignorée(s).")
 
     def handle_floor_click(self):
         pos = mouse.world_point
@@ -238,6 +310,7 @@ class UrsinaView(Entity):
     def reset_ursina_view(self):
         self.simulation_controller.reset_simulation()
         self.trail_points = []
+        self.trail_revision = None
         if self.trail_entity is not None:
             self.trail_entity.disable()
             self.trail_entity = None
@@ -258,44 +331,16 @@ class UrsinaView(Entity):
                 destroy(obstacle_entity)
             self.control_panel.map_model.remove_obstacle(obstacle_id)
 
-    def detect_blue_beacon(self, img_array=None):
+    def detect_blue_beacon(self, img_array=None, roi=None):
         """
         Renvoie (radius, cx, cy) du plus grand spot bleu détecté,
         ou None s'il n'y en a pas.
+        roi : fenêtre (x0, y0, x1, y1) où chercher, None pour toute l'image.
         """
         if img_array is None:
             img_array = self.img_array
         if img_array is None:
             return None
 
-        # Flip vertical si nécessaire
-        frame = np.flipud(img_array)
-
-        # Conversion RGB→BGR puis HSV
-        bgr = cv2.cvtColor(frame, cv2.COLOR_RGB2BGR)
-        hsv = cv2.cvtColor(bgr, cv2.COLOR_BGR2HSV)
-
-        # Masque pour le bleu
-        lower_blue = np.array([100, 150, 50])
-        upper_blue = np.array([140, 255, 255])
-        mask = cv2.inRange(hsv, lower_blue, upper_blue)
-
-        # Nettoyage du masque
-        kernel = np.ones((5,5), np.uint8)
-        mask = cv2.morphologyEx(mask, cv2.MORPH_OPEN,  kernel)
-        mask = cv2.morphologyEx(mask, cv2.MORPH_CLOSE, kernel)
-
-        # Contours
-        contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
-        if not contours:
-            return None
-
-        # Plus grand contour
-        c = max(contours, key=cv2.contourArea)
-
-        # Cercle minimal englobant
-        (cx, cy), radius = cv2.minEnclosingCircle(c)
-        if radius < 5:    # filtre optionnel des petits bruits
-            return None
-
-        return radius, int(cx), int(cy)
\ No newline at end of file
+        # Classification par table précalculée, coordonnées dans l'image retournée
+        return self.color_classifier.detect(img_array, colors=("blue",), roi=roi).get("blue")
@@ -34,8 +34,8 @@ class VPythonControlPanel:
             ("Follow Balise", self.suivre), 
             ("Reset", self.reset_all),
             ("stop", self.vpython_view.stop) ,
-            ("prendre photo", self.vpython_view.capture_embedded_image) ,
-            ("analyze", self.vpython_view.analyze_image) 
+            ("prendre photo", lambda _: self.vpython_view.capture_embedded_image()) ,
+            ("analyze", lambda _: self.vpython_view.analyze_image()) 
 
         ]
 
@@ -92,37 +92,29 @@ class VPythonControlPanel:
         run_strategy()
 
     def suivre(self):
-        """Permet au robot de suivre la balise en utilisant l'analyse d'image."""
-        from controller.StrategyAsync import FollowBeaconByImageStrategy
-        import time, threading
-
-        # Récupérer le modèle de robot et la vue depuis le contrôleur de simulation.
-        # Ici, 'simulation_controller.robot_model' est l'adaptateur
-        # et 'simulation_controller.vpython_view' est l'instance de VpythonView.
-
-        # Instanciation de la stratégie avec les paramètres souhaités.
-        strategy = FollowBeaconByImageStrategy(
-            vitesse_rotation=500,
-            vitesse_avance=1500,
-            tolerance_angle=1,
-            tolerance_radius=20,
-            step_distance=10,
+        """Suit la balise bleue vue par la caméra embarquée (détections du processus de vision s'il y en a un)."""
+        from controller.StrategyAsync import FollowBeaconByCommandsStrategy
+        from controller.control_loop import ControlLoop
+
+        if not self.simulation_controller.simulation_running:
+            print("⚠️ Veuillez d'abord démarrer la simulation.")
+            return
+
+        strategy = FollowBeaconByCommandsStrategy(
             adapter=self.simulation_controller.robot_model,
-            vpython_view=self.vpython_view
+            ursina_view=self.vpython_view
         )
 
         def run_strategy():
-            delta_time = 0.02  # Intervalle de temps en secondes
-            strategy.start()   # Démarrage de la stratégie
-            while not strategy.is_finished():
-                strategy.step(delta_time)
-                time.sleep(delta_time)
+            strategy.start()
+            loop = ControlLoop(period=0.02)
+            loop.run(strategy.step,
+                     until=lambda: not self.simulation_controller.simulation_running or strategy.is_finished())
+            print("✅ FollowBeaconByCommandsStrategy terminée (ou interrompue).")
 
         # Lancer la stratégie dans un thread en arrière-plan.
         threading.Thread(target=run_strategy, daemon=True).start()
 
-
-
     def reset_all(self):
         """ Adaptation de la version GUI de Reset, réinitialisation de l'affichage VPython """
         if self.start_box:
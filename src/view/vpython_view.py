@@ -2,21 +2,44 @@ from vpython import *
 import threading
 import time
 import math
-import base64  # Vous n'aurez plus besoin de base64 ici, mais on peut le laisser
 import os
-# Imports nécessaires pour la capture en mémoire
-from PIL import Image
-import numpy as np 
-import cv2 # Make sure cv2 is imported at the top
+import numpy as np
+import cv2
+from vision.frame_ring import FrameRing
+from vision.color_lut import ColorClassifier
 
 class VpythonView:
-    def __init__(self, simulation_controller, key_handler):
-        """ Initialisation de la vue 3D """
+    # Taille (largeur, hauteur) de la vue embarquée : canevas, anneau et détection
+    CAMERA_SIZE = (400, 300)
+
+    def __init__(self, simulation_controller, key_handler, frame_source=None, vision_process=None):
+        """
+        Initialisation de la vue 3D
+
+        :param vision_process: VisionProcess à alimenter ; les images sont alors
+                               capturées directement dans sa mémoire partagée, et
+                               ses détections lues par FollowBeaconByCommandsStrategy
+                               (vision_worker)
+        """
         self.simulation_controller = simulation_controller
-        # self.images stockera maintenant des tableaux NumPy (images OpenCV)
-        self.images=[] 
+        # Dernières images de la caméra embarquée (BGR, de haut en bas), dans un anneau préalloué
+        self.vision_process = vision_process
+        self.vision_worker = vision_process
+        width, height = self.CAMERA_SIZE
+        self.frames = vision_process.ring if vision_process is not None else FrameRing(10, (height, width, 3))
+        self.color_classifier = ColorClassifier(channel_order="BGR", flip=False)
+        # Rendu en mémoire optionnel : callable(out, state) -> bool qui dessine
+        # l'image dans `out` ; sinon capture par le navigateur (fichier PNG)
+        self.frame_source = frame_source
+        if frame_source is None:
+            # VPython ne renvoie pas les pixels à Python : chaque image fait l'aller-retour
+            # navigateur → PNG sur disque → décodage (voir _capture_from_browser)
+            print("[WARN] Caméra embarquée capturée par le navigateur (PNG sur disque, quelques "
+                  "images/s) ; --raycast-camera pour un rendu en mémoire.")
+        self.last_state = None
+        self._pending_capture = None
+        self.captures_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "captures")
         self._running = False
-        self._lock = threading.Lock()
         self.frame_rate = 30
 
         # Création de la scène principale
@@ -39,11 +62,16 @@ class VpythonView:
         # Lien avec le contrôleur de simulation
         self.simulation_controller.add_state_listener(self.update_robot)
 
-        # Trajectoire du robot
+        # Trajectoire du robot : les nouvelles positions sont ajoutées à la courbe,
+        # reconstruite depuis simulation_controller.trajectory (décimée) dès
+        # qu'elle dépasse path_budget points
         self.path = curve(color=color.red, radius=1)
+        self.path_budget = 4000
+        self.path_resolution = 1.0  # cm
+        self._path_points = 0
 
         # Ajout de la vue de la caméra embarquée (fenêtre secondaire)
-        self.embedded_view = canvas(title="Vue embarquée", width=400, height=300, x=810, y=0)
+        self.embedded_view = canvas(title="Vue embarquée", width=width, height=height, x=810, y=0)
         self.embedded_view.background = color.gray(0.8)
 
         # Lancement du thread de rendu
@@ -54,6 +82,7 @@ class VpythonView:
 
     def update_robot(self, state):
         """ Mise à jour de la position du robot et de la vue embarquée """
+        self.last_state = state
         x, y = state['x'], state['y']
         angle = state['angle']
 
@@ -62,7 +91,7 @@ class VpythonView:
         self.wheel_left.pos = vector(x - 10 * math.sin(angle), 3, y + 10 * math.cos(angle))
         self.wheel_right.pos = vector(x + 10 * math.sin(angle), 3, y - 10 * math.cos(angle))
         self.direction_marker.pos = vector(x + 10 * math.cos(angle), 10, y + 10 * math.sin(angle))
-        self.path.append(vector(x, 0, y))
+        self._extend_path(x, y)
 
         # Mise à jour de la vue embarquée (caméra sur le robot)
         cam_pos = vector(x, 5 + 8, y)
@@ -80,135 +109,135 @@ class VpythonView:
         self.scene.caption = speed_text
 
 
+    def _extend_path(self, x, y):
+        if self._path_points < self.path_budget:
+            self.path.append(vector(x, 0, y))
+            self._path_points += 1
+            return
+        points = self.simulation_controller.trajectory.points(self.path_resolution, self.path_budget // 2)
+        self.path.clear()
+        self.path.append([vector(px, 0, py) for px, py in points.tolist()])
+        self._path_points = len(points)
+
     def start_capture(self):
-        """Démarre la simulation de capture continue"""
+        """Démarre la capture continue"""
         self._running = True
-        self.thread = threading.Thread(target=self._capture_loop)
-        self.thread.start()
-        
+        self.capture_thread = threading.Thread(target=self._capture_loop, daemon=True)
+        self.capture_thread.start()
+
     def stop_capture(self):
-        """Arrête la simulation"""
+        """Arrête la capture"""
         self._running = False
-        self.thread.join()
+        self.capture_thread.join()
 
     def _capture_loop(self):
-        """Boucle de capture réaliste avec timing précis"""
+        """Boucle de capture : une image par période, directement dans l'anneau"""
+        period = 1.0 / self.frame_rate
         while self._running:
             start_time = time.time()
             self.capture_embedded_image()
-            # Capturer une image environ toutes les secondes
-            sleep_time = 1.0 
-            time_elapsed = time.time() - start_time
-            actual_sleep = max(0, sleep_time - time_elapsed)
+            actual_sleep = period - (time.time() - start_time)
             if actual_sleep > 0:
                 time.sleep(actual_sleep)
 
-
-
-    def get_latest_image(self):
-        """Récupère la dernière image avec métadonnées"""
-        with self._lock:
-            if self.images:
-                return self.images[-1]
-        return None
+    def get_latest_image(self, copy=False):
+        """
+        Récupère la dernière image (BGR). Sans copie, c'est une vue sur
+        l'anneau, valide jusqu'à ce que l'emplacement soit réécrit.
+        """
+        latest = self.frames.latest()
+        if latest is None:
+            return None
+        return latest[2].copy() if copy else latest[2]
+
+    def get_robot_camera_image(self):
+        """Dernière image de la vue embarquée (interface de UrsinaView pour les stratégies)."""
+        return self.get_latest_image()
+
+    def detect_blue_beacon(self, img_array=None, roi=None):
+        """Renvoie (radius, cx, cy) du plus grand spot bleu détecté, ou None."""
+        if img_array is None:
+            img_array = self.get_latest_image()
+        if img_array is None:
+            return None
+        return self.color_classifier.detect(img_array, colors=("blue",), roi=roi).get("blue")
 
     def capture_embedded_image(self):
-        """ Capture l'image, la sauvegarde, la relit et stocke le tableau NumPy si valide. """
-        image_path = None
+        """
+        Capture une image de la vue embarquée dans l'anneau préalloué.
+        Renvoie True si une nouvelle image a été publiée.
+        """
+        if self.frame_source is not None:
+            # Rendu direct dans l'emplacement suivant de l'anneau
+            if self.last_state is None or not self.frame_source(self.frames.acquire(), self.last_state):
+                return False
+            self.frames.commit()
+            self._publish()
+            return True
+        return self._capture_from_browser()
+
+    def _publish(self):
+        """Signale la nouvelle image au processus de détection."""
+        if self.vision_process is not None:
+            state = self.last_state or {}
+            turn_rate = (math.radians(state.get("left_speed", 0) - state.get("right_speed", 0))
+                         * self.simulation_controller.WHEEL_RADIUS / self.simulation_controller.WHEEL_BASE_WIDTH)
+            self.vision_process.submit(self.frames.latest()[2], turn_rate=turn_rate)
+
+    def _capture_from_browser(self):
+        """
+        VPython ne renvoie pas les pixels à Python : canvas.capture() fait écrire
+        un PNG par le navigateur, seul moyen de récupérer l'image (pas de charge
+        utile à décoder en mémoire). Une seule capture est en vol à la fois ; on
+        l'attend sans bloquer la boucle, on la décode (mise à l'échelle
+        directement dans l'emplacement de l'anneau) puis on supprime le fichier.
+        Le décodage seul coûte ~11 ms pour 800x600 : ce chemin reste limité à
+        quelques images par seconde, FrameSource (--raycast-camera) l'évite.
+        """
         try:
-            # Définir le chemin de sauvegarde dans un sous-dossier du projet
-            current_dir = os.path.dirname(os.path.abspath(__file__))
-            src_dir = os.path.dirname(current_dir)
-            captures_dir = os.path.join(src_dir, "captures")
-
-            if not os.path.exists(captures_dir):
-                os.makedirs(captures_dir)
-
-            # Utiliser un timestamp avec microsecondes pour garantir l'unicité
-            timestamp = time.strftime("%Y%m%d-%H%M%S") + f"-{int(time.time() * 1000000) % 1000000:06d}"
-            # Générer le nom de base SANS .png
-            base_filename = f"embedded_view_{timestamp}"
-            # Construire le chemin complet SANS .png pour VPython capture
-            vpython_capture_path = os.path.join(captures_dir, base_filename)
-
-            # 1. Sauvegarder l'image sur le disque (VPython ajoutera .png)
-            self.embedded_view.capture(vpython_capture_path)
-            # print(f"Attempted to save image via VPython capture with base: {vpython_capture_path}") # Debug
-
-            # 2. Attendre un court instant après la sauvegarde
-            print(f"{time.strftime('%H:%M:%S')} - Saved (presumably with mangled name), waiting 0.1s...")
-            time.sleep(3) 
-
-            # 3. Prédire le nom de fichier "bizarre" que VPython semble créer
-            # Prendre le chemin absolu de ce que nous avons passé à capture()
-            absolute_vpython_capture_path = os.path.abspath(vpython_capture_path)
-            # Remplacer les séparateurs de chemin par des underscores
-            mangled_base_name = absolute_vpython_capture_path.replace(os.path.sep, '_')
-            # Ajouter .png
-            predicted_actual_filename = mangled_base_name + ".png"
-            # Construire le chemin complet vers ce fichier dans le dossier de captures
-            absolute_mangled_path = os.path.join(captures_dir, predicted_actual_filename)
-
-            
-            # --- Debugging File System Visibility ---
-            print(f"{time.strftime('%H:%M:%S')} - Checking existence of predicted mangled path: {absolute_mangled_path}")
-            file_exists = os.path.exists(absolute_mangled_path)
-            print(f"{time.strftime('%H:%M:%S')} - Predicted mangled file exists? {file_exists}")
-            if not file_exists:
-                try:
-                    print(f"{time.strftime('%H:%M:%S')} - Listing directory contents of: {captures_dir}")
-                    dir_contents = os.listdir(captures_dir)
-                    print(f"{time.strftime('%H:%M:%S')} - Directory contents: {dir_contents}")
-                except Exception as list_err:
-                    print(f"{time.strftime('%H:%M:%S')} - Error listing directory: {list_err}")
-            # --- End Debugging ---
-
-            print(f"{time.strftime('%H:%M:%S')} - Attempting to read with Pillow: {os.path.basename(absolute_mangled_path)}")
-            
-            opencv_image = None # Initialiser à None
-            try:
-                # Utiliser Pillow pour ouvrir le fichier avec le nom "bizarre"
-                pil_image = Image.open(absolute_mangled_path)
-                pil_image.load() # Forcer le chargement des données
-                # Convertir l'image Pillow (RGB) en tableau NumPy OpenCV (BGR)
-                opencv_image = cv2.cvtColor(np.array(pil_image), cv2.COLOR_RGB2BGR)
-                pil_image.close() # Fermer le handle du fichier
-                print(f"{time.strftime('%H:%M:%S')} - Pillow read successful for {os.path.basename(absolute_mangled_path)}")
-            except FileNotFoundError:
-                 print(f"[WARN] Pillow Error: File not found at {absolute_mangled_path}. Skipping frame.")
-            except Exception as pil_err:
-                 print(f"[WARN] Pillow Error reading {os.path.basename(absolute_mangled_path)}: {pil_err}. Skipping frame.")
-            
-
-            # 4. Valider et stocker si la lecture et conversion ont réussi
-            if opencv_image is not None and opencv_image.size > 0:
-                # Ajouter l'image (tableau NumPy) à la liste de manière thread-safe
-                with self._lock:
-                    self.images.append(opencv_image)
-                    # Limiter la taille si nécessaire
-                    if len(self.images) > 10: # Garder seulement les 10 dernières images
-                        self.images.pop(0)
-                # print(f"Successfully read back and stored image: {os.path.basename(absolute_mangled_path)}") # Debug
+            if self._pending_capture is None:
+                if not os.path.exists(self.captures_dir):
+                    os.makedirs(self.captures_dir)
+                base_path = os.path.join(self.captures_dir, f"embedded_view_{self.frames.sequence}")
+                self.embedded_view.capture(base_path)
+                # VPython remplace les séparateurs du chemin absolu par des « _ »
+                mangled_name = os.path.abspath(base_path).replace(os.path.sep, '_') + ".png"
+                self._pending_capture = (os.path.join(self.captures_dir, mangled_name), time.monotonic())
+                return False
+
+            path, requested_at = self._pending_capture
+            if not os.path.exists(path):
+                if time.monotonic() - requested_at > 5.0:
+                    print(f"[WARN] Capture non reçue: {os.path.basename(path)}")
+                    self._pending_capture = None
+                return False
+            image = cv2.imread(path, cv2.IMREAD_COLOR)
+            if image is None:
+                return False    # Fichier encore en cours d'écriture
+            self._pending_capture = None
+            os.remove(path)
+            slot = self.frames.acquire()
+            if image.shape != self.frames.shape:
+                cv2.resize(image, (self.frames.shape[1], self.frames.shape[0]), dst=slot)
             else:
-                print(f"[WARN] Failed to read back image {os.path.basename(absolute_mangled_path)}. Skipping frame.")
-                # Optionnel: Supprimer le fichier potentiellement corrompu/vide
-                # if absolute_mangled_path and os.path.exists(absolute_mangled_path):
-                #     try:
-                #         os.remove(absolute_mangled_path)
-                #     except Exception as remove_err:
-                #         print(f"Error removing problematic file: {remove_err}")
-
-
+                np.copyto(slot, image)
+            self.frames.commit(requested_at)
+            self._publish()
+            return True
         except Exception as e:
-            print(f"Error during capture/read-back process for {predicted_actual_filename}: {e}")
-
+            print(f"Error during capture: {e}")
+            self._pending_capture = None
+            return False
 
-    def analyze_image(self, image_data):
+    def analyze_image(self, image_data=None):
         """
-        Analyse une image (fournie comme tableau NumPy) pour détecter une balise bleue.
+        Analyse une image (fournie comme tableau NumPy, par défaut la dernière
+        capture) pour détecter une balise bleue.
         Retourne une liste des informations sur les balises détectées (centre et rayon).
         """
         detections = []
+        if not isinstance(image_data, np.ndarray):
+            image_data = self.get_latest_image()
         # Pas besoin d'importer cv2/numpy ici si déjà fait globalement ou dans __init__
         # Assurez-vous que les imports sont présents au niveau du module.
         # try:
@@ -281,4 +310,5 @@ class VpythonView:
         self.wheel_right.axis = vector(0, 6, 0)
         self.direction_marker.pos = vector(400, 10, 310)
         self.path.clear()
+        self._path_points = 0
         self.scene.caption = "Left: 0.0°/s, Right: 0.0°/s, Angle: 0.0°"
@@ -0,0 +1,138 @@
+import numpy as np
+from vision.frame_ring import FrameRing
+
+
+class TextureFrameGrabber:
+    """
+    Lecture de la texture caméra Panda3D dans un anneau préalloué.
+
+    getRamImage() expose l'image dans le format natif de Panda3D (BGR ou BGRA
+    pour les textures 8 bits), sans conversion : on la lit en place
+    (memoryview) et on ne copie que ses trois canaux dans l'emplacement
+    suivant de l'anneau. Aucune image n'est allouée par trame ; le détecteur
+    travaille directement en BGR (ColorClassifier(channel_order="BGR")).
+
+    Les lignes sont stockées de bas en haut : flipped() renvoie l'image à
+    l'endroit sous forme de vue.
+    """
+
+    channel_order = "BGR"
+
+    def __init__(self, texture, capacity=4, ring=None):
+        """:param ring: anneau à remplir (ex. VisionProcess.ring), sinon créé à la première trame"""
+        self.texture = texture
+        self.capacity = capacity
+        self.ring = ring
+        self.skipped = 0        # Trames ignorées car l'emplacement était en cours d'analyse
+
+    def grab(self, busy=None):
+        """
+        Copie la trame courante dans l'anneau et renvoie sa vue, ou None.
+
+        :param busy: image en cours d'utilisation (ex. VisionWorker.busy) à ne
+                     pas écraser ; la trame est alors ignorée (latest() reste
+                     disponible pour qui veut une image quand même)
+        """
+        texture = self.texture
+        if not texture.hasRamImage():
+            return None
+        height, width = texture.getYSize(), texture.getXSize()
+        components = texture.getNumComponents()
+        if self.ring is None:
+            self.ring = FrameRing(self.capacity, (height, width, 3))
+        elif self.ring.shape != (height, width, 3):
+            raise ValueError(f"Texture {width}x{height} incompatible avec l'anneau {self.ring.shape}")
+        slot = self.ring.acquire()
+        if busy is not None and np.may_share_memory(slot, busy):
+            self.skipped += 1
+            return None
+        source = np.frombuffer(memoryview(texture.getRamImage()), dtype=np.uint8)
+        np.copyto(slot, source.reshape(height, width, components)[..., :3])
+        self.ring.commit()
+        return slot
+
+    def latest(self):
+        """Dernière trame lue (BGR, de bas en haut), ou None."""
+        if self.ring is None:
+            return None
+        latest = self.ring.latest()
+        return None if latest is None else latest[2]
+
+    @staticmethod
+    def flipped(frame):
+        """Vue de l'image remise à l'endroit (sans copie)."""
+        return frame[::-1]
+
+
+if __name__ == "__main__":
+    # Allocations par trame : ancienne lecture (getRamImageAs('RGB') + flipud +
+    # deux cvtColor) contre TextureFrameGrabber + détection LUT en BGR
+    import time
+    import tracemalloc
+    import cv2
+    from vision.color_lut import ColorClassifier
+
+    class FakeTexture:
+        """Texture BGRA 400 x 300 avec une balise bleue, comme la caméra Ursina."""
+        def __init__(self, width=400, height=300):
+            image = np.full((height, width, 4), 190, np.uint8)
+            cv2.circle(image, (200, 150), 40, (255, 0, 0, 255), -1)
+            self.data = bytearray(image.tobytes())
+            self.width, self.height = width, height
+
+        def hasRamImage(self):
+            return True
+
+        def getXSize(self):
+            return self.width
+
+        def getYSize(self):
+            return self.height
+
+        def getNumComponents(self):
+            return 4
+
+        def getRamImage(self):
+            return self.data
+
+        def getRamImageAs(self, order):
+            # Panda3D convertit dans un nouveau tableau
+            image = np.frombuffer(self.data, np.uint8).reshape(self.height, self.width, 4)
+            return image[..., 2::-1].tobytes()
+
+    def old_path(texture):
+        data = texture.getRamImageAs('RGB')
+        img = np.frombuffer(data, dtype=np.uint8).reshape((texture.getYSize(), texture.getXSize(), 3))
+        img = np.flipud(img)
+        bgr = cv2.cvtColor(img, cv2.COLOR_RGB2BGR)
+        hsv = cv2.cvtColor(bgr, cv2.COLOR_BGR2HSV)
+        return cv2.inRange(hsv, np.array([100, 150, 50]), np.array([140, 255, 255]))
+
+    texture = FakeTexture()
+    grabber = TextureFrameGrabber(texture)
+    classifier = ColorClassifier(channel_order="BGR")
+
+    def new_path(texture):
+        return classifier.detect(grabber.grab(), colors=("blue",))
+
+    def measure(path, frames=200):
+        for _ in range(10):     # Tampons de travail alloués à la première trame
+            path(texture)
+        tracemalloc.start()
+        tracemalloc.reset_peak()
+        before = tracemalloc.get_traced_memory()[0]
+        t0 = time.perf_counter()
+        for _ in range(frames):
+            path(texture)
+        elapsed = (time.perf_counter() - t0) / frames
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        return elapsed * 1000, (peak - before) / 1024
+
+    print("lecture + détection  ms/trame  pic alloué (Ko)")
+    print("ancienne       %8.2f %15.1f" % measure(old_path))
+    print("préallouée     %8.2f %15.1f" % measure(new_path))
+    print("lecture seule (pic, Ko):",
+          "ancienne %.1f" % measure(lambda t: np.flipud(np.frombuffer(t.getRamImageAs('RGB'), np.uint8)))[1],
+          "/ préallouée %.1f" % measure(lambda t: grabber.grab())[1])
+    print("détection cohérente:", classifier.detect(grabber.grab()))
@@ -0,0 +1,313 @@
+import numpy as np
+import cv2
+
+# Plages HSV (convention OpenCV, H dans [0, 180]) des balises,
+# identiques à celles de detect_multicolor_beacon / detect_blue_beacon
+HSV_RANGES = {
+    "blue":   [((100, 150, 50), (140, 255, 255))],
+    "green":  [((40, 100, 50),  (80, 255, 255))],
+    "yellow": [((20, 100, 100), (35, 255, 255))],
+    "red":    [((0, 150, 50),   (10, 255, 255)),    # bas du rouge
+               ((170, 150, 50), (180, 255, 255))],  # haut du rouge
+}
+
+
+def build_tables(ranges=HSV_RANGES):
+    """
+    Tables de classification par canal HSV. Chaque plage HSV est une boîte,
+    donc séparable : le bit k de channel_tables[c][v] dit si la valeur v du
+    canal c est dans la plage k ; un pixel est dans la plage k si le bit k est
+    présent dans ses trois canaux (ET des trois lectures).
+
+    :return: (channel_tables (3 x 256, uint8), class_table (256, uint8), labels)
+             où class_table[bits] vaut 0 (fond) ou 1 + indice de la couleur dans labels
+    """
+    labels = list(ranges.keys())
+    boxes = [(k, lower, upper) for k, color in enumerate(labels) for lower, upper in ranges[color]]
+    if len(boxes) > 8:
+        raise ValueError("Au plus 8 plages HSV (une table d'octets par canal)")
+    values = np.arange(256)
+    channel_tables = np.zeros((3, 256), np.uint8)
+    for bit, (_, lower, upper) in enumerate(boxes):
+        for channel in range(3):
+            inside = (values >= lower[channel]) & (values <= upper[channel])
+            channel_tables[channel] |= (inside << bit).astype(np.uint8)
+    # Un pixel dans plusieurs plages prend la première couleur (ordre de ranges)
+    class_table = np.zeros(256, np.uint8)
+    for bits in range(1, 256):
+        matched = [k for bit, (k, _, _) in enumerate(boxes) if bits >> bit & 1]
+        if matched:
+            class_table[bits] = min(matched) + 1
+    return channel_tables, class_table, labels
+
+
+class ColorClassifier:
+    """
+    Détecteur multi-balises en une passe.
+
+    Une seule conversion HSV, puis chaque pixel est classé par trois lectures
+    de table (une par canal, cv2.LUT) et un ET (au lieu d'un inRange et d'un
+    masque par couleur) ; l'image des classes est nettoyée par une seule
+    ouverture / fermeture (au lieu d'une par couleur), puis un
+    seul traçage de contours donne les blobs de toutes les couleurs. Une seule
+    couleur cherchée (balise bleue) : un simple inRange, moins coûteux.
+
+    Les coordonnées renvoyées sont celles de l'image retournée verticalement,
+    comme dans detect_blue_beacon (les images Panda3D sont stockées de bas en haut).
+    """
+
+    def __init__(self, channel_order="RGB", ranges=HSV_RANGES,
+                 min_radius=5.0, kernel_size=5, flip=True, pyramid_levels=0,
+                 pyramid_min_pixels=200000):
+        """
+        :param pyramid_levels: recherche grossière préalable, désactivée par défaut :
+                               en 640x480 elle gagne ~8 % quand toutes les balises
+                               sont visibles mais coûte ~50 % de plus quand une
+                               couleur manque (repli pleine résolution)
+        :param pyramid_min_pixels: recherche grossière seulement à partir de cette
+                                   taille d'image (plus lente en 400x300)
+        """
+        self.channel_order = channel_order
+        self.ranges = ranges
+        self.conversion = cv2.COLOR_RGB2HSV if channel_order == "RGB" else cv2.COLOR_BGR2HSV
+        self.channel_tables, self.class_table, self.labels = build_tables(ranges)
+        self.min_radius = min_radius
+        self.kernel_size = kernel_size
+        self.flip = flip
+        # Recherche des candidats sur l'image sous-échantillonnée 2**pyramid_levels fois
+        self.pyramid_levels = pyramid_levels
+        self.pyramid_min_pixels = pyramid_min_pixels
+        self._buffers = ()
+
+    def _work_buffers(self, shape):
+        """
+        Tampons réutilisés d'une image à l'autre : alloués à la plus grande taille
+        vue, puis découpés en vues contiguës pour les images ou ROI plus petites.
+        """
+        size = shape[0] * shape[1]
+        if not self._buffers or self._buffers[0].size < 3 * size:
+            self._buffers = (np.empty(3 * size, np.uint8),     # image HSV
+                             np.empty(size, np.uint8),         # canal H, puis bits des plages
+                             np.empty(size, np.uint8),         # canal S
+                             np.empty(size, np.uint8),         # canal V
+                             np.empty(size, np.uint8))         # classes filtrées
+        hsv = self._buffers[0][:3 * size].reshape(shape + (3,))
+        return (hsv,) + tuple(buffer[:size].reshape(shape) for buffer in self._buffers[1:])
+
+    def classify(self, frame, kernel_size=None, colors=None):
+        """
+        Image des classes (uint8, 0 = fond) d'une image H x W x 3.
+
+        :param colors: couleurs cherchées ; une seule (à une plage) : inRange seul,
+                       les autres couleurs restent fond
+        """
+        kernel_size = self.kernel_size if kernel_size is None else kernel_size
+        shape = frame.shape[:2]
+        hsv, h, s, v, cleaned = self._work_buffers(shape)
+        cv2.cvtColor(frame, self.conversion, dst=hsv)
+        single = colors is not None and len(colors) == 1 and len(self.ranges[colors[0]]) == 1
+        if single:
+            # Une seule boîte HSV : inRange direct, puis 255 -> numéro de classe
+            lower, upper = self.ranges[colors[0]][0]
+            cv2.inRange(hsv, np.array(lower), np.array(upper), dst=h)
+            cv2.bitwise_and(h, self.labels.index(colors[0]) + 1, dst=h)
+            labels = h
+        else:
+            cv2.split(hsv, [h, s, v])
+            cv2.LUT(h, self.channel_tables[0], dst=h)
+            cv2.LUT(s, self.channel_tables[1], dst=s)
+            cv2.LUT(v, self.channel_tables[2], dst=v)
+            cv2.bitwise_and(h, s, dst=h)
+            cv2.bitwise_and(h, v, dst=h)
+            cv2.LUT(h, self.class_table, dst=s)
+            labels = s
+        if kernel_size > 1:
+            # Ouverture puis fermeture en niveaux de gris sur l'image des classes :
+            # pour des blobs qui ne se touchent pas, c'est le nettoyage binaire
+            # précédent appliqué à chaque couleur
+            kernel = np.ones((kernel_size, kernel_size), np.uint8)
+            cv2.morphologyEx(labels, cv2.MORPH_OPEN, kernel, dst=cleaned)
+            cv2.morphologyEx(cleaned, cv2.MORPH_CLOSE, kernel, dst=cleaned)
+            return cleaned
+        return labels
+
+    def detect(self, frame, colors=None, roi=None):
+        """
+        Renvoie {couleur: (radius, cx, cy)} pour la plus grande balise de chaque couleur.
+
+        :param colors: couleurs recherchées (toutes par défaut)
+        :param roi: fenêtre de recherche (x0, y0, x1, y1) dans les coordonnées
+                    renvoyées ; None pour l'image entière
+        """
+        if frame is None:
+            return {}
+        height, width = frame.shape[:2]
+        if roi is None:
+            if self.pyramid_levels > 0 and height * width >= self.pyramid_min_pixels:
+                return self._detect_coarse_to_fine(frame, colors)
+            return self._blobs(self.classify(frame, colors=colors), height, colors)
+        x0, y0, x1, y1 = roi
+        if self.flip:
+            # Lignes de l'image stockée correspondant à [y0, y1) dans l'image retournée
+            y0, y1 = height - y1, height - y0
+        return self._detect_region(frame, colors, x0, y0, x1, y1)
+
+    def _detect_region(self, frame, colors, x0, y0, x1, y1):
+        """Détection pleine résolution dans une région exprimée en lignes de l'image stockée."""
+        height, width = frame.shape[:2]
+        x0, x1 = max(0, int(x0)), min(width, int(x1))
+        y0, y1 = max(0, int(y0)), min(height, int(y1))
+        if x1 - x0 < self.kernel_size or y1 - y0 < self.kernel_size:
+            return {}
+        labels = self.classify(frame[y0:y1, x0:x1], colors=colors)
+        return self._blobs(labels, height, colors, offset=(x0, y0))
+
+    def _detect_coarse_to_fine(self, frame, colors):
+        """
+        Cherche les candidats sur une image sous-échantillonnée (simple vue à pas
+        2**levels, sans mélange de couleurs), puis affine chaque candidat en
+        pleine résolution dans sa boîte englobante agrandie : le rayon renvoyé
+        est celui mesuré en pleine résolution. Les couleurs que l'affinage ne
+        confirme pas sont recherchées sur l'image entière, en pleine résolution :
+        une petite balise (rayon proche de min_radius) peut disparaître au niveau
+        grossier, et elle est alors trouvée comme avec pyramid_levels=0.
+        """
+        step = 1 << self.pyramid_levels
+        coarse = frame[::step, ::step]
+        # Seuil grossier volontairement bas (l'aire du contour sous-estime celle du
+        # disque de quelques pixels à cette échelle) : l'affinage filtre ensuite
+        min_area = np.pi * self.min_radius ** 2 / 4 / (step * step)
+        candidates = self._candidates(self.classify(coarse, kernel_size=3, colors=colors), colors, min_area)
+        # Boîtes relevées avant d'affiner : les tampons de classes vont être réutilisés
+        margin = 2 * step + self.kernel_size
+        regions = []
+        for label, (_, contour, x, y) in candidates.items():
+            bx, by, bw, bh = cv2.boundingRect(contour)
+            bx, by = bx + x, by + y
+            regions.append((self.labels[label - 1],
+                            bx * step - margin, by * step - margin,
+                            (bx + bw) * step + margin, (by + bh) * step + margin))
+        detected = {}
+        for color, x0, y0, x1, y1 in regions:
+            detected.update(self._detect_region(frame, (color,), x0, y0, x1, y1))
+        missing = [color for color in (self.labels if colors is None else colors)
+                   if color not in detected]
+        if missing:
+            detected.update(self._blobs(self.classify(frame, colors=missing),
+                                        frame.shape[0], missing))
+        return detected
+
+    def _blobs(self, labels, frame_height, colors, offset=(0, 0)):
+        # Un contour ne peut contenir un cercle de rayon min_radius sous cette aire
+        min_area = np.pi * self.min_radius ** 2 / 2
+        best = self._candidates(labels, colors, min_area)
+        return self._circles(best, frame_height, offset)
+
+    def _candidates(self, labels, colors, min_area):
+        """Plus grand blob de chaque couleur : {classe: (aire, contour, dx, dy)}."""
+        # Un seul traçage de contours pour toutes les couleurs (tout pixel classé)
+        contours, _ = cv2.findContours(labels, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+        wanted = None if colors is None else {self.labels.index(c) + 1 for c in colors}
+        n_classes = len(self.labels) + 1
+
+        best = {}   # {classe: (aire, contour, x, y)}
+        for contour in contours:
+            area = cv2.contourArea(contour)
+            if area < min_area:
+                continue
+            x, y, w, h = cv2.boundingRect(contour)
+            classes = labels[y:y + h, x:x + w]
+            votes = np.bincount(classes.ravel(), minlength=n_classes)
+            present = np.nonzero(votes[1:] >= min_area)[0] + 1
+            if len(present) == 1:
+                label = int(present[0])
+                if (wanted is None or label in wanted) and (label not in best or best[label][0] < area):
+                    best[label] = (area, contour, 0, 0)
+                continue
+            # Balises de couleurs différentes qui se touchent : séparation par classe,
+            # dans la boîte englobante seulement
+            for label in present:
+                label = int(label)
+                if wanted is not None and label not in wanted:
+                    continue
+                sub_contours, _ = cv2.findContours((classes == label).astype(np.uint8),
+                                                   cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+                sub = max(sub_contours, key=cv2.contourArea)
+                sub_area = cv2.contourArea(sub)
+                if label not in best or best[label][0] < sub_area:
+                    best[label] = (sub_area, sub, x, y)
+        return best
+
+    def _circles(self, best, frame_height, offset):
+        detected = {}
+        for label, (_, contour, x, y) in best.items():
+            (cx, cy), radius = cv2.minEnclosingCircle(contour)
+            if radius < self.min_radius:
+                continue
+            cx += x + offset[0]
+            cy += y + offset[1]
+            if self.flip:
+                cy = frame_height - 1 - cy
+            detected[self.labels[label - 1]] = (radius, int(cx), int(cy))
+        return detected
+
+
+if __name__ == "__main__":
+    # Coût par image : pipeline précédent (HSV + inRange + ouverture/fermeture
+    # par couleur) contre ColorClassifier, toutes couleurs puis bleu seul
+    import time
+
+    KERNEL = np.ones((5, 5), np.uint8)
+
+    def per_color(img, colors):
+        hsv = cv2.cvtColor(np.flipud(img), cv2.COLOR_RGB2HSV)
+        detected = {}
+        for color in colors:
+            mask = None
+            for lower, upper in HSV_RANGES[color]:
+                part = cv2.inRange(hsv, np.array(lower), np.array(upper))
+                mask = part if mask is None else cv2.bitwise_or(mask, part)
+            mask = cv2.morphologyEx(mask, cv2.MORPH_OPEN, KERNEL)
+            mask = cv2.morphologyEx(mask, cv2.MORPH_CLOSE, KERNEL)
+            contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+            if contours:
+                (cx, cy), radius = cv2.minEnclosingCircle(max(contours, key=cv2.contourArea))
+                if radius > 5:
+                    detected[color] = (radius, int(cx), int(cy))
+        return detected
+
+    def synthetic(height, width, seed=0):
+        rng = np.random.default_rng(seed)
+        img = (rng.integers(0, 30, (height, width, 3)) + (90, 110, 95)).astype(np.uint8)
+        for color in ((0, 0, 255), (0, 255, 0), (255, 255, 0), (255, 0, 0)):
+            center = (int(rng.integers(40, width - 40)), int(rng.integers(40, height - 40)))
+            cv2.circle(img, center, int(rng.integers(8, 30)), color, -1)
+        return img
+
+    def cost(function, n=300):
+        function()
+        t0 = time.perf_counter()
+        for _ in range(n):
+            function()
+        return (time.perf_counter() - t0) / n * 1000
+
+    for height, width in ((300, 400), (480, 640)):
+        frames = [synthetic(height, width, seed) for seed in range(8)]
+        img = frames[0]
+        classifier = ColorClassifier(pyramid_levels=1)
+        flat = ColorClassifier()
+        agree = sum(set(per_color(f, HSV_RANGES)) == set(classifier._detect_coarse_to_fine(f, None)) for f in frames)
+        print(f"{width}x{height} : mêmes couleurs trouvées sur {agree}/{len(frames)} images")
+        print(f"  toutes couleurs : {cost(lambda: per_color(img, HSV_RANGES)):.2f} ms -> "
+              f"{cost(lambda: flat.detect(img)):.2f} ms "
+              f"(recherche grossière : {cost(lambda: classifier._detect_coarse_to_fine(img, None)):.2f} ms)")
+        # Aucune balise : la recherche grossière retombe sur une passe pleine résolution
+        empty = np.empty_like(img)
+        empty[:] = img.min(axis=(0, 1))
+        print(f"  aucune balise   : {cost(lambda: flat.detect(empty)):.2f} ms -> "
+              f"{cost(lambda: classifier._detect_coarse_to_fine(empty, None)):.2f} ms "
+              f"(recherche grossière)")
+        print(f"  bleu seul       : {cost(lambda: per_color(img, ('blue',))):.2f} ms -> "
+              f"{cost(lambda: flat.detect(img, colors=('blue',))):.2f} ms")
+        print(f"  classify        : {cost(lambda: flat.classify(img, kernel_size=1)):.2f} ms "
+              f"(cvtColor + inRange : {cost(lambda: cv2.inRange(cv2.cvtColor(img, cv2.COLOR_RGB2HSV), np.array((100, 150, 50)), np.array((140, 255, 255)))):.2f} ms)")
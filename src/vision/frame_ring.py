@@ -0,0 +1,67 @@
+import time
+import threading
+import numpy as np
+
+
+class FrameRing:
+    """
+    Anneau d'images préallouées de taille fixe.
+
+    L'écrivain remplit directement l'emplacement suivant (acquire), puis le
+    publie (commit) : aucune allocation ni décalage de liste par image. Les
+    lecteurs reçoivent des vues sur les emplacements ; une vue reste valide
+    tant que `capacity - 1` images plus récentes n'ont pas été publiées
+    (à vérifier avec is_current si besoin).
+
+    :param buffer: mémoire existante (ex. SharedMemory.buf) où placer les images
+    """
+
+    def __init__(self, capacity, shape, dtype=np.uint8, buffer=None):
+        self.capacity = capacity
+        self.shape = tuple(shape)
+        if buffer is None:
+            self.frames = np.zeros((capacity,) + self.shape, dtype=dtype)
+        else:
+            self.frames = np.ndarray((capacity,) + self.shape, dtype=dtype, buffer=buffer)
+        self.timestamps = np.zeros(capacity, dtype=np.float64)
+        self.sequence = 0           # Nombre d'images publiées depuis la création
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Emplacement où écrire la prochaine image (non visible avant commit)."""
+        return self.frames[self.sequence % self.capacity]
+
+    def commit(self, timestamp=None) -> int:
+        """Publie l'image écrite dans acquire() et renvoie son numéro de séquence."""
+        with self._lock:
+            self.timestamps[self.sequence % self.capacity] = (
+                time.monotonic() if timestamp is None else timestamp)
+            self.sequence += 1
+            return self.sequence
+
+    def write(self, frame, timestamp=None) -> int:
+        """Copie une image déjà allouée dans l'anneau."""
+        np.copyto(self.acquire(), frame)
+        return self.commit(timestamp)
+
+    def latest(self):
+        """(séquence, horodatage, image) de la dernière image publiée, ou None."""
+        with self._lock:
+            if self.sequence == 0:
+                return None
+            slot = (self.sequence - 1) % self.capacity
+            return self.sequence, self.timestamps[slot], self.frames[slot]
+
+    def recent(self, n=None):
+        """Jusqu'à n dernières images, de la plus ancienne à la plus récente."""
+        with self._lock:
+            count = min(self.sequence, self.capacity - 1, n or self.capacity)
+            first = self.sequence - count
+            return [self.frames[k % self.capacity] for k in range(first, self.sequence)]
+
+    def is_current(self, sequence) -> bool:
+        """L'image de ce numéro n'a pas encore été écrasée."""
+        return self.sequence - sequence < self.capacity - 1
+
+    def __len__(self):
+        return min(self.sequence, self.capacity - 1)
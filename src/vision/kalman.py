@@ -0,0 +1,165 @@
+import math
+
+
+class BeaconKalman:
+    """
+    Filtre de Kalman sur le relèvement et le rayon apparent de la balise.
+
+    Deux filtres indépendants :
+      - relèvement b (rad, positif à gauche de l'image), un état ; la rotation
+        commandée du robot sert d'entrée (b -= turn_rate * dt) ;
+      - rayon r (px) et sa dérivée, modèle à vitesse constante.
+
+    Entre deux détections, ou quand une détection manque, l'estimation est
+    prédite ; au-delà de max_misses détections manquées (ou d'une incertitude
+    trop grande) la balise est déclarée perdue. Quand l'estimation est sûre,
+    l'intervalle entre deux détections double jusqu'à max_interval ; pendant
+    une recherche en pivot, il suit la vitesse de rotation.
+    """
+
+    def __init__(self, width=400, fov_deg=50.0, bearing_noise_px=1.5, radius_noise_px=1.5,
+                 bearing_process=0.02, radius_process=20.0, max_misses=8, lost_px=40.0,
+                 confident_px=2.0, max_interval=0.2):
+        """
+        :param bearing_process: bruit de processus du relèvement (rad/√s)
+        :param radius_process: bruit de processus de la dérivée du rayon (px/s/√s)
+        :param max_interval: intervalle maximal entre deux détections (s), 0 pour toujours détecter
+        """
+        self.fov = math.radians(fov_deg)
+        self.bearing_noise_px = bearing_noise_px
+        self.set_width(width)
+        self.radius_r = radius_noise_px ** 2
+        self.bearing_q = bearing_process ** 2
+        self.radius_q = radius_process ** 2
+        self.max_misses = max_misses
+        self.lost_px = lost_px
+        self.confident_px = confident_px
+        self.max_interval = max_interval
+        self.detections = 0
+        self.skipped = 0            # Pas sans détection demandée
+        self.bridged = 0            # Détections manquées compensées par la prédiction
+        self.reset()
+
+    def set_width(self, width):
+        """Largeur réelle de l'image (px) : recalcule la focale et le bruit de relèvement."""
+        self.width = width
+        self.focal = (width / 2) / math.tan(self.fov / 2)
+        self.bearing_r = (self.bearing_noise_px / self.focal) ** 2
+
+    def reset(self, keep_timer=False):
+        """Oublie la balise ; keep_timer garde le temps écoulé depuis la dernière détection."""
+        self.initialized = False
+        self.bearing = 0.0
+        self.bearing_p = 0.0
+        self.radius = [0.0, 0.0]                    # r, dr/dt
+        self.radius_p = [[0.0, 0.0], [0.0, 0.0]]
+        self.cy = 0
+        self.misses = 0
+        self.interval = 0.0
+        if not keep_timer:
+            self.since_detection = math.inf
+
+    # --- Prédiction ----------------------------------------------------------
+    def predict(self, delta_time, turn_rate=0.0):
+        """Avance l'estimation de delta_time avec la rotation du robot (rad/s)."""
+        self.since_detection += delta_time
+        if not self.initialized or delta_time <= 0:
+            return
+        self.bearing -= turn_rate * delta_time
+        self.bearing_p += self.bearing_q * delta_time
+
+        r, v = self.radius
+        (p00, p01), (p10, p11) = self.radius_p
+        dt = delta_time
+        self.radius = [r + v * dt, v]
+        p00, p01, p10, p11 = (p00 + dt * (p10 + p01) + dt * dt * p11, p01 + dt * p11,
+                              p10 + dt * p11, p11)
+        p11 += self.radius_q * dt
+        self.radius_p = [[p00, p01], [p10, p11]]
+
+    # --- Correction ------------------------------------------------------------
+    def update(self, beacon):
+        """Intègre une détection (radius, cx, cy), ou None pour une détection manquée."""
+        self.detections += 1
+        self.since_detection = 0.0
+        if beacon is None:
+            self.miss()
+            return
+        radius, cx, cy = beacon
+        bearing = math.atan((self.width / 2 - (cx + 0.5)) / self.focal)
+        self.cy = cy
+        self.misses = 0
+        if not self.initialized:
+            self.bearing, self.bearing_p = bearing, self.bearing_r
+            self.radius = [radius, 0.0]
+            self.radius_p = [[self.radius_r, 0.0], [0.0, self.radius_q]]
+            self.initialized = True
+            self.interval = 0.0
+            return
+
+        gain = self.bearing_p / (self.bearing_p + self.bearing_r)
+        self.bearing += gain * (bearing - self.bearing)
+        self.bearing_p *= 1 - gain
+
+        (p00, p01), (p10, p11) = self.radius_p
+        s = p00 + self.radius_r
+        k0, k1 = p00 / s, p10 / s
+        innovation = radius - self.radius[0]
+        self.radius = [self.radius[0] + k0 * innovation, self.radius[1] + k1 * innovation]
+        self.radius_p = [[(1 - k0) * p00, (1 - k0) * p01],
+                         [p10 - k1 * p00, p11 - k1 * p01]]
+
+        # Confiance : on espace les détections, sinon on revient à chaque pas
+        if self.confident():
+            self.interval = min(max(self.interval * 2, 0.02), self.max_interval)
+        else:
+            self.interval = 0.0
+
+    def miss(self):
+        self.misses += 1
+        self.interval = 0.0
+        if self.lost():
+            self.reset(keep_timer=True)
+        elif self.initialized:
+            self.bridged += 1
+
+    # --- Lecture -----------------------------------------------------------
+    def bearing_std_px(self):
+        return self.focal * math.sqrt(self.bearing_p)
+
+    def radius_std_px(self):
+        return math.sqrt(self.radius_p[0][0])
+
+    def confident(self) -> bool:
+        return (self.initialized and self.bearing_std_px() <= self.confident_px
+                and self.radius_std_px() <= self.confident_px)
+
+    def lost(self) -> bool:
+        return (not self.initialized or self.misses > self.max_misses
+                or self.bearing_std_px() > self.lost_px)
+
+    def wants_detection(self, turn_rate=0.0) -> bool:
+        """
+        Une détection est utile à ce pas (sinon on se contente de la prédiction).
+        Balise perdue et robot en rotation : une détection par quart de champ balayé.
+        """
+        if self.initialized:
+            interval = self.interval
+        elif turn_rate:
+            interval = min(self.max_interval, self.fov / 4 / abs(turn_rate))
+        else:
+            interval = 0.0
+        if self.since_detection >= interval:
+            return True
+        self.skipped += 1
+        return False
+
+    def estimate(self):
+        """(radius, cx, cy) estimés comme detect_blue_beacon, ou None si la balise est perdue."""
+        if self.lost():
+            return None
+        cx = self.width / 2 - self.focal * math.tan(self.bearing) - 0.5
+        return self.radius[0], int(round(cx)), self.cy
+
+    def stats(self) -> dict:
+        return {"detections": self.detections, "skipped": self.skipped, "bridged": self.bridged}
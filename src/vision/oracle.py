@@ -0,0 +1,82 @@
+import math
+import numpy as np
+import cv2
+from utils.geometry import segment_intersects_polygon
+
+
+class BeaconOracle:
+    """
+    Capteur « oracle » : projette la balise connue (MapModel.end_position) à
+    travers le modèle de caméra au lieu de rendre et segmenter une image.
+
+    Renvoie le même (radius_px, cx, cy) que detect_blue_beacon : cercle
+    minimal englobant la silhouette du cube de la balise (8 sommets projetés,
+    coupés au cadre de l'image), cy compté depuis le haut de l'image. Le modèle
+    de caméra est celui de RaycastCamera (Ursina : FOV 50, 400 x 300).
+
+    :param noise_px: écart type du bruit gaussien ajouté au rayon et au centre
+    :param dropout: probabilité de ne rien détecter
+    :param occlusion: None si un obstacle coupe la ligne de visée
+    """
+
+    def __init__(self, map_model, width=400, height=300, fov_deg=50.0,
+                 camera_height=80.0, beacon_size=50.0, beacon_height=100.0,
+                 min_radius=5.0, noise_px=0.0, dropout=0.0, occlusion=True, seed=None):
+        self.map_model = map_model
+        self.width = width
+        self.height = height
+        self.focal = (width / 2) / math.tan(math.radians(fov_deg) / 2)
+        self.camera_height = camera_height
+        self.min_radius = min_radius
+        self.noise_px = noise_px
+        self.dropout = dropout
+        self.occlusion = occlusion
+        self.rng = np.random.default_rng(seed)
+        half = beacon_size / 2
+        # Sommets du cube relatifs à son centre au sol : (dx, dy, hauteur)
+        self._corners = np.array([(sx * half, sy * half, beacon_height + sz * half)
+                                  for sx in (-1, 1) for sy in (-1, 1) for sz in (-1, 1)])
+        self._frame = np.array([(0, 0), (width, 0), (width, height), (0, height)], np.float32)
+
+    def _occluded(self, x, y, target):
+        for value in list(self.map_model.obstacles.values()):
+            points = value[0] if isinstance(value, tuple) else value
+            if segment_intersects_polygon((x, y), target, points):
+                return True
+        return False
+
+    def locate(self, x, y, angle, target=None):
+        """(radius_px, cx, cy) de la balise vue depuis la pose (x, y, angle), ou None."""
+        target = target if target is not None else self.map_model.end_position
+        if target is None:
+            return None
+        if self.dropout and self.rng.random() < self.dropout:
+            return None
+        if self.occlusion and self._occluded(x, y, target):
+            return None
+
+        cos_a, sin_a = math.cos(angle), math.sin(angle)
+        dx = self._corners[:, 0] + (target[0] - x)
+        dy = self._corners[:, 1] + (target[1] - y)
+        depth = dx * cos_a + dy * sin_a          # Axe optique
+        lateral = -dx * sin_a + dy * cos_a       # Positif à gauche de l'image
+        in_front = depth > 1.0
+        if not in_front.any():
+            return None
+        depth, lateral = depth[in_front], lateral[in_front]
+        heights = self._corners[in_front, 2] - self.camera_height
+        u = self.width / 2 - self.focal * lateral / depth
+        v = self.height / 2 - self.focal * heights / depth
+        hull = cv2.convexHull(np.stack([u, v], axis=1).astype(np.float32))
+        area, visible = cv2.intersectConvexConvex(hull, self._frame)
+        if area <= 0 or visible is None:
+            return None
+        (cx, cy), radius = cv2.minEnclosingCircle(visible)
+        if self.noise_px:
+            radius += self.rng.normal(0.0, self.noise_px)
+            cx += self.rng.normal(0.0, self.noise_px)
+            cy += self.rng.normal(0.0, self.noise_px)
+        if radius < self.min_radius:
+            return None
+        # Centres de pixels : indice = coordonnée continue - 0.5
+        return radius, int(cx - 0.5), int(cy - 0.5)
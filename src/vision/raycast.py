@@ -0,0 +1,191 @@
+import math
+import numpy as np
+
+# Couleurs (RGB) des balises, classées comme les couleurs de HSV_RANGES
+BEACON_COLORS = {
+    "blue":   (0, 0, 255),
+    "green":  (0, 200, 0),
+    "yellow": (230, 220, 0),
+    "red":    (220, 0, 0),
+}
+SKY_COLOR = (200, 200, 200)
+FLOOR_COLOR = (110, 110, 110)
+WALL_COLOR = (30, 30, 30)
+
+
+class RaycastCamera:
+    """
+    Caméra embarquée rendue en NumPy par lancer de rayons en colonnes, sans GPU
+    ni fenêtre.
+
+    Reproduit la scène Ursina dans les unités de la simulation (1 unité Ursina
+    = 100) : caméra à 80 au-dessus du sol, champ horizontal de 50°, obstacles
+    du MapModel extrudés jusqu'à 125, balises cubiques de 50 centrées à 100
+    (end_box de UrsinaControlPanel). Un rayon par colonne : le mur le plus
+    proche masque tout ce qui est derrière lui (il dépasse la caméra), les
+    balises plus proches que ce mur sont peintes par-dessus, de la plus
+    lointaine à la plus proche.
+
+    Par défaut l'image a le format de UrsinaView.get_robot_camera_image :
+    400 x 300, BGR, lignes de bas en haut.
+    """
+
+    def __init__(self, map_model, width=400, height=300, fov_deg=50.0, beacons=None,
+                 camera_height=80.0, wall_height=125.0, beacon_size=50.0,
+                 beacon_height=100.0, channel_order="BGR", bottom_up=True):
+        """
+        :param beacons: {couleur: (x, y)} en plus de la balise bleue placée
+                        en map_model.end_position
+        """
+        self.map_model = map_model
+        self.width = width
+        self.height = height
+        self.beacons = dict(beacons or {})
+        self.camera_height = camera_height
+        self.wall_height = wall_height
+        self.beacon_size = beacon_size
+        self.beacon_height = beacon_height
+        self.channel_order = channel_order
+        self.bottom_up = bottom_up
+
+        # Focale en pixels (pixels carrés : le champ vertical découle du format)
+        self.focal = (width / 2) / math.tan(math.radians(fov_deg) / 2)
+        self.horizon = height / 2
+        # Décalage angulaire de chaque colonne : positif à gauche de l'image
+        columns = np.arange(width) + 0.5
+        self._offsets = np.arctan((width / 2 - columns) / self.focal)
+        self._cos_offsets = np.cos(self._offsets)
+        self._rows = (np.arange(height) + 0.5)[:, None]
+
+        self._background = np.empty((height, width, 3), np.uint8)
+        self._background[:int(self.horizon)] = self._pixel(SKY_COLOR)
+        self._background[int(self.horizon):] = self._pixel(FLOOR_COLOR)
+        self._walls = None
+        map_model.add_event_listener(self.handle_map_event)
+
+    def _pixel(self, rgb):
+        return rgb[::-1] if self.channel_order == "BGR" else rgb
+
+    def handle_map_event(self, event_type, **kwargs):
+        if event_type in ("obstacle_added", "obstacle_removed", "obstacle_moved", "map_reset"):
+            self._walls = None
+
+    def _wall_segments(self):
+        """Arêtes des obstacles (A, B - A), recalculées quand la carte change."""
+        if self._walls is None:
+            starts, ends = [], []
+            for value in list(self.map_model.obstacles.values()):
+                points = value[0] if isinstance(value, tuple) else value
+                for k in range(len(points)):
+                    starts.append(points[k])
+                    ends.append(points[(k + 1) % len(points)])
+            starts = np.array(starts, dtype=float).reshape(-1, 2)
+            ends = np.array(ends, dtype=float).reshape(-1, 2)
+            self._walls = (starts, ends - starts)
+        return self._walls
+
+    def _all_beacons(self):
+        beacons = []
+        if self.map_model.end_position is not None:
+            beacons.append(("blue", self.map_model.end_position))
+        beacons.extend(self.beacons.items())
+        return beacons
+
+    def render(self, x, y, angle, out=None):
+        """Image vue depuis la pose (x, y, angle) ; écrite dans `out` si fourni."""
+        if out is None:
+            out = np.empty((self.height, self.width, 3), np.uint8)
+        # On dessine à l'endroit dans une vue retournée de `out`
+        image = out[::-1] if self.bottom_up else out
+        np.copyto(image, self._background)
+
+        wall_starts, wall_edges = self._wall_segments()
+        beacons = self._all_beacons()
+        half = self.beacon_size / 2
+        square = np.array([(-half, -half), (half, -half), (half, half), (-half, half)])
+        square_edges = np.roll(square, -1, axis=0) - square
+        starts = [wall_starts] + [np.asarray(position, dtype=float) + square for _, position in beacons]
+        edges = [wall_edges] + [square_edges] * len(beacons)
+        starts = np.concatenate(starts)
+        edges = np.concatenate(edges)
+        if not len(starts):
+            return out
+
+        # Intersection rayon / segment pour toutes les colonnes : p + t.r = a + s.e
+        directions = angle + self._offsets
+        dx = np.cos(directions)[:, None]
+        dy = np.sin(directions)[:, None]
+        ax = starts[:, 0] - x
+        ay = starts[:, 1] - y
+        ex, ey = edges[:, 0], edges[:, 1]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            denominator = dx * ey - dy * ex
+            t = (ax * ey - ay * ex) / denominator
+            s = (ax * dy - ay * dx) / denominator
+        t[~((t > 1e-6) & (s >= 0) & (s <= 1))] = np.inf
+
+        n_walls = len(wall_starts)
+        if n_walls:
+            wall_distance = t[:, :n_walls].min(axis=1)
+            self._paint(image, wall_distance, 0.0, self.wall_height, WALL_COLOR)
+        else:
+            wall_distance = np.full(self.width, np.inf)
+
+        # Balises devant le mur de la colonne, de la plus lointaine à la plus proche
+        distances = t[:, n_walls:].reshape(self.width, len(beacons), 4).min(axis=2)
+        order = sorted(range(len(beacons)),
+                       key=lambda k: -math.dist((x, y), beacons[k][1]))
+        for k in order:
+            distance = np.where(distances[:, k] < wall_distance, distances[:, k], np.inf)
+            self._paint(image, distance, self.beacon_height - half, self.beacon_height + half,
+                        BEACON_COLORS.get(beacons[k][0], BEACON_COLORS["blue"]))
+        return out
+
+    def _paint(self, image, distance, bottom, top, color):
+        """Peint, par colonne, la bande verticale [bottom, top] vue à `distance`."""
+        visible = np.isfinite(distance)
+        if not visible.any():
+            return
+        depth = np.where(visible, distance * self._cos_offsets, np.inf)
+        row_top = self.horizon - self.focal * (top - self.camera_height) / depth
+        row_bottom = self.horizon - self.focal * (bottom - self.camera_height) / depth
+        # Seules les lignes couvertes par au moins une colonne sont parcourues
+        first = max(int(row_top[visible].min()), 0)
+        last = min(int(np.ceil(row_bottom[visible].max())), self.height)
+        if first >= last:
+            return
+        rows = self._rows[first:last]
+        mask = (rows >= row_top) & (rows < row_bottom)
+        np.copyto(image[first:last], np.array(self._pixel(color), np.uint8), where=mask[..., None])
+
+    def frame_source(self, out, state) -> bool:
+        """Source d'images pour VpythonView (callable(out, state))."""
+        self.render(state['x'], state['y'], state['angle'], out)
+        return True
+
+
+if __name__ == "__main__":
+    # Débit du rendu et cohérence avec le détecteur
+    import time
+    from model.map_model import MapModel
+    from vision.color_lut import ColorClassifier
+
+    map_model = MapModel()
+    for k in range(10):
+        cx, cy = 300 + 150 * k, 900 + 200 * (k % 3)
+        map_model.add_obstacle(f"obstacle_{k}", [(cx - 25, cy - 100), (cx + 25, cy - 100),
+                                                 (cx + 25, cy + 100), (cx - 25, cy + 100)], None, [])
+    map_model.set_end_position((1000, 500))
+    camera = RaycastCamera(map_model, beacons={"red": (1000, 300)})
+    classifier = ColorClassifier(channel_order=camera.channel_order)
+    frame = np.empty((camera.height, camera.width, 3), np.uint8)
+
+    n = 500
+    t0 = time.perf_counter()
+    for k in range(n):
+        camera.render(500, 500 - k * 0.1, 0.0, out=frame)
+    elapsed = time.perf_counter() - t0
+    print(f"{n / elapsed:.0f} images/s ({elapsed / n * 1000:.2f} ms par image)")
+    for distance in (200, 400, 800):
+        camera.render(1000 - distance, 500, 0.0, out=frame)
+        print(f"balise à {distance}: {classifier.detect(frame)}")
@@ -0,0 +1,184 @@
+import os
+import json
+import time
+import queue
+import logging
+import threading
+import numpy as np
+
+# Pose et horodatage enregistrés avec chaque image
+POSE_DTYPE = np.dtype([("t", "f8"), ("x", "f8"), ("y", "f8"), ("angle", "f8")])
+
+
+class FrameRecorder:
+    """
+    Enregistre un flux d'images avec pose et horodatage, par blocs.
+
+    Les images sont copiées dans un bloc préalloué de chunk_size images ; un
+    bloc plein est confié à un thread d'écriture qui le sauve en .npy (brut,
+    relu par np.memmap) ou en .npz compressé (compress=True, relu bloc par
+    bloc). Si le disque ne suit pas et qu'aucun bloc libre n'est disponible,
+    l'image est ignorée et comptée plutôt que de bloquer le rendu.
+
+    Le dossier contient frames_XXXXX.npy|npz, poses_XXXXX.npy et index.json.
+    """
+
+    def __init__(self, directory, shape=(300, 400, 3), chunk_size=256, buffers=3,
+                 compress=False, channel_order="BGR", bottom_up=True):
+        self.directory = directory
+        self.shape = tuple(shape)
+        self.chunk_size = chunk_size
+        self.compress = compress
+        os.makedirs(directory, exist_ok=True)
+        self.index = {"shape": list(self.shape), "dtype": "uint8", "chunk_size": chunk_size,
+                      "compressed": compress, "channel_order": channel_order,
+                      "bottom_up": bottom_up, "chunks": []}
+        self._free = queue.Queue()
+        for _ in range(buffers):
+            self._free.put((np.empty((chunk_size,) + self.shape, np.uint8),
+                            np.empty(chunk_size, POSE_DTYPE)))
+        self._pending = queue.Queue()
+        self._frames, self._poses = self._free.get()
+        self._count = 0
+        self.recorded = 0
+        self.dropped = 0
+        self.logger = logging.getLogger("vision.FrameRecorder")
+        self._writer = threading.Thread(target=self._write_loop, name="frame-recorder", daemon=True)
+        self._writer.start()
+
+    def record(self, frame, x, y, angle, timestamp=None) -> bool:
+        """Ajoute une image et la pose du robot ; False si l'image a été ignorée."""
+        if self._frames is None:
+            try:
+                self._frames, self._poses = self._free.get_nowait()
+            except queue.Empty:
+                self.dropped += 1
+                return False
+        np.copyto(self._frames[self._count], frame)
+        self._poses[self._count] = (time.monotonic() if timestamp is None else timestamp, x, y, angle)
+        self._count += 1
+        self.recorded += 1
+        if self._count == self.chunk_size:
+            self._flush_chunk()
+        return True
+
+    def _flush_chunk(self):
+        self._pending.put((self._frames, self._poses, self._count))
+        self._frames = self._poses = None
+        self._count = 0
+
+    def _write_loop(self):
+        while True:
+            item = self._pending.get()
+            if item is None:
+                break
+            frames, poses, count = item
+            number = len(self.index["chunks"])
+            name = f"frames_{number:05d}.{'npz' if self.compress else 'npy'}"
+            path = os.path.join(self.directory, name)
+            try:
+                if self.compress:
+                    np.savez_compressed(path, frames=frames[:count])
+                else:
+                    np.save(path, frames[:count])
+                np.save(os.path.join(self.directory, f"poses_{number:05d}.npy"), poses[:count])
+                self.index["chunks"].append({"frames": name, "poses": f"poses_{number:05d}.npy",
+                                             "count": count})
+                self._write_index()
+            except OSError as e:
+                self.logger.error(f"Écriture du bloc {number} impossible: {e}")
+            self._free.put((frames, poses))
+
+    def _write_index(self):
+        path = os.path.join(self.directory, "index.json")
+        with open(path + ".tmp", "w") as f:
+            json.dump(self.index, f)
+        os.replace(path + ".tmp", path)
+
+    def close(self):
+        """Écrit le bloc en cours et attend la fin des écritures."""
+        if self._count:
+            self._flush_chunk()
+        self._pending.put(None)
+        self._writer.join()
+        self.logger.info(f"{self.recorded} image(s) enregistrée(s) dans {self.directory}, "
+                         f"{self.dropped} ignorée(s)")
+
+
+class FrameRecording:
+    """
+    Relecture d'un enregistrement de FrameRecorder sans simulateur.
+
+    Les blocs bruts sont ouverts en np.memmap (lecture à la vitesse du disque,
+    mémoire bornée par le cache du système) ; les blocs compressés sont
+    décompressés un par un.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        with open(os.path.join(directory, "index.json")) as f:
+            self.index = json.load(f)
+        self.shape = tuple(self.index["shape"])
+        self.channel_order = self.index["channel_order"]
+        self.bottom_up = self.index["bottom_up"]
+
+    def __len__(self):
+        return sum(chunk["count"] for chunk in self.index["chunks"])
+
+    def chunks(self):
+        """Itère sur (images, poses) bloc par bloc ; images est un memmap pour les blocs bruts."""
+        for chunk in self.index["chunks"]:
+            path = os.path.join(self.directory, chunk["frames"])
+            if self.index["compressed"]:
+                with np.load(path) as archive:
+                    frames = archive["frames"]
+            else:
+                frames = np.load(path, mmap_mode="r")
+            poses = np.load(os.path.join(self.directory, chunk["poses"]))
+            yield frames, poses
+
+    def __iter__(self):
+        """Itère sur (image, pose) ; pose a les champs t, x, y, angle."""
+        for frames, poses in self.chunks():
+            for k in range(len(poses)):
+                yield frames[k], poses[k]
+
+    def poses(self):
+        """Toutes les poses de l'enregistrement (sans lire les images)."""
+        parts = [np.load(os.path.join(self.directory, chunk["poses"]))
+                 for chunk in self.index["chunks"]]
+        return np.concatenate(parts) if parts else np.empty(0, POSE_DTYPE)
+
+
+if __name__ == "__main__":
+    # Enregistre un parcours rendu sans fenêtre, puis relit les images à la
+    # vitesse du disque à travers le détecteur
+    import sys
+    import math
+    import tempfile
+    from model.map_model import MapModel
+    from vision.raycast import RaycastCamera
+    from vision.color_lut import ColorClassifier
+
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    directory = sys.argv[2] if len(sys.argv) > 2 else tempfile.mkdtemp(prefix="recording_")
+    map_model = MapModel()
+    map_model.set_end_position((1500, 500))
+    camera = RaycastCamera(map_model)
+    recorder = FrameRecorder(directory)
+    frame = np.empty(recorder.shape, np.uint8)
+    t0 = time.perf_counter()
+    for k in range(n):
+        x, angle = 200 + k * 1000 / n, 0.4 * math.sin(k / 50)
+        recorder.record(camera.render(x, 500, angle, out=frame), x, 500, angle, timestamp=k * 0.02)
+    recorder.close()
+    print(f"enregistrement: {n} images en {time.perf_counter() - t0:.2f} s "
+          f"({recorder.dropped} ignorée(s)) dans {directory}")
+
+    recording = FrameRecording(directory)
+    classifier = ColorClassifier(channel_order=recording.channel_order, flip=recording.bottom_up)
+    t0 = time.perf_counter()
+    found = sum(1 for image, pose in recording if classifier.detect(image, colors=("blue",)))
+    elapsed = time.perf_counter() - t0
+    print(f"relecture + détection: {len(recording)} images en {elapsed:.2f} s "
+          f"({len(recording) / elapsed:.0f} images/s), balise vue dans {found}")
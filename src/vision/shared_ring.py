@@ -0,0 +1,235 @@
+import time
+import logging
+import threading
+import multiprocessing as mp
+from multiprocessing import shared_memory
+import numpy as np
+from vision.frame_ring import FrameRing
+from vision.worker import Detection
+
+
+class SharedFrameRing(FrameRing):
+    """
+    FrameRing placé dans un segment multiprocessing.shared_memory.
+
+    Le segment contient un en-tête (numéro de séquence global, horodatages et
+    numéro de l'image de chaque emplacement) suivi des images. Un seul
+    processus écrit ; un lecteur d'un autre processus valide sa lecture en
+    vérifiant que le numéro de l'emplacement n'a pas changé (is_valid) avant
+    et après avoir utilisé l'image.
+    """
+
+    def __init__(self, capacity, shape, dtype=np.uint8, name=None):
+        shape = tuple(shape)
+        frame_bytes = capacity * int(np.prod(shape)) * np.dtype(dtype).itemsize
+        header_bytes = 8 * (1 + 2 * capacity)
+        self.owner = name is None
+        if self.owner:
+            self.shm = shared_memory.SharedMemory(create=True, size=header_bytes + frame_bytes)
+        else:
+            self.shm = shared_memory.SharedMemory(name=name)
+        self.name = self.shm.name
+        # Pas de FrameRing.__init__ : l'état (séquence comprise) vit dans le segment
+        self.capacity = capacity
+        self.shape = shape
+        self._lock = threading.Lock()
+        self._meta = np.ndarray(1 + capacity, dtype=np.int64, buffer=self.shm.buf)
+        self._slot_sequences = self._meta[1:]
+        self.timestamps = np.ndarray(capacity, dtype=np.float64, buffer=self.shm.buf,
+                                     offset=8 * (1 + capacity))
+        self.frames = np.ndarray((capacity,) + shape, dtype=dtype, buffer=self.shm.buf,
+                                 offset=header_bytes)
+        if self.owner:
+            self._meta[:] = 0
+
+    @property
+    def sequence(self):
+        return int(self._meta[0])
+
+    @sequence.setter
+    def sequence(self, value):
+        self._meta[0] = value
+
+    def acquire(self):
+        slot = self.sequence % self.capacity
+        self._slot_sequences[slot] = 0      # Emplacement en cours d'écriture
+        return self.frames[slot]
+
+    def commit(self, timestamp=None) -> int:
+        with self._lock:
+            sequence = self.sequence + 1
+            slot = (sequence - 1) % self.capacity
+            self.timestamps[slot] = time.monotonic() if timestamp is None else timestamp
+            self._slot_sequences[slot] = sequence
+            self.sequence = sequence        # Publication en dernier
+            return sequence
+
+    def is_valid(self, sequence) -> bool:
+        """L'image de ce numéro est toujours intacte dans son emplacement."""
+        return self._slot_sequences[(sequence - 1) % self.capacity] == sequence
+
+    def close(self):
+        # Les vues numpy doivent disparaître avant de fermer le segment
+        self.frames = self.timestamps = self._meta = self._slot_sequences = None
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+
+def _detector_main(name, capacity, shape, channel_order, flip, color, pyramid_levels,
+                   contexts, connection, new_frame, stop):
+    """
+    Point d'entrée du processus de détection (spawn) : lit la dernière image
+    et renvoie (séquence, balise). Ne dépend que de vision.* : rien du script
+    principal n'est nécessaire ici.
+
+    :param contexts: tableau partagé (capacity, 3) de (séquence, turn_rate, delta_time) par emplacement
+    """
+    from vision.color_lut import ColorClassifier
+    from vision.tracking import BeaconTracker
+
+    # Le processus enfant (spawn) partage le resource_tracker du parent : le
+    # segment n'est détruit qu'au unlink() du propriétaire
+    ring = SharedFrameRing(capacity, shape, name=name)
+    contexts = np.frombuffer(contexts, dtype=np.float64).reshape(capacity, 3)
+    classifier = ColorClassifier(channel_order=channel_order, flip=flip, pyramid_levels=pyramid_levels)
+    tracker = BeaconTracker(lambda frame, roi=None: classifier.detect(frame, (color,), roi).get(color))
+    last = 0
+    last_timestamp = None
+    try:
+        while not stop.is_set():
+            if not new_frame.wait(0.1):
+                continue
+            new_frame.clear()
+            sequence = ring.sequence
+            if sequence == last:
+                continue
+            slot = (sequence - 1) % capacity
+            timestamp = float(ring.timestamps[slot])
+            tag, turn_rate, delta_time = contexts[slot].tolist()
+            if tag != sequence:
+                # Contexte pas (encore) publié pour cette image : pas de rotation connue
+                turn_rate = 0.0
+                delta_time = timestamp - last_timestamp if last_timestamp is not None else 0.0
+            if not ring.is_valid(sequence):
+                continue
+            beacon = tracker.locate(ring.frames[slot], turn_rate, delta_time)
+            if not ring.is_valid(sequence):
+                continue    # Image réécrite pendant l'analyse : résultat jeté
+            last = sequence
+            last_timestamp = timestamp
+            connection.send((sequence, timestamp, beacon, time.monotonic() - timestamp))
+    finally:
+        connection.close()
+        ring.close()
+
+
+class VisionProcess:
+    """
+    Détection de balise dans un processus séparé (un autre coeur, sans GIL partagé).
+
+    Les images sont publiées dans un SharedFrameRing (jamais sérialisées) ;
+    seuls les résultats, quelques octets, repassent par un Pipe. Même interface
+    que VisionWorker : submit(), latest(), stats(), busy.
+    """
+
+    def __init__(self, shape=(300, 400, 3), capacity=4, channel_order="BGR", color="blue",
+                 pyramid_levels=0, flip=True):
+        """:param flip: images stockées de bas en haut (Ursina), comme ColorClassifier"""
+        self.shape = tuple(shape)
+        self.capacity = capacity
+        self.channel_order = channel_order
+        self.flip = flip
+        self.color = color
+        self.pyramid_levels = pyramid_levels
+        self.ring = SharedFrameRing(capacity, self.shape)
+        # spawn : pas de fork d'un processus qui a déjà des threads et un contexte graphique.
+        # L'enfant réimporte le script principal (__mp_main__) : celui-ci ne doit rien
+        # ouvrir (VPython, fenêtre...) hors de son bloc if __name__ == "__main__"
+        self._context = mp.get_context("spawn")
+        # Rotation et intervalle de chaque image, lus par le détecteur avec l'image
+        self.contexts = self._context.RawArray("d", 3 * capacity)
+        self._contexts = np.frombuffer(self.contexts, dtype=np.float64).reshape(capacity, 3)
+        self._last_timestamp = None
+        self.new_frame = self._context.Event()
+        self.stop_event = self._context.Event()
+        self.process = None
+        self.connection = None
+        self._latest = None
+        self._receive_lock = threading.Lock()
+        self.submitted = 0
+        self.processed = 0
+        self.total_latency = 0.0
+        self.busy = None        # Les lectures concurrentes sont validées par numéro de séquence
+        self.logger = logging.getLogger("vision.VisionProcess")
+
+    def start(self):
+        if self.process is not None:
+            return
+        receiver, sender = self._context.Pipe(duplex=False)
+        self.connection = receiver
+        self.process = self._context.Process(
+            target=_detector_main, name="vision-detector", daemon=True,
+            args=(self.ring.name, self.capacity, self.shape, self.channel_order, self.flip, self.color,
+                  self.pyramid_levels, self.contexts, sender, self.new_frame, self.stop_event))
+        self.process.start()
+        sender.close()
+        self.logger.info(f"Processus de détection démarré (pid {self.process.pid})")
+
+    def stop(self, timeout=1.0):
+        if self.process is None:
+            return
+        self.stop_event.set()
+        self.process.join(timeout)
+        if self.process.is_alive():
+            self.process.terminate()
+        self.process = None
+        self.connection.close()
+        self.ring.close()
+
+    def submit(self, frame, timestamp=None, turn_rate=0.0, delta_time=None) -> int:
+        """
+        Publie une image. Une image déjà écrite dans self.ring (acquire/commit)
+        n'est pas recopiée.
+
+        :param turn_rate: vitesse de rotation du robot (rad/s), pour la fenêtre de suivi
+        :param delta_time: temps depuis l'image précédente (s), par défaut d'après les horodatages
+        """
+        if not np.may_share_memory(frame, self.ring.frames):
+            self.ring.write(frame, timestamp)
+        sequence = self.ring.sequence
+        slot = (sequence - 1) % self.capacity
+        timestamp = float(self.ring.timestamps[slot])
+        if delta_time is None:
+            delta_time = timestamp - self._last_timestamp if self._last_timestamp is not None else 0.0
+        self._last_timestamp = timestamp
+        # Numéro de séquence écrit en dernier : le détecteur ignore un contexte incomplet
+        self._contexts[slot, 1:] = (turn_rate, delta_time)
+        self._contexts[slot, 0] = sequence
+        self.submitted += 1
+        self.new_frame.set()
+        return sequence
+
+    def latest(self):
+        """Dernier Detection reçu, sans bloquer."""
+        if self.connection is None:
+            return self._latest
+        with self._receive_lock:
+            try:
+                while self.connection.poll():
+                    sequence, timestamp, beacon, latency = self.connection.recv()
+                    self.processed += 1
+                    self.total_latency += latency
+                    self._latest = Detection(sequence, timestamp, beacon, self.shape, latency)
+            except (EOFError, OSError):
+                self.logger.error("Processus de détection arrêté.")
+                self.connection = None
+        return self._latest
+
+    def stats(self) -> dict:
+        self.latest()
+        return {
+            "processed": self.processed,
+            "dropped": self.submitted - self.processed,
+            "mean_latency_ms": self.total_latency / self.processed * 1000 if self.processed else 0.0,
+        }
@@ -0,0 +1,109 @@
+import math
+import time
+import logging
+
+
+class BeaconTracker:
+    """
+    Suivi de balise par fenêtre de recherche (ROI) entre deux images.
+
+    Après une détection, l'image suivante n'est analysée que dans une fenêtre
+    centrée sur la dernière position, de demi-taille proportionnelle au rayon
+    et élargie horizontalement du déplacement attendu pendant une rotation du
+    robot. Si la balise n'y est pas (ou touche le bord de la fenêtre), on
+    repasse sur l'image entière.
+
+    :param detector: callable(frame, roi=None) → (radius, cx, cy) ou None,
+                     par ex. UrsinaView.detect_blue_beacon
+    :param fov_deg: champ de vision horizontal de la caméra (50° dans Ursina)
+    """
+
+    def __init__(self, detector, fov_deg=50.0, radius_margin=2.0, margin_px=8):
+        self.detector = detector
+        self.fov_rad = math.radians(fov_deg)
+        self.radius_margin = radius_margin
+        self.margin_px = margin_px
+        self.last = None
+        self.roi_searches = 0
+        self.roi_hits = 0
+        self.full_searches = 0
+        self.first_full_time = None     # Première recherche complète (à froid), hors moyenne
+        self.full_time = 0.0            # Durée cumulée des recherches complètes suivantes (s)
+        self.roi_hit_time = 0.0         # Durée cumulée des recherches réussies en fenêtre (s)
+        self.logger = logging.getLogger("vision.BeaconTracker")
+
+    def reset(self):
+        self.last = None
+
+    def _roi(self, width, height, turn_rate, delta_time):
+        radius, cx, cy = self.last
+        half = radius * self.radius_margin + self.margin_px
+        # Déplacement horizontal (px) de la balise pendant delta_time de rotation
+        shift = abs(turn_rate) * delta_time * width / self.fov_rad
+        return (cx - half - shift, cy - half, cx + half + shift, cy + half)
+
+    @staticmethod
+    def _inside(beacon, roi, width, height):
+        """Le cercle détecté ne touche pas un bord de fenêtre qui n'est pas un bord d'image."""
+        radius, cx, cy = beacon
+        x0, y0, x1, y1 = roi
+        return ((x0 <= 0 or cx - radius > x0) and (x1 >= width or cx + radius < x1) and
+                (y0 <= 0 or cy - radius > y0) and (y1 >= height or cy + radius < y1))
+
+    def locate(self, frame, turn_rate=0.0, delta_time=0.0):
+        """
+        Renvoie (radius, cx, cy) comme detect_blue_beacon, ou None.
+
+        :param turn_rate: vitesse de rotation du robot (rad/s)
+        :param delta_time: temps écoulé depuis l'image précédente (s)
+        """
+        height, width = frame.shape[:2]
+        if self.last is not None:
+            roi = self._roi(width, height, turn_rate, delta_time)
+            t0 = time.perf_counter()
+            beacon = self.detector(frame, roi=roi)
+            elapsed = time.perf_counter() - t0
+            self.roi_searches += 1
+            if beacon is not None and self._inside(beacon, roi, width, height):
+                self.roi_hits += 1
+                self.roi_hit_time += elapsed
+                self.last = beacon
+                return beacon
+
+        t0 = time.perf_counter()
+        beacon = self.detector(frame)
+        elapsed = time.perf_counter() - t0
+        self.full_searches += 1
+        if self.first_full_time is None:
+            self.first_full_time = elapsed
+        else:
+            self.full_time += elapsed
+        self.last = beacon
+        return beacon
+
+    @property
+    def full_cost(self):
+        """Durée moyenne d'une recherche complète (s), sans la première (à froid) s'il y en a d'autres."""
+        if self.first_full_time is None:
+            return None
+        if self.full_searches > 1:
+            return self.full_time / (self.full_searches - 1)
+        return self.first_full_time
+
+    @property
+    def time_saved(self):
+        """Temps gagné par les recherches en fenêtre réussies, au coût moyen actuel d'une recherche complète."""
+        full_cost = self.full_cost
+        if full_cost is None:
+            return 0.0
+        return max(self.roi_hits * full_cost - self.roi_hit_time, 0.0)
+
+    def stats(self) -> dict:
+        return {
+            "roi_searches": self.roi_searches,
+            "roi_hits": self.roi_hits,
+            "full_searches": self.full_searches,
+            "hit_rate": self.roi_hits / self.roi_searches if self.roi_searches else 0.0,
+            "full_search_ms": (self.full_cost or 0.0) * 1000,
+            "time_saved_s": self.time_saved,
+        }
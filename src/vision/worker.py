@@ -0,0 +1,134 @@
+import time
+import threading
+import logging
+from collections import namedtuple
+
+# Résultat publié par le worker : horodatage de l'image, pas de l'analyse
+Detection = namedtuple("Detection", "frame_id timestamp beacon shape latency")
+
+
+class LatestFrameSlot:
+    """
+    Tampon à une place : une nouvelle image remplace celle qui n'a pas encore
+    été prise (« la dernière image gagne »). Le producteur ne bloque jamais.
+    """
+
+    def __init__(self):
+        self._condition = threading.Condition()
+        self._item = None
+        self._next_id = 0
+        self.dropped = 0
+        self.busy = None            # Image prise par le consommateur et pas encore rendue
+
+    def put(self, frame, timestamp=None, **context) -> int:
+        """Dépose une image (dont l'appelant cède la propriété) et renvoie son numéro."""
+        with self._condition:
+            if self._item is not None:
+                self.dropped += 1
+            self._next_id += 1
+            timestamp = time.monotonic() if timestamp is None else timestamp
+            self._item = (self._next_id, timestamp, frame, context)
+            self._condition.notify()
+            return self._next_id
+
+    def take(self, timeout=None):
+        """
+        Attend et retire la dernière image ; None si le délai expire.
+        L'image reste marquée occupée (busy) jusqu'à release().
+        """
+        with self._condition:
+            if self._item is None:
+                self._condition.wait(timeout)
+            item, self._item = self._item, None
+            if item is not None:
+                self.busy = item[2]
+            return item
+
+    def release(self):
+        self.busy = None
+
+
+class VisionWorker:
+    """
+    Thread de détection découplé du rendu.
+
+    Le rendu dépose les images avec submit() sans attendre ; le worker analyse
+    toujours la plus récente (les images intermédiaires sont abandonnées) et
+    publie un Detection que les stratégies et le HUD lisent avec latest().
+
+    :param detector: callable(frame, **context) → (radius, cx, cy) ou None,
+                     par ex. BeaconTracker.locate ou UrsinaView.detect_blue_beacon
+    """
+
+    def __init__(self, detector, name="vision"):
+        self.detector = detector
+        self.slot = LatestFrameSlot()
+        self._latest = None
+        self.processed = 0
+        self.errors = 0
+        self.total_latency = 0.0
+        self.running = False
+        self.thread = None
+        self.name = name
+        self.logger = logging.getLogger("vision.VisionWorker")
+
+    def start(self):
+        if self.running:
+            return
+        self.running = True
+        self.thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+        self.thread.start()
+
+    def stop(self, timeout=1.0):
+        self.running = False
+        if self.thread is not None:
+            self.slot.put(None)     # Réveille le worker
+            self.thread.join(timeout)
+            self.thread = None
+
+    def submit(self, frame, timestamp=None, **context) -> int:
+        """
+        Dépose une image pour analyse ; le contexte (ex. turn_rate) est passé
+        au détecteur. L'image ne doit plus être modifiée par l'appelant.
+        """
+        return self.slot.put(frame, timestamp, **context)
+
+    @property
+    def busy(self):
+        """Image en cours d'analyse, que le producteur ne doit pas réécrire."""
+        return self.slot.busy
+
+    def latest(self):
+        """Dernier Detection publié (None avant la première analyse), sans bloquer."""
+        return self._latest
+
+    def _run(self):
+        while self.running:
+            item = self.slot.take(timeout=0.1)
+            if item is None:
+                continue
+            frame_id, timestamp, frame, context = item
+            if frame is None:
+                self.slot.release()
+                continue
+            try:
+                beacon = self.detector(frame, **context)
+            except Exception as e:
+                self.errors += 1
+                self.logger.error(f"Image {frame_id}: échec de la détection ({e})")
+                continue
+            finally:
+                self.slot.release()
+            latency = time.monotonic() - timestamp
+            self.processed += 1
+            self.total_latency += latency
+            # Publication par une seule affectation : les lecteurs n'ont pas besoin de verrou
+            self._latest = Detection(frame_id, timestamp, beacon, frame.shape, latency)
+
+    def stats(self) -> dict:
+        return {
+            "processed": self.processed,
+            "dropped": self.slot.dropped,
+            "errors": self.errors,
+            "mean_latency_ms": self.total_latency / self.processed * 1000 if self.processed else 0.0,
+        }
@@ -1,12 +1,12 @@
+import sys
 import time
 from controller.simulation_controller import SimulationController
 from model.map_model import MapModel
 from controller.map_controller import MapController
 from model.map_model import MapModel
 from model.robot import RobotModel
-from view.vpython_view import VpythonView
-from view.vpython_control_panel import VPythonControlPanel
-from vpython import *
+from vision.shared_ring import VisionProcess
+from vision.raycast import RaycastCamera
 
 class MainApplication:
     def __init__(self):
@@ -17,8 +17,27 @@ class MainApplication:
         self.robot_model = RobotModel(self.map_model)
         self.sim_controller = SimulationController(self.map_model, self.robot_model, False)
         
+        # --vision-process : détection de balise sur un autre coeur, images en mémoire partagée
+        self.vision_process = None
+        if "--vision-process" in sys.argv:
+            # Images de VpythonView : même taille, stockées de haut en bas
+            width, height = VpythonView.CAMERA_SIZE
+            self.vision_process = VisionProcess(shape=(height, width, 3), flip=False)
+            self.vision_process.start()
+
+        # --raycast-camera : vue embarquée rendue en mémoire plutôt que capturée par le navigateur.
+        # Sans elle, chaque image passe par un PNG écrit sur disque par le navigateur puis
+        # relu (VPython ne renvoie pas les pixels) : quelques images par seconde au mieux
+        frame_source = None
+        if "--raycast-camera" in sys.argv:
+            width, height = VpythonView.CAMERA_SIZE
+            frame_source = RaycastCamera(self.map_model, width=width, height=height,
+                                         bottom_up=False).frame_source
+
         # Initialisation de la vue 3D VPython
-        self.vpython_view = VpythonView(self.sim_controller, self.handle_keydown)
+        self.vpython_view = VpythonView(self.sim_controller, self.handle_keydown,
+                                        frame_source=frame_source,
+                                        vision_process=self.vision_process)
 
         self.map_controller = MapController(self.map_model, None, None)
         
@@ -54,4 +73,9 @@ def run_vpython():
         time.sleep(0.1)  # Maintenir le processus VPython en cours d'exécution
 
 if __name__ == "__main__":
+    # VPython et ses vues seulement ici : le processus de détection (spawn)
+    # réimporte ce script sous le nom __mp_main__ et ne doit pas ouvrir de scène
+    from vpython import *
+    from view.vpython_view import VpythonView
+    from view.vpython_control_panel import VPythonControlPanel
     run_vpython()